@@ -0,0 +1,205 @@
+"""
+AST compacta em arena (struct-of-arrays).
+
+Em vez de um objeto por nó, a arena guarda a árvore em arrays tipados e
+endereça os nós por ids inteiros:
+
+- kinds[id]:   classe do nó (índice em NODE_CLASSES)
+- offsets[id]: início dos campos do nó em `fields`
+- fields:      um inteiro por campo, conforme o layout da classe:
+               id do filho (-1 = None), início de uma lista em `lists`,
+               índice em `strings` ou referência a `ints`/`floats`
+- lists:       listas como [tamanho, item1, item2, ...]
+
+Para os exportadores, o TACGenerator e o walker, arena.node(id) devolve uma
+visão: instância de uma subclasse da classe original do nó (isinstance e o
+nome da classe continuam valendo) cujos campos são lidos da arena sob
+demanda. As visões são somente leitura.
+
+Exemplo:
+    arena = ASTArena.from_ast(ast)
+    TACGenerator().generate(arena.node(arena.root))
+"""
+
+import sys
+from array import array
+from dataclasses import fields as dataclass_fields
+from typing import Dict, List, Optional
+
+from ast_nodes import *
+from walker import node_fields, walk
+
+# Codificação de cada campo
+NODE = 'n'    # nó filho ou None
+NODES = 'N'   # lista de nós
+STR = 's'     # string
+STRS = 'S'    # lista de strings
+NUM = 'v'     # int (64 bits) ou float
+
+LAYOUTS = {
+    Program: (STR, NODES, NODE),
+    VarDecl: (STRS, STR),
+    ConstDecl: (STR, NODE),
+    TypeDecl: (STR, STR),
+    FunctionDecl: (STR, NODES, STR, NODES, NODE),
+    Compound: (NODES,),
+    Assign: (NODE, NODE),
+    If: (NODE, NODE, NODE),
+    While: (NODE, NODE),
+    Call: (STR, NODES),
+    BinOp: (STR, NODE, NODE),
+    Num: (NUM,),
+    Var: (STR,),
+    String: (STR,),
+}
+
+NODE_CLASSES = tuple(LAYOUTS)
+_KIND_OF = {cls: kind for kind, cls in enumerate(NODE_CLASSES)}
+
+
+class ASTArena:
+    """AST em arrays tipados, com nós endereçados por ids inteiros"""
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.offsets = array('I')
+        self.fields = array('i')
+        self.lists = array('i')
+        self.strings: List[str] = []
+        self.ints = array('q')
+        self.floats = array('d')
+        self.root = -1
+        self._string_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @classmethod
+    def from_ast(cls, root: ASTNode) -> 'ASTArena':
+        """Copia a AST de objetos para uma nova arena (sem recursão)"""
+        arena = cls()
+        arena.root = arena.add(root)
+        return arena
+
+    # ======== Construção ========
+
+    def add(self, root: ASTNode) -> int:
+        """Copia `root` e seus descendentes para a arena; retorna o id da raiz"""
+        root_id = len(self.kinds)
+        walk(root, self._add_visit, (None, -1))
+        return root_id
+
+    def _add_visit(self, node: ASTNode, slot) -> list:
+        """Aloca o nó, grava seu id em `slot` = (array, posição) e devolve os filhos"""
+        target, position = slot
+        if target is not None:
+            target[position] = len(self.kinds)
+
+        cls = type(node)
+        self.kinds.append(_KIND_OF[cls])
+        start = len(self.fields)
+        self.offsets.append(start)
+        fields, lists = self.fields, self.lists
+        children = []
+        for i, (name, code) in enumerate(zip(node_fields(node), LAYOUTS[cls])):
+            value = getattr(node, name)
+            if code == NODE:
+                fields.append(-1)
+                if value is not None:
+                    children.append((value, (fields, start + i)))
+            elif code == NODES:
+                fields.append(len(lists))
+                lists.append(len(value))
+                for item in value:
+                    children.append((item, (lists, len(lists))))
+                    lists.append(-1)
+            elif code == STR:
+                fields.append(self.intern(value))
+            elif code == STRS:
+                fields.append(len(lists))
+                lists.append(len(value))
+                lists.extend(self.intern(item) for item in value)
+            elif isinstance(value, float):
+                fields.append(2 * len(self.floats) + 1)
+                self.floats.append(value)
+            else:
+                fields.append(2 * len(self.ints))
+                self.ints.append(value)
+        return children
+
+    def intern(self, text: str) -> int:
+        """Índice de `text` na tabela de strings (cada string é guardada uma vez)"""
+        index = self._string_ids.get(text)
+        if index is None:
+            index = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    # ======== Leitura ========
+
+    def node(self, node_id: int) -> Optional[ASTNode]:
+        """Visão somente leitura do nó `node_id` (None para -1)"""
+        if node_id < 0:
+            return None
+        return _VIEWS[self.kinds[node_id]](self, node_id)
+
+    def kind(self, node_id: int) -> type:
+        """Classe do nó `node_id`, sem criar a visão"""
+        return NODE_CLASSES[self.kinds[node_id]]
+
+    def list_at(self, start: int) -> array:
+        """Itens da lista que começa em lists[start]"""
+        return self.lists[start + 1:start + 1 + self.lists[start]]
+
+    def number(self, ref: int):
+        """Valor numérico referenciado por um campo NUM"""
+        return self.floats[ref >> 1] if ref & 1 else self.ints[ref >> 1]
+
+    def nbytes(self) -> int:
+        """Memória dos arrays e da tabela de strings (sem o texto das strings)"""
+        total = sum(a.itemsize * len(a) for a in
+                    (self.kinds, self.offsets, self.fields, self.lists, self.ints, self.floats))
+        return total + sys.getsizeof(self.strings)
+
+
+# ======== Visões ========
+
+def _field_getter(index: int, code: str):
+    if code == NODE:
+        def get(view):
+            arena = view._arena
+            return arena.node(arena.fields[arena.offsets[view._id] + index])
+    elif code == NODES:
+        def get(view):
+            arena = view._arena
+            return [arena.node(i) for i in arena.list_at(arena.fields[arena.offsets[view._id] + index])]
+    elif code == STR:
+        def get(view):
+            arena = view._arena
+            return arena.strings[arena.fields[arena.offsets[view._id] + index]]
+    elif code == STRS:
+        def get(view):
+            arena = view._arena
+            strings = arena.strings
+            return [strings[i] for i in arena.list_at(arena.fields[arena.offsets[view._id] + index])]
+    else:
+        def get(view):
+            arena = view._arena
+            return arena.number(arena.fields[arena.offsets[view._id] + index])
+    return get
+
+
+def _view_init(self, arena: ASTArena, node_id: int):
+    self._arena = arena
+    self._id = node_id
+
+
+def _view_class(cls) -> type:
+    """Subclasse de `cls` cujos campos são propriedades lidas da arena"""
+    namespace = {'__slots__': ('_arena', '_id'), '__init__': _view_init}
+    for index, (field, code) in enumerate(zip(dataclass_fields(cls), LAYOUTS[cls])):
+        namespace[field.name] = property(_field_getter(index, code))
+    return type(cls.__name__, (cls,), namespace)
+
+
+_VIEWS = tuple(_view_class(cls) for cls in NODE_CLASSES)
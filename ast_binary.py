@@ -0,0 +1,314 @@
+"""
+Serialização binária compacta da AST.
+
+Formato (inteiros sem tamanho fixo são varints LEB128):
+
+    b'CPAST\\x01'                      assinatura e versão
+    n_strings, (tamanho, utf-8)*       tabela de strings (nomes, literais, operadores)
+    n_nós, raiz
+    registros dos nós                  um por nó, na ordem dos ids
+    índice                             n_nós × uint32: início de cada registro
+    rodapé                             uint32 início dos registros, uint32 início do índice
+
+Cada registro é o tag da classe (índice em ast_arena.NODE_CLASSES) seguido
+dos campos, no layout de ast_arena.LAYOUTS: filhos como a distância até o
+id do próprio nó (0 = None), listas como tamanho + itens, strings pelo
+índice na tabela e números como varint zigzag (int) ou 8 bytes (float).
+Os ids seguem a pós-ordem (a raiz é o último nó), então todo filho vem
+antes do pai e a distância é sempre positiva; um nó compartilhado (ex.: AST
+com hash-consing) é gravado uma única vez.
+
+load_ast() mapeia o arquivo em memória (mmap) e só decodifica os registros
+dos nós pedidos: BinaryAST.node(id) reconstrói a subárvore de `id` (sem
+recursão) e guarda os nós já reconstruídos.
+
+Exemplo:
+    save_ast(ast, 'export/ast.bin')
+    with load_ast('export/ast.bin') as arquivo:
+        ast = arquivo.tree()
+"""
+
+import mmap
+import struct
+from typing import Dict, List, Optional
+
+from ast_arena import LAYOUTS, NODE_CLASSES, NODE, NODES, STR, STRS
+from ast_nodes import ASTNode
+from walker import node_children, node_fields
+
+MAGIC = b'CPAST\x01'
+_FOOTER = struct.Struct('<II')
+_INDEX_ENTRY = struct.Struct('<I')
+_FLOAT = struct.Struct('<d')
+_TAG_OF = {cls: tag for tag, cls in enumerate(NODE_CLASSES)}
+
+
+class BinaryASTError(Exception):
+    pass
+
+
+# ======== Varints ========
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _read_varint(data, pos: int):
+    """Retorna (valor, próxima posição)"""
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value, shift = byte & 0x7F, 7
+    while True:
+        pos += 1
+        byte = data[pos]
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos + 1
+        shift += 7
+
+
+# ======== Gravação ========
+
+def _post_order(root: ASTNode):
+    """Ids em pós-ordem (filhos antes do pai); nós compartilhados recebem um único id"""
+    ids: Dict[int, int] = {}
+    order: List[ASTNode] = []
+    stack = [(root, iter(node_children(root)))]
+    while stack:
+        node, children = stack[-1]
+        for child, _ in children:
+            if id(child) not in ids:
+                stack.append((child, iter(node_children(child))))
+                break
+        else:
+            stack.pop()
+            ids[id(node)] = len(order)
+            order.append(node)
+    return ids, order
+
+
+def node_ids(root: ASTNode) -> Dict[int, int]:
+    """id(nó) -> id do nó no formato binário, o mesmo usado por dump_ast e BinaryAST.node"""
+    return _post_order(root)[0]
+
+
+def dump_ast(root: ASTNode) -> bytes:
+    """Serializa a AST (ou DAG) no formato binário"""
+    ids, order = _post_order(root)
+    strings: Dict[str, int] = {}
+    records = bytearray()
+    offsets = []
+    write = _write_varint
+
+    def string(text):
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        write(records, index)
+
+    for node_id, node in enumerate(order):
+        offsets.append(len(records))
+        cls = type(node)
+        records.append(_TAG_OF[cls])
+        for name, code in zip(node_fields(node), LAYOUTS[cls]):
+            value = getattr(node, name)
+            if code == NODE:
+                write(records, 0 if value is None else node_id - ids[id(value)])
+            elif code == NODES:
+                write(records, len(value))
+                for item in value:
+                    write(records, node_id - ids[id(item)])
+            elif code == STR:
+                string(value)
+            elif code == STRS:
+                write(records, len(value))
+                for item in value:
+                    string(item)
+            elif isinstance(value, float):
+                records.append(1)
+                records += _FLOAT.pack(value)
+            else:
+                write(records, _zigzag(value) * 2)
+
+    out = bytearray(MAGIC)
+    write(out, len(strings))
+    for text in strings:
+        encoded = text.encode('utf-8')
+        write(out, len(encoded))
+        out += encoded
+    write(out, len(order))
+    write(out, len(order) - 1)  # raiz: último nó da pós-ordem
+    records_start = len(out)
+    out += records
+    index_start = len(out)
+    out += struct.pack(f'<{len(offsets)}I', *offsets)
+    out += _FOOTER.pack(records_start, index_start)
+    return bytes(out)
+
+
+def save_ast(root: ASTNode, file_path: str):
+    with open(file_path, 'wb') as f:
+        f.write(dump_ast(root))
+
+
+# ======== Leitura ========
+
+class BinaryAST:
+    """Leitor preguiçoso do formato binário sobre bytes ou um mmap"""
+
+    def __init__(self, data, source: Optional[mmap.mmap] = None):
+        self.data = data
+        self._mmap = source
+        if data[:len(MAGIC)] != MAGIC:
+            raise BinaryASTError('Arquivo não é uma AST binária (assinatura inválida)')
+        pos = len(MAGIC)
+        n_strings, pos = _read_varint(data, pos)
+        self.strings: List[str] = []
+        for _ in range(n_strings):
+            size, pos = _read_varint(data, pos)
+            self.strings.append(bytes(data[pos:pos + size]).decode('utf-8'))
+            pos += size
+        self.n_nodes, pos = _read_varint(data, pos)
+        self.root, pos = _read_varint(data, pos)
+        self._records, self._index = _FOOTER.unpack_from(data, len(data) - _FOOTER.size)
+        self._nodes: Dict[int, ASTNode] = {}
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Libera o mmap (nós já reconstruídos continuam válidos)"""
+        if self._mmap is not None:
+            self.data = None
+            self._mmap.close()
+            self._mmap = None
+
+    def tree(self) -> ASTNode:
+        """Reconstrói a AST inteira (lendo os registros em sequência)"""
+        if self.root not in self._nodes:
+            built = self._nodes  # nós já lidos por node() são reaproveitados
+            nodes: List[ASTNode] = []
+            pos = self._records
+            for node_id in range(self.n_nodes):
+                cls, values, pos = self._read(pos, node_id, nodes.__getitem__)
+                node = built.get(node_id)
+                nodes.append(cls(*values) if node is None else node)
+            self._nodes = dict(enumerate(nodes))
+        return self._nodes[self.root]
+
+    def node(self, node_id: int) -> ASTNode:
+        """Reconstrói (uma única vez) o nó `node_id` e a subárvore abaixo dele"""
+        nodes = self._nodes
+        if node_id in nodes:
+            return nodes[node_id]
+        # Pós-ordem com pilha explícita: cada registro é lido uma vez com os
+        # ids dos filhos e o nó é criado quando todos eles já existem
+        records = {}
+        stack = [node_id]
+        while stack:
+            current = stack[-1]
+            if current in nodes:
+                stack.pop()
+                continue
+            record = records.get(current)
+            if record is None:
+                children = []
+                cls, values, _ = self._read(self._offset(current), current, _collect(children))
+                record = records[current] = (cls, values, children)
+            pending = [child for child in record[2] if child not in nodes]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            cls, values, _ = record
+            nodes[current] = cls(*_resolve(cls, values, nodes))
+        return nodes[node_id]
+
+    def kind(self, node_id: int) -> type:
+        """Classe do nó `node_id` (lê só o tag)"""
+        return NODE_CLASSES[self.data[self._offset(node_id)]]
+
+    def _offset(self, node_id: int) -> int:
+        if not 0 <= node_id < self.n_nodes:
+            raise IndexError(f'Nó {node_id} fora do arquivo ({self.n_nodes} nós)')
+        return self._records + _INDEX_ENTRY.unpack_from(self.data, self._index + 4 * node_id)[0]
+
+    def _read(self, pos: int, node_id: int, link):
+        """
+        Decodifica o registro que começa em `pos`; cada filho é convertido por
+        link(id do filho). Retorna (classe, valores dos campos, próxima posição).
+        """
+        data, strings = self.data, self.strings
+        cls = NODE_CLASSES[data[pos]]
+        pos += 1
+        values = []
+        for code in LAYOUTS[cls]:
+            value = data[pos]
+            if value < 0x80:
+                pos += 1
+            else:
+                value, pos = _read_varint(data, pos)
+            if code == NODE:
+                values.append(link(node_id - value) if value else None)
+            elif code == STR:
+                values.append(strings[value])
+            elif code == NODES or code == STRS:
+                items = []
+                for _ in range(value):
+                    item = data[pos]
+                    if item < 0x80:
+                        pos += 1
+                    else:
+                        item, pos = _read_varint(data, pos)
+                    items.append(link(node_id - item) if code == NODES else strings[item])
+                values.append(items)
+            elif value == 1:
+                values.append(_FLOAT.unpack_from(data, pos)[0])
+                pos += _FLOAT.size
+            else:
+                values.append(_unzigzag(value >> 1))
+        return cls, values, pos
+
+
+def _collect(children: List[int]):
+    """link() que só anota os ids dos filhos"""
+    def link(child_id):
+        children.append(child_id)
+        return child_id
+    return link
+
+
+def _resolve(cls, values, nodes):
+    """Troca os ids dos filhos pelos nós já reconstruídos"""
+    for code, value in zip(LAYOUTS[cls], values):
+        if code == NODE:
+            yield None if value is None else nodes[value]
+        elif code == NODES:
+            yield [nodes[child] for child in value]
+        else:
+            yield value
+
+
+def load_ast(file_path: str) -> BinaryAST:
+    """Abre o arquivo com mmap; os nós são reconstruídos sob demanda"""
+    with open(file_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return BinaryAST(mapped, mapped)
@@ -1,6 +1,9 @@
 import json
-from ast_nodes import ASTNode, Program, Compound, Assign, Var, Num, BinOp, If, While, Call, VarDecl, ConstDecl, TypeDecl, FunctionDecl
-from typing import Any, Dict, List
+from ast_nodes import ASTNode, Program, Compound, Assign, Var, Num, String, BinOp, If, While, Call, VarDecl, ConstDecl, TypeDecl, FunctionDecl
+from typing import Any, Dict, List, Optional, TextIO
+from dataclasses import fields
+from ast_arena import LAYOUTS, NODE_CLASSES, NODE, NODES, STR, STRS
+from walker import iter_children, node_fields, run, walk
 
 
 # ---------- EXPORTAÇÃO PARA JSON ----------
@@ -9,27 +12,215 @@ def ast_to_dict(node: ASTNode) -> Any:
         return [ast_to_dict(x) for x in node]
     if not isinstance(node, ASTNode):
         return node
+    root = {}
+    walk(node, _dict_visit, (root, "root"))
+    return root["root"]
+
+# Nós sem filhos: o dicionário é montado direto pelo pai, sem passar pela pilha
+_LEAVES = (Var, Num, String)
+
+def _leaf_dict(node: ASTNode) -> dict:
     result = {"type": node.__class__.__name__}
-    for field, value in node.__dict__.items():
-        result[field] = ast_to_dict(value)
+    for field in node_fields(node):
+        result[field] = getattr(node, field)
     return result
 
-def export_ast_to_json(node: ASTNode, file_path: str):
-    data = ast_to_dict(node)
+def _dict_visit(node: ASTNode, slot) -> list:
+    """Cria o dicionário do nó no lugar `slot` = (container, chave) do pai"""
+    container, key = slot
+    result = {"type": node.__class__.__name__}
+    container[key] = result
+    children = []
+    for field in node_fields(node):
+        value = getattr(node, field)
+        if isinstance(value, _LEAVES):
+            result[field] = _leaf_dict(value)
+        elif isinstance(value, ASTNode):
+            result[field] = None  # preenchido quando o filho for visitado
+            children.append((value, (result, field)))
+        elif isinstance(value, list):
+            items = result[field] = list(value)
+            for i, item in enumerate(value):
+                if isinstance(item, _LEAVES):
+                    items[i] = _leaf_dict(item)
+                elif isinstance(item, ASTNode):
+                    children.append((item, (items, i)))
+        else:
+            result[field] = value
+    return children
+
+def export_ast_to_json(node: ASTNode, file_path: str, indent: Optional[int] = 2):
+    """Grava a AST em JSON; indent=None gera a saída compacta, sem espaços"""
     with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        write_ast_json(node, f, indent)
     print(f"✅ AST exportada para JSON com sucesso: {file_path}")
 
+def write_ast_json(node: ASTNode, out: TextIO, indent: Optional[int] = 2):
+    """
+    Escreve em `out` o mesmo JSON de json.dump(ast_to_dict(node), indent=indent)
+    (compacto: separators=(',', ':')), nó a nó, à medida que a árvore é
+    percorrida: a memória usada é proporcional à profundidade da árvore,
+    não ao tamanho da saída.
+    """
+    run(_json_visit(node, out.write, indent, 0))
+
+def _json_pad(indent: Optional[int], level: int) -> str:
+    return "" if indent is None else "\n" + " " * (indent * level)
+
+def _json_leaf(node: ASTNode, indent: Optional[int], level: int) -> str:
+    inner, key_sep = _json_pad(indent, level + 1), ":" if indent is None else ": "
+    field = node_fields(node)[0]
+    return (f'{{{inner}"type"{key_sep}"{node.__class__.__name__}",'
+            f'{inner}"{field}"{key_sep}{_json_value(getattr(node, field))}{_json_pad(indent, level)}}}')
+
+def _json_value(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+def _json_visit(node: ASTNode, write, indent: Optional[int], level: int):
+    """Visitante gerador (walker.run) que escreve o objeto JSON do nó"""
+    inner, key_sep = _json_pad(indent, level + 1), ":" if indent is None else ": "
+    write(f'{{{inner}"type"{key_sep}"{node.__class__.__name__}"')
+    for field in node_fields(node):
+        value = getattr(node, field)
+        write(f',{inner}"{field}"{key_sep}')
+        if isinstance(value, _LEAVES):
+            write(_json_leaf(value, indent, level + 1))
+        elif isinstance(value, ASTNode):
+            yield _json_visit(value, write, indent, level + 1)
+        elif isinstance(value, list):
+            if not value:
+                write("[]")
+                continue
+            item_pad = _json_pad(indent, level + 2)
+            write("[")
+            for i, item in enumerate(value):
+                write(f",{item_pad}" if i else item_pad)
+                if isinstance(item, _LEAVES):
+                    write(_json_leaf(item, indent, level + 2))
+                elif isinstance(item, ASTNode):
+                    yield _json_visit(item, write, indent, level + 2)
+                else:
+                    write(_json_value(item))
+            write(f"{inner}]")
+        else:
+            write(_json_value(value))
+    write(f"{_json_pad(indent, level)}}}")
+
+# ---------- IMPORTAÇÃO DE JSON ----------
+class ASTFormatError(ValueError):
+    """JSON que não descreve uma AST válida (com o caminho do campo problemático)"""
+
+# Nome da classe -> (classe, nomes dos campos, layout de ast_arena.LAYOUTS)
+NODE_TYPES = {cls.__name__: (cls, tuple(f.name for f in fields(cls)), LAYOUTS[cls])
+              for cls in NODE_CLASSES}
+# Únicos campos de nó que podem ser null
+_OPTIONAL_FIELDS = {(If, "else_branch"), (BinOp, "right")}
+
+def load_ast_from_json(file_path: str) -> ASTNode:
+    """Lê o JSON de export_ast_to_json e reconstrói os nós de ast_nodes"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return dict_to_ast(json.load(f))
+
+def dict_to_ast(data: dict) -> ASTNode:
+    """Inverso de ast_to_dict: valida a estrutura e cria os nós (sem recursão)"""
+    return run(_node_from_dict(data, None))
+
+def _format_path(where) -> str:
+    keys = []
+    while where is not None:
+        where, key = where
+        keys.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return "raiz" + "".join(reversed(keys))
+
+def _format_error(where, message: str) -> ASTFormatError:
+    return ASTFormatError(f"{_format_path(where)}: {message}")
+
+def _node_from_dict(data, where):
+    """Visitante gerador (walker.run) que cria o nó de `data` depois dos filhos"""
+    spec = NODE_TYPES.get(data.get("type")) if isinstance(data, dict) else None
+    if spec is None:
+        raise _format_error(where, f"nó inválido: {str(data)[:60]}")
+    cls, names, layout = spec
+    if len(data) != len(names) + 1:
+        extra = set(data) - set(names) - {"type"}
+        if extra:
+            raise _format_error(where, f"campos desconhecidos em {cls.__name__}: {sorted(extra)}")
+    args = []
+    for name, code in zip(names, layout):
+        if name not in data:
+            raise _format_error(where, f"campo '{name}' ausente em {cls.__name__}")
+        value = data[name]
+        if code == NODE:
+            if value is None:
+                if (cls, name) not in _OPTIONAL_FIELDS:
+                    raise _format_error((where, name), "nó obrigatório é null")
+                args.append(None)
+            else:
+                leaf = _leaf_from_dict(value)
+                args.append(leaf if leaf is not None else (yield _node_from_dict(value, (where, name))))
+        elif code == NODES:
+            if not isinstance(value, list):
+                raise _format_error((where, name), "esperada uma lista de nós")
+            items = []
+            for i, item in enumerate(value):
+                leaf = _leaf_from_dict(item)
+                items.append(leaf if leaf is not None else (yield _node_from_dict(item, ((where, name), i))))
+            args.append(items)
+        elif code == STR:
+            if not isinstance(value, str):
+                raise _format_error((where, name), "esperada uma string")
+            args.append(value)
+        elif code == STRS:
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise _format_error((where, name), "esperada uma lista de strings")
+            args.append(value)
+        else:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise _format_error((where, name), "esperado um número")
+            args.append(value)
+    return cls(*args)
+
+def _leaf_from_dict(data) -> Optional[ASTNode]:
+    """Var/Num/String bem formados, criados sem passar pela pilha (None se não for o caso)"""
+    if isinstance(data, dict) and len(data) == 2:
+        kind = data.get("type")
+        if kind == "Var":
+            name = data.get("name")
+            if isinstance(name, str):
+                return Var(name)
+        elif kind == "Num":
+            value = data.get("value")
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return Num(value)
+        elif kind == "String":
+            value = data.get("value")
+            if isinstance(value, str):
+                return String(value)
+    return None
+
 # ---------- EXPORTAÇÃO PARA GRAPHVIZ ----------
 class DotExporter:
-    def __init__(self):
+    """
+    Sem `out`, as linhas ficam em self.lines; com um arquivo aberto, cada
+    linha é gravada assim que o nó é visitado (export() usa esse modo).
+    compact=True omite a indentação e os atributos de estilo.
+    """
+    def __init__(self, out: Optional[TextIO] = None, compact: bool = False):
         self.lines: List[str] = []
         self.counter = 0
+        self.out = out
+        self.compact = compact
 
     def new_id(self) -> str:
         self.counter += 1
         return f"n{self.counter}"
 
+    def emit(self, line: str):
+        if self.out is None:
+            self.lines.append(line)
+        else:
+            self.out.write(line + "\n")
+
     def node_label(self, node: ASTNode) -> str:
         if isinstance(node, Var):
             return f"Var({node.name})"
@@ -43,25 +234,29 @@ class DotExporter:
             return node.__class__.__name__
 
     def export(self, node: ASTNode, file_path: str):
-        self.lines.append("digraph AST {")
-        self._visit(node)
-        self.lines.append("}")
         with open(file_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(self.lines))
+            self.out = f
+            try:
+                self.write(node)
+            finally:
+                self.out = None
         print(f"✅ AST exportada para DOT com sucesso: {file_path}")
 
+    def write(self, node: ASTNode):
+        self.emit("digraph AST {")
+        walk(node, self._visit)
+        self.emit("}")
+
     def _visit(self, node: ASTNode, parent_id: str = None):
+        """Emite o nó e a aresta vinda do pai; retorna os filhos para o walk()"""
         node_id = self.new_id()
         label = self.node_label(node).replace('"', "'")
-        self.lines.append(f'  {node_id} [label="{label}", shape=box, style=rounded];')
-        if parent_id:
-            self.lines.append(f"  {parent_id} -> {node_id};")
-
-        # percorrer filhos
-        for field, value in getattr(node, "__dict__", {}).items():
-            if isinstance(value, ASTNode):
-                self._visit(value, node_id)
-            elif isinstance(value, list):
-                for item in value:
-                    if isinstance(item, ASTNode):
-                        self._visit(item, node_id)
\ No newline at end of file
+        if self.compact:
+            self.emit(f'{node_id}[label="{label}"];')
+            if parent_id:
+                self.emit(f"{parent_id}->{node_id};")
+        else:
+            self.emit(f'  {node_id} [label="{label}", shape=box, style=rounded];')
+            if parent_id:
+                self.emit(f"  {parent_id} -> {node_id};")
+        return iter_children(node, node_id)
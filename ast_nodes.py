@@ -1,35 +1,39 @@
+import sys
 from dataclasses import dataclass
 from typing import List, Optional, Union
 
+# Nós com __slots__ (sem __dict__ por instância) quando o Python permite (3.10+)
+_node = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
 # ============ NÓ BASE ============
-@dataclass
+@_node
 class ASTNode:
     pass
 
 # ============ PROGRAMA PRINCIPAL ============
-@dataclass
+@_node
 class Program(ASTNode):
     name: str
     decls: List[ASTNode]
     block: 'Compound'
 
 # ============ DECLARAÇÕES ============
-@dataclass
+@_node
 class VarDecl(ASTNode):
     names: List[str]
     type_name: str
 
-@dataclass
+@_node
 class ConstDecl(ASTNode):
     name: str
     value: ASTNode
 
-@dataclass
+@_node
 class TypeDecl(ASTNode):
     name: str
     definition: str  # Pode ser expandido futuramente (array, record etc.)
 
-@dataclass
+@_node
 class FunctionDecl(ASTNode):
     name: str
     params: List['VarDecl']
@@ -38,46 +42,46 @@ class FunctionDecl(ASTNode):
     body: 'Compound'
 
 # ============ COMANDOS ============
-@dataclass
+@_node
 class Compound(ASTNode):
     statements: List[ASTNode]
 
-@dataclass
+@_node
 class Assign(ASTNode):
     target: 'Var'
     value: ASTNode
 
-@dataclass
+@_node
 class If(ASTNode):
     condition: ASTNode
     then_branch: ASTNode
     else_branch: Optional[ASTNode] = None
 
-@dataclass
+@_node
 class While(ASTNode):
     condition: ASTNode
     body: ASTNode
 
-@dataclass
+@_node
 class Call(ASTNode):
     name: str
     args: List[ASTNode]
 
 # ============ EXPRESSÕES ============
-@dataclass
+@_node
 class BinOp(ASTNode):
     op: str
     left: ASTNode
     right: Optional[ASTNode]  # pode ser None (para operador 'not')
 
-@dataclass
+@_node
 class Num(ASTNode):
     value: Union[int, float]
 
-@dataclass
+@_node
 class Var(ASTNode):
     name: str
     
-@dataclass
+@_node
 class String(ASTNode):
     value: str
\ No newline at end of file
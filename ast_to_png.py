@@ -1,16 +1,85 @@
 #!/usr/bin/env python3
 """
 Script para converter o AST JSON em uma visualização PNG da árvore.
-Requer: pip install graphviz
+Requer: pip install graphviz (sem ele, gera um SVG com ast_to_svg)
 """
 
 import json
 import sys
-from graphviz import Digraph
+
+try:
+    from graphviz import Digraph
+except ImportError:  # graphviz é opcional
+    Digraph = None
+
+from walker import walk
+
+# Cor de cada tipo de nó
+NODE_COLORS = {
+    'Program': '#E3F2FD',
+    'VarDecl': '#FFF3E0',
+    'Compound': '#F3E5F5',
+    'Assign': '#E8F5E9',
+    'While': '#FFF9C4',
+    'If': '#FFECB3',
+    'BinOp': '#FFCDD2',
+    'Var': '#C8E6C9',
+    'Num': '#B2DFDB',
+    'Call': '#D1C4E9'
+}
+
+
+def _json_children(node, parent_id):
+    """Filhos de um nó do JSON da AST como (filho, (id do pai, rótulo da aresta))"""
+    children = []
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'type':
+                continue
+            if isinstance(value, dict):
+                # Filho único
+                children.append((value, (parent_id, key)))
+            elif isinstance(value, list):
+                # Lista de filhos
+                for i, item in enumerate(value):
+                    if isinstance(item, dict):
+                        children.append((item, (parent_id, f"{key}[{i}]")))
+    elif isinstance(node, list):
+        # Lista de nós: os itens se ligam ao pai da lista
+        for i, item in enumerate(node):
+            if isinstance(item, dict):
+                children.append((item, (parent_id, f"[{i}]")))
+    return children
+
+
+def node_label(node):
+    """Linhas do rótulo de um nó do JSON: o tipo e as informações relevantes"""
+    node_type = node.get('type', 'Unknown')
+    label_parts = [node_type]
+
+    # Adiciona informações extras dependendo do tipo
+    if node_type == 'Program':
+        label_parts.append(f"name: {node.get('name', '')}")
+    elif node_type == 'Var':
+        label_parts.append(f"name: {node.get('name', '')}")
+    elif node_type == 'Num':
+        label_parts.append(f"value: {node.get('value', '')}")
+    elif node_type == 'BinOp':
+        label_parts.append(f"op: {node.get('op', '')}")
+    elif node_type == 'VarDecl':
+        names = ', '.join(node.get('names', []))
+        label_parts.append(f"names: {names}")
+        label_parts.append(f"type: {node.get('type_name', '')}")
+    elif node_type == 'Call':
+        label_parts.append(f"name: {node.get('name', '')}")
+    return label_parts
+
 
 def add_node(graph, node, parent_id=None, edge_label='', node_counter=[0]):
     """
-    Adiciona um nó à árvore recursivamente.
+    Adiciona um nó e todos os seus descendentes à árvore. O percurso usa a
+    pilha explícita de walker.walk, então ASTs profundas não estouram a
+    pilha do Python.
 
     Args:
         graph: Objeto Digraph do graphviz
@@ -22,79 +91,30 @@ def add_node(graph, node, parent_id=None, edge_label='', node_counter=[0]):
     Returns:
         ID do nó atual
     """
-    # Gera ID único para este nó
-    current_id = f"node_{node_counter[0]}"
-    node_counter[0] += 1
+    ids = []
+
+    def visit(node, edge):
+        parent_id, label = edge
+        # Gera ID único para este nó
+        current_id = f"node_{node_counter[0]}"
+        node_counter[0] += 1
+        ids.append(current_id)
+        if not isinstance(node, dict):
+            return _json_children(node, parent_id)
 
-    # Determina o tipo do nó
-    if isinstance(node, dict):
         node_type = node.get('type', 'Unknown')
+        label_parts = node_label(node)
 
-        # Cria o label do nó com informações relevantes
-        label_parts = [node_type]
-
-        # Adiciona informações extras dependendo do tipo
-        if node_type == 'Program':
-            label_parts.append(f"name: {node.get('name', '')}")
-        elif node_type == 'Var':
-            label_parts.append(f"name: {node.get('name', '')}")
-        elif node_type == 'Num':
-            label_parts.append(f"value: {node.get('value', '')}")
-        elif node_type == 'BinOp':
-            label_parts.append(f"op: {node.get('op', '')}")
-        elif node_type == 'VarDecl':
-            names = ', '.join(node.get('names', []))
-            label_parts.append(f"names: {names}")
-            label_parts.append(f"type: {node.get('type_name', '')}")
-        elif node_type == 'Call':
-            label_parts.append(f"name: {node.get('name', '')}")
-
-        label = '\\n'.join(label_parts)
-
-        # Define cor baseada no tipo de nó
-        colors = {
-            'Program': '#E3F2FD',
-            'VarDecl': '#FFF3E0',
-            'Compound': '#F3E5F5',
-            'Assign': '#E8F5E9',
-            'While': '#FFF9C4',
-            'If': '#FFECB3',
-            'BinOp': '#FFCDD2',
-            'Var': '#C8E6C9',
-            'Num': '#B2DFDB',
-            'Call': '#D1C4E9'
-        }
-
-        color = colors.get(node_type, '#FFFFFF')
-        graph.node(current_id, label, style='filled', fillcolor=color, shape='box')
+        color = NODE_COLORS.get(node_type, '#FFFFFF')
+        graph.node(current_id, '\\n'.join(label_parts), style='filled', fillcolor=color, shape='box')
 
         # Conecta ao pai se existir
         if parent_id is not None:
-            graph.edge(parent_id, current_id, label=edge_label)
+            graph.edge(parent_id, current_id, label=label)
+        return _json_children(node, current_id)
 
-        # Processa filhos recursivamente
-        for key, value in node.items():
-            if key == 'type':
-                continue
-
-            if isinstance(value, dict):
-                # Filho único
-                add_node(graph, value, current_id, key, node_counter)
-
-            elif isinstance(value, list) and value:
-                # Lista de filhos
-                for i, item in enumerate(value):
-                    if isinstance(item, dict):
-                        list_label = f"{key}[{i}]"
-                        add_node(graph, item, current_id, list_label, node_counter)
-
-    elif isinstance(node, list):
-        # Lista de nós
-        for i, item in enumerate(node):
-            if isinstance(item, dict):
-                add_node(graph, item, parent_id, f"[{i}]", node_counter)
-
-    return current_id
+    walk(node, visit, (parent_id, edge_label))
+    return ids[0]
 
 
 def create_ast_visualization(json_file, output_file='export/ast.png'):
@@ -105,6 +125,13 @@ def create_ast_visualization(json_file, output_file='export/ast.png'):
         json_file: Caminho para o arquivo JSON da AST
         output_file: Caminho para o arquivo PNG de saída
     """
+    if Digraph is None:
+        from ast_to_svg import create_svg_visualization
+        output_file = output_file[:-len('.png')] + '.svg' if output_file.endswith('.png') else output_file
+        print("graphviz não está instalado; gerando SVG em Python puro")
+        create_svg_visualization(json_file, output_file)
+        return
+
     # Lê o arquivo JSON
     with open(json_file, 'r', encoding='utf-8') as f:
         ast_data = json.load(f)
@@ -115,7 +142,7 @@ def create_ast_visualization(json_file, output_file='export/ast.png'):
     graph.attr('node', fontname='Arial', fontsize='10')
     graph.attr('edge', fontname='Arial', fontsize='8')
 
-    # Adiciona os nós recursivamente
+    # Adiciona os nós
     add_node(graph, ast_data)
 
     # Renderiza o grafo
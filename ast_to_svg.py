@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Visualização da AST JSON em SVG, em Python puro (sem graphviz).
+
+Para que ASTs enormes continuem legíveis (e rápidas de desenhar), a árvore
+é percorrida em largura e só os primeiros níveis são desenhados:
+
+- max_nodes: orçamento de nós desenhados. Quando os filhos de um nó não
+  cabem no orçamento, os que sobram viram um único nó "…" com o resumo.
+- max_depth: nós nessa profundidade têm a subárvore dobrada.
+- fold_types: tipos sempre dobrados (ex.: ('BinOp',) para esconder as
+  expressões).
+
+Um nó dobrado mostra quantos nós ficaram escondidos e os tipos mais comuns
+entre eles (ex.: "▸ 120 nós: 40 Assign, 38 BinOp, 30 Var"). O layout
+(subárvores lado a lado, pai centralizado sobre os filhos) e o SVG só
+tratam dos nós desenhados, e a contagem dos escondidos para em
+max_counted nós, então o tempo de desenho não cresce com a AST.
+
+Uso:
+    python ast_to_svg.py export/ast.json export/ast.svg [max_nós] [profundidade]
+"""
+
+import json
+import sys
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import List, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape
+
+from ast_to_png import NODE_COLORS, node_label, _json_children
+
+DEFAULT_MAX_NODES = 400
+DEFAULT_MAX_COUNTED = 50000
+FOLDED_COLOR = '#EEEEEE'
+
+# Medidas do desenho (px)
+CHAR_WIDTH = 7
+LINE_HEIGHT = 14
+PADDING = 6
+H_GAP = 12
+V_GAP = 36
+MARGIN = 10
+
+
+@dataclass
+class VisualNode:
+    """Nó desenhado: rótulo, ligação com o pai e posição calculada pelo layout"""
+    label: List[str]
+    color: str
+    edge: str = ''
+    depth: int = 0
+    children: List['VisualNode'] = field(default_factory=list)
+    hidden: int = 0  # nós escondidos abaixo deste (mínimo, se a contagem foi limitada)
+    x: float = 0.0   # centro
+    y: float = 0.0   # topo
+    width: float = 0.0
+    span: float = 0.0  # largura da subárvore desenhada
+
+
+def _hidden_summary(roots, limit: int) -> Tuple[int, List[str]]:
+    """
+    Quantidade de nós nas subárvores de `roots` (contando no máximo `limit`)
+    e uma linha com os tipos mais comuns
+    """
+    counts = Counter()
+    stack = list(roots)
+    total = 0
+    while stack and total < limit:
+        node = stack.pop()
+        if isinstance(node, dict):
+            counts[node.get('type', 'Unknown')] += 1
+            total += 1
+        stack.extend(child for child, _ in _json_children(node, None))
+    if stack and not total:
+        return 0, ["▸ subárvore não contada"]
+    common = ', '.join(f"{n} {kind}" for kind, n in counts.most_common(3))
+    amount = f"{total}+" if stack else f"{total}"
+    return total, [f"▸ {amount} nós: {common}"]
+
+
+def _visual(node, edge: str, depth: int) -> VisualNode:
+    if isinstance(node, dict):
+        return VisualNode(node_label(node), NODE_COLORS.get(node.get('type'), '#FFFFFF'), edge, depth)
+    return VisualNode(['[lista]'], '#FFFFFF', edge, depth)
+
+
+def fold_ast(data, max_depth: Optional[int] = None, max_nodes: int = DEFAULT_MAX_NODES,
+             fold_types=(), max_counted: int = DEFAULT_MAX_COUNTED) -> List[VisualNode]:
+    """
+    Seleciona os nós a desenhar (em largura, até o orçamento) e dobra o
+    resto. Retorna os nós desenhados em ordem de largura (a raiz primeiro).
+    Os resumos das dobras contam no máximo `max_counted` nós no total;
+    depois disso as contagens aparecem como mínimos ("5000+ nós").
+    """
+    fold_types = set(fold_types)
+    budget = [max_counted]
+
+    def summary(roots):
+        hidden, lines = _hidden_summary(roots, budget[0])
+        budget[0] -= hidden
+        return hidden, lines
+    root = _visual(data, '', 0)
+    nodes = [root]
+    queue = deque([(data, root)])
+    while queue:
+        node, visual = queue.popleft()
+        children = _json_children(node, None)
+        if not children:
+            continue
+        node_type = node.get('type') if isinstance(node, dict) else None
+        room = max_nodes - len(nodes)
+        if (node_type in fold_types or room <= 0
+                or (max_depth is not None and visual.depth >= max_depth)):
+            visual.hidden, lines = summary(child for child, _ in children)
+            visual.label += lines
+            continue
+
+        rest = []
+        if len(children) > room:
+            # Mostra os primeiros filhos e resume os demais em um nó "…"
+            children, rest = children[:room - 1], [child for child, _ in children[room - 1:]]
+        depth = visual.depth + 1
+        for child, (_, edge) in children:
+            child_visual = _visual(child, edge, depth)
+            visual.children.append(child_visual)
+            nodes.append(child_visual)
+            queue.append((child, child_visual))
+        if rest:
+            hidden, lines = summary(rest)
+            folded = VisualNode([f"… +{len(rest)} filhos"] + lines, FOLDED_COLOR, '', depth, hidden=hidden)
+            visual.children.append(folded)
+            nodes.append(folded)
+    return nodes
+
+
+def layout_tree(nodes: List[VisualNode]) -> Tuple[float, float]:
+    """
+    Posiciona os nós (em ordem de largura, como fold_ast os retorna): cada
+    subárvore ocupa uma faixa horizontal própria e o pai fica centralizado
+    sobre os filhos. Retorna (largura, altura) do desenho.
+    """
+    if not nodes:
+        return 2 * MARGIN, 2 * MARGIN
+    lines = max(len(node.label) for node in nodes)
+    level_height = lines * LINE_HEIGHT + 2 * PADDING + V_GAP
+
+    # Larguras de baixo para cima: filhos sempre vêm depois do pai na lista
+    for node in reversed(nodes):
+        node.width = max(len(line) for line in node.label) * CHAR_WIDTH + 2 * PADDING
+        children_span = sum(child.span for child in node.children) + H_GAP * (len(node.children) - 1)
+        node.span = max(node.width, children_span)
+
+    # Posições de cima para baixo
+    root = nodes[0]
+    root.x = MARGIN + root.span / 2
+    height = 0.0
+    for node in nodes:
+        node.y = MARGIN + node.depth * level_height
+        height = max(height, node.y)
+        if node.children:
+            total = sum(child.span for child in node.children) + H_GAP * (len(node.children) - 1)
+            left = node.x - total / 2
+            for child in node.children:
+                child.x = left + child.span / 2
+                left += child.span + H_GAP
+    return root.span + 2 * MARGIN, height + level_height - V_GAP + MARGIN
+
+
+def write_svg(nodes: List[VisualNode], out: TextIO):
+    """Calcula o layout e escreve o SVG em `out` (arestas primeiro, nós por cima)"""
+    width, height = layout_tree(nodes)
+    box_height = max((len(node.label) for node in nodes), default=1) * LINE_HEIGHT + 2 * PADDING
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+              f'font-family="Arial" font-size="11">\n')
+    for node in nodes:
+        bottom = node.y + box_height
+        for child in node.children:
+            out.write(f'<line x1="{node.x:.1f}" y1="{bottom:.1f}" x2="{child.x:.1f}" y2="{child.y:.1f}" '
+                      f'stroke="#888"/>\n')
+            if child.edge:
+                out.write(f'<text x="{(node.x + child.x) / 2:.1f}" y="{(bottom + child.y) / 2:.1f}" '
+                          f'font-size="9" fill="#555" text-anchor="middle">{escape(child.edge)}</text>\n')
+    for node in nodes:
+        dashed = ' stroke-dasharray="4 2"' if node.hidden else ''
+        out.write(f'<rect x="{node.x - node.width / 2:.1f}" y="{node.y:.1f}" width="{node.width:.1f}" '
+                  f'height="{box_height}" fill="{node.color}" stroke="#333"{dashed}/>\n')
+        out.write(f'<text x="{node.x:.1f}" y="{node.y + PADDING:.1f}" text-anchor="middle">')
+        for line in node.label:
+            out.write(f'<tspan x="{node.x:.1f}" dy="{LINE_HEIGHT}">{escape(line)}</tspan>')
+        out.write('</text>\n')
+    out.write('</svg>\n')
+
+
+def create_svg_visualization(json_file, output_file='export/ast.svg', max_depth=None,
+                             max_nodes=DEFAULT_MAX_NODES, fold_types=(), max_counted=DEFAULT_MAX_COUNTED):
+    """
+    Cria uma visualização SVG da AST a partir de um arquivo JSON.
+
+    Args:
+        json_file: Caminho para o arquivo JSON da AST
+        output_file: Caminho para o arquivo SVG de saída
+        max_depth: Profundidade a partir da qual as subárvores são dobradas
+        max_nodes: Número máximo de nós desenhados
+        fold_types: Tipos de nó sempre dobrados (ex.: ('BinOp',))
+        max_counted: Limite de nós contados nos resumos das dobras
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        ast_data = json.load(f)
+
+    nodes = fold_ast(ast_data, max_depth, max_nodes, fold_types, max_counted)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        write_svg(nodes, f)
+
+    hidden = sum(node.hidden for node in nodes)
+    print(f"Árvore AST gerada com sucesso: {output_file} ({len(nodes)} nós, {hidden} dobrados)")
+
+
+if __name__ == '__main__':
+    # Usa argumentos da linha de comando ou valores padrão
+    json_file = sys.argv[1] if len(sys.argv) > 1 else 'export/ast.json'
+    output_file = sys.argv[2] if len(sys.argv) > 2 else 'export/ast.svg'
+    max_nodes = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_MAX_NODES
+    max_depth = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    create_svg_visualization(json_file, output_file, max_depth, max_nodes)
@@ -0,0 +1,814 @@
+"""
+Benchmarks do Compilador Pascal Simplificado.
+
+Gera programas Pascal sintéticos grandes e mede tempo e memória das etapas
+do compilador.
+
+Uso:
+    python benchmarks.py              # executa todos os benchmarks
+    python benchmarks.py tokens       # executa apenas o grupo indicado
+"""
+
+import gc
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+from lexer import Lexer, LexerError
+from parser import Parser, StreamingParser
+from dfa_scanner import DFALexer
+from incremental import IncrementalSession
+
+
+# ==========================================
+# PROGRAMAS SINTÉTICOS
+# ==========================================
+
+def gerar_programa(n_funcoes: int = 200, comandos: int = 20) -> str:
+    """
+    Gera um programa Pascal válido (léxica, sintática e semanticamente)
+    com `n_funcoes` funções, cada uma com um laço de `comandos` comandos.
+    """
+    linhas = [
+        '{# Programa sintético gerado para benchmarks #}',
+        'program sintetico;',
+        'var',
+        '  x, y, total : integer;',
+        '  media : real;',
+    ]
+    for f in range(n_funcoes):
+        linhas += [
+            f'function f{f}(a: integer; b: integer) : integer;',
+            'var',
+            '  i, acc : integer;',
+            'begin',
+            '  acc := a;',
+            '  i := 0;',
+            '  while i < b do',
+            '  begin',
+        ]
+        for c in range(comandos):
+            if c % 4 == 3:
+                linhas.append(f'    if acc > {c * 10} then acc := acc - {c} else acc := acc + a;')
+            else:
+                linhas.append(f'    acc := acc + i * {c + 1} - (a + b) / 2;')
+        linhas += [
+            '    i := i + 1;',
+            '  end;',
+            f'  f{f} := acc;',
+            'end;',
+        ]
+    linhas += ['begin', '  x := 3;', '  y := 4;', '  total := 0;']
+    for f in range(n_funcoes):
+        linhas.append(f'  total := total + f{f}(x, y);')
+    linhas += ['  media := total / 2.5;', '  write("total:");', '  write(total);', 'end.', '']
+    return '\n'.join(linhas)
+
+
+def gerar_configuracao(n_trechos: int = 1000) -> str:
+    """
+    Gera um programa principal com constantes de configuração (debug, modo,
+    limite) testadas em `n_trechos` ifs e whiles: os ramos que dependem
+    delas nunca executam.
+    """
+    linhas = [
+        '{# Programa sintético com constantes de configuração #}',
+        'program configuracao;',
+        'var',
+        '  debug, nivel, modo, limite, total, i : integer;',
+        'begin',
+        '  debug := 0;',
+        '  nivel := 3;',
+        '  modo := 2;',
+        '  limite := 4;',
+        '  total := 0;',
+    ]
+    for t in range(n_trechos):
+        if t % 3 == 0:
+            linhas += ['  if debug = 1 then',
+                       f'  begin write({t}); total := total + {t}; end',
+                       f'  else total := total + nivel * {t};']
+        elif t % 3 == 1:
+            linhas.append('  if modo > 1 then nivel := 3 else nivel := nivel + 1;')
+        else:
+            linhas += ['  i := 0;',
+                       '  while i < limite do',
+                       '  begin',
+                       f'    if debug > 0 then write(i) else total := total + nivel * limite + {t};',
+                       '    i := i + 1;',
+                       '  end;']
+    linhas += ['  write(total);', 'end.', '']
+    return '\n'.join(linhas)
+
+
+# ==========================================
+# MEDIÇÃO
+# ==========================================
+
+def medir_tempo(func, repeticoes: int = 3) -> float:
+    """Retorna o melhor tempo (em segundos) entre algumas execuções."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def medir_memoria(func):
+    """Executa func e retorna (resultado, bytes retidos pelo resultado, pico em bytes)."""
+    tracemalloc.start()
+    try:
+        resultado = func()
+        atual, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, atual, pico
+
+
+def mb(n_bytes: int) -> str:
+    return f"{n_bytes / (1024 * 1024):8.2f} MB"
+
+
+# ==========================================
+# BENCHMARKS
+# ==========================================
+
+def bench_tokens():
+    """Lista de Token vs TokenBuffer: memória retida e vazão do léxico + parser."""
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    print(f"\nPrograma sintético: {len(codigo)} caracteres")
+
+    lista, mem_lista, pico_lista = medir_memoria(lambda: list(Lexer(codigo).tokenize()))
+    buffer, mem_buffer, pico_buffer = medir_memoria(lambda: Lexer(codigo).tokenize_buffer())
+    n = len(lista)
+    print(f"Tokens: {n}")
+
+    print(f"\n{'':<22} {'RETIDO':>12} {'PICO':>12} {'BYTES/TOKEN':>12}")
+    print(f"{'List[Token]':<22} {mb(mem_lista):>12} {mb(pico_lista):>12} {mem_lista / n:12.1f}")
+    print(f"{'TokenBuffer':<22} {mb(mem_buffer):>12} {mb(pico_buffer):>12} {mem_buffer / n:12.1f}")
+
+    t_lista = medir_tempo(lambda: list(Lexer(codigo).tokenize()))
+    t_buffer = medir_tempo(lambda: Lexer(codigo).tokenize_buffer())
+    p_lista = medir_tempo(lambda: Parser(lista).parse(), repeticoes=1)
+    p_buffer = medir_tempo(lambda: Parser(buffer).parse(), repeticoes=1)
+
+    print(f"\n{'':<22} {'LÉXICO':>12} {'TOKENS/S':>12} {'PARSER':>12}")
+    print(f"{'List[Token]':<22} {t_lista:11.3f}s {n / t_lista:12.0f} {p_lista:11.3f}s")
+    print(f"{'TokenBuffer':<22} {t_buffer:11.3f}s {n / t_buffer:12.0f} {p_buffer:11.3f}s")
+
+
+def bench_lexer():
+    """Lexer por regex (referência) vs DFALexer (tabela): tokens por segundo."""
+    entradas = [(caminho, open(caminho, encoding='utf-8').read())
+                for caminho in sorted(glob.glob('exemplo*.pas'))]
+    for n_funcoes in (400, 1600):
+        codigo = gerar_programa(n_funcoes=n_funcoes, comandos=25)
+        entradas.append((f'sintético {len(codigo) / 1e6:.1f} MB', codigo))
+
+    print(f"\n{'ENTRADA':<26} {'TOKENS':>9} {'REGEX TOK/S':>13} {'DFA TOK/S':>13} {'DFA/REGEX':>10}")
+    print("-" * 75)
+    for nome, codigo in entradas:
+        try:
+            n = len(list(Lexer(codigo).tokenize()))
+        except LexerError:
+            continue
+        repeticoes = 200 if len(codigo) < 10000 else 1
+        t_regex = medir_tempo(lambda: list(Lexer(codigo).tokenize()), repeticoes)
+        t_dfa = medir_tempo(lambda: list(DFALexer(codigo).tokenize()), repeticoes)
+        print(f"{nome:<26} {n:>9} {n / t_regex:>13.0f} {n / t_dfa:>13.0f} {t_regex / t_dfa:>9.2f}x")
+
+
+def bench_paralelo():
+    """Lexer serial vs tokenize_parallel em um programa sintético grande."""
+    codigo = gerar_programa(n_funcoes=3200, comandos=25)
+    workers = os.cpu_count() or 1
+    print(f"\nPrograma sintético: {len(codigo) / 1e6:.1f} MB, {workers} CPU(s)")
+    t_serial = medir_tempo(lambda: list(Lexer(codigo).tokenize()), repeticoes=1)
+    print(f"{'serial':<24} {t_serial:8.3f}s")
+    for n in sorted({2, workers}):
+        t_par = medir_tempo(lambda: list(Lexer(codigo).tokenize_parallel(workers=n)), repeticoes=1)
+        print(f"{f'paralelo ({n} processos)':<24} {t_par:8.3f}s  ({t_serial / t_par:.2f}x)")
+
+
+def bench_incremental():
+    """Latência de uma edição pequena: IncrementalSession vs compilação completa."""
+    print(f"\n{'FUNÇÕES':>8} {'CARACTERES':>11} {'COMPLETA':>10} {'INCREMENTAL':>12} {'REANÁLISE':>11}")
+    tempos = []
+    for n_funcoes in (50, 200, 800):
+        sessao = IncrementalSession(gerar_programa(n_funcoes=n_funcoes, comandos=25))
+        alvo = sessao.source.index('acc := acc + i * 7', len(sessao.source) // 2)
+
+        def completa():
+            Parser(list(Lexer(sessao.source).tokenize())).parse_program()
+
+        valores = iter(range(10 ** 6))
+
+        def incremental():
+            # Troca o literal '7' por outro de mesmo tamanho a cada execução
+            sessao.edit(alvo + 17, alvo + 18, str(next(valores) % 10))
+
+        t_completa = medir_tempo(completa, repeticoes=1)
+        gc.collect()
+        gc.freeze()  # a AST da sessão não entra nas coletas feitas durante a edição
+        try:
+            t_incremental = medir_tempo(incremental, repeticoes=50)
+        finally:
+            gc.unfreeze()
+        tempos.append(t_incremental)
+        print(f"{n_funcoes:>8} {len(sessao.source):>11} {t_completa * 1000:>8.1f}ms "
+              f"{t_incremental * 1000:>10.2f}ms {sessao.last_reparse:>11}")
+
+    # A mesma edição num arquivo 16x maior: o tempo fica praticamente estável
+    # (só a cópia do código-fonte, em C, cresce com o arquivo)
+    print(f"\nEdição no maior arquivo / no menor: {tempos[-1] / tempos[0]:.2f}x")
+
+
+def bench_streaming():
+    """Pico de memória: Parser sobre lista de tokens vs StreamingParser sobre o gerador."""
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    print(f"\nPrograma sintético: {len(codigo)} caracteres")
+
+    ast, mem_ast, _ = medir_memoria(lambda: Parser(list(Lexer(codigo).tokenize())).parse())
+    del ast
+    _, _, pico_lista = medir_memoria(lambda: Parser(list(Lexer(codigo).tokenize())).parse())
+    _, _, pico_stream = medir_memoria(lambda: StreamingParser(Lexer(codigo).tokenize()).parse())
+    t_lista = medir_tempo(lambda: Parser(list(Lexer(codigo).tokenize())).parse(), repeticoes=1)
+    t_stream = medir_tempo(lambda: StreamingParser(Lexer(codigo).tokenize()).parse(), repeticoes=1)
+
+    print(f"\n{'':<28} {'PICO':>12} {'TEMPO':>10}")
+    print(f"{'AST resultante (retida)':<28} {mb(mem_ast):>12}")
+    print(f"{'Parser(list(tokens))':<28} {mb(pico_lista):>12} {t_lista:>9.3f}s")
+    print(f"{'StreamingParser(gerador)':<28} {mb(pico_stream):>12} {t_stream:>9.3f}s")
+
+
+class _SemMemoizacao(dict):
+    """Tabela de tipos que nunca guarda nada: reproduz a inferência sem memoização."""
+    def __setitem__(self, chave, valor):
+        pass
+
+
+def gerar_chamadas_aninhadas(profundidade: int) -> str:
+    """Programa com uma atribuição x := f(f(...f(1)...)) de `profundidade` chamadas."""
+    return '\n'.join([
+        'program aninhado;',
+        'var x : integer;',
+        'function f(a: integer) : integer;',
+        'begin',
+        '  f := a + 1;',
+        'end;',
+        'begin',
+        '  x := ' + 'f(' * profundidade + '1' + ')' * profundidade + ';',
+        'end.',
+    ])
+
+
+def bench_tipos():
+    """Inferência de tipos em chamadas aninhadas: memoizada vs sem memoização."""
+    # Cada nível de chamada usa alguns quadros da descida recursiva
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50000))
+
+    def analisar(tokens, memoizar):
+        parser = Parser(tokens)
+        if not memoizar:
+            parser.expr_types = _SemMemoizacao()
+        parser.parse()
+
+    print(f"\n{'PROFUNDIDADE':>12} {'MEMOIZADA':>11} {'SEM MEMO':>11} {'SEM/COM':>9}")
+    for profundidade in (100, 200, 400, 800, 1600):
+        tokens = list(Lexer(gerar_chamadas_aninhadas(profundidade)).tokenize())
+        t_memo = medir_tempo(lambda: analisar(tokens, True))
+        t_sem = medir_tempo(lambda: analisar(tokens, False), repeticoes=1)
+        print(f"{profundidade:>12} {t_memo * 1000:>9.2f}ms {t_sem * 1000:>9.2f}ms {t_sem / t_memo:>8.1f}x")
+
+
+def gerar_expressoes(n_linhas: int, termos: int, aninhamento: int = 0) -> str:
+    """
+    Programa com `n_linhas` atribuições de `termos` termos cada; com
+    `aninhamento` > 0, cada atribuição é envolvida nesse número de parênteses.
+    """
+    linhas = ['program expressoes;', 'var a, b, c, x : integer;', 'begin']
+    for i in range(n_linhas):
+        termos_linha = ' + '.join(f'(a * {i + t} - b / 2)' for t in range(termos))
+        linhas.append(f'  x := {"(" * aninhamento}{termos_linha}{")" * aninhamento};')
+    linhas += ['end.', '']
+    return '\n'.join(linhas)
+
+
+def bench_expressoes():
+    """Expressões: descida recursiva vs precedence climbing iterativo."""
+    entradas = [
+        ('sintético (400 funções)', gerar_programa(n_funcoes=400, comandos=25)),
+        ('linhas de 50 termos', gerar_expressoes(2000, 50)),
+        ('aninhamento 100', gerar_expressoes(2000, 5, aninhamento=100)),
+    ]
+    print(f"\n{'ENTRADA':<26} {'TOKENS':>8} {'RECURSIVO':>11} {'ITERATIVO':>11} {'REC/ITER':>9}")
+    for nome, codigo in entradas:
+        tokens = list(Lexer(codigo).tokenize())
+        t_rec = medir_tempo(lambda: Parser(tokens, recursive_expressions=True).parse())
+        t_iter = medir_tempo(lambda: Parser(tokens).parse())
+        print(f"{nome:<26} {len(tokens):>8} {t_rec:>10.3f}s {t_iter:>10.3f}s {t_rec / t_iter:>8.2f}x")
+
+    print(f"\n{'PARÊNTESES':>10} {'RECURSIVO':>16} {'ITERATIVO':>12}")
+    for aninhamento in (100, 1000, 10000):
+        tokens = list(Lexer(gerar_expressoes(1, 1, aninhamento)).tokenize())
+        resultados = []
+        for recursivo in (True, False):
+            try:
+                tempo = medir_tempo(lambda: Parser(tokens, recursive_expressions=recursivo).parse(), 1)
+                resultados.append(f"{tempo * 1000:.2f}ms")
+            except RecursionError:
+                resultados.append('RecursionError')
+        print(f"{aninhamento:>10} {resultados[0]:>16} {resultados[1]:>12}")
+
+
+def bench_walker():
+    """Percurso com pilha explícita (walker.run/walk) vs as mesmas visitas recursivas."""
+    import ast_exporter
+    import tac_generator
+    import walker
+    from ast_exporter import ast_to_dict, DotExporter
+    from tac_generator import TACGenerator
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    parser = Parser(list(Lexer(codigo).tokenize()))
+    ast = parser.parse()
+
+    def dot():
+        exportador = DotExporter()
+        ast_exporter.walk(ast, exportador._visit)
+
+    etapas = [
+        ('TACGenerator', lambda: TACGenerator(parser.bindings).generate(ast), tac_generator, 'run'),
+        ('ast_to_dict', lambda: ast_to_dict(ast), ast_exporter, 'walk'),
+        ('DotExporter', dot, ast_exporter, 'walk'),
+    ]
+    print(f"\nPrograma sintético: {len(codigo)} caracteres")
+    print(f"\n{'':<16} {'RECURSIVO':>11} {'PILHA':>11} {'PILHA/REC':>10}")
+    gc.disable()  # coletas no meio das medições distorcem a comparação
+    try:
+        for nome, func, modulo, atributo in etapas:
+            explicito = getattr(modulo, atributo)
+            recursivo = getattr(walker, atributo + '_recursive')
+            tempos = {explicito: float('inf'), recursivo: float('inf')}
+            # Alterna as versões para que as duas sofram o mesmo ruído
+            for _ in range(5):
+                for versao in tempos:
+                    setattr(modulo, atributo, versao)
+                    tempos[versao] = min(tempos[versao], medir_tempo(func, repeticoes=1))
+            setattr(modulo, atributo, explicito)
+            t_rec, t_pilha = tempos[recursivo], tempos[explicito]
+            print(f"{nome:<16} {t_rec:>10.3f}s {t_pilha:>10.3f}s {t_pilha / t_rec:>9.2f}x")
+    finally:
+        gc.enable()
+
+
+def bench_nos():
+    """AST de objetos (dataclasses com __slots__) vs ASTArena: bytes por nó e tempo do TAC."""
+    import copy
+    from ast_arena import ASTArena
+    from tac_generator import TACGenerator
+    from walker import node_children, walk
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    ast = Parser(list(Lexer(codigo).tokenize())).parse()
+    contagem = [0]
+
+    def contar(node, _):
+        contagem[0] += 1
+        return node_children(node)
+
+    walk(ast, contar)
+    n = contagem[0]
+    # A cópia profunda retém só os nós e listas (strings e números são compartilhados)
+    _, mem_objetos, _ = medir_memoria(lambda: copy.deepcopy(ast))
+    arena, mem_arena, _ = medir_memoria(lambda: ASTArena.from_ast(ast))
+    print(f"\nPrograma sintético: {len(codigo)} caracteres, {n} nós")
+
+    t_objetos = medir_tempo(lambda: TACGenerator().generate(ast))
+    t_arena = medir_tempo(lambda: TACGenerator().generate(arena.node(arena.root)))
+    print(f"\n{'':<22} {'RETIDO':>12} {'BYTES/NÓ':>10} {'TAC':>10}")
+    print(f"{'Objetos':<22} {mb(mem_objetos):>12} {mem_objetos / n:10.1f} {t_objetos:9.3f}s")
+    print(f"{'ASTArena':<22} {mb(mem_arena):>12} {mem_arena / n:10.1f} {t_arena:9.3f}s")
+    print(f"{'ASTArena.nbytes()':<22} {mb(arena.nbytes()):>12} {arena.nbytes() / n:10.1f}")
+
+
+def bench_hashcons():
+    """AST (árvore) vs DAG por hash-consing: nós distintos, memória, parse e TAC."""
+    from tac_generator import TACGenerator
+    from walker import node_children, walk
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    tokens = list(Lexer(codigo).tokenize())
+    print(f"\nPrograma sintético: {len(codigo)} caracteres")
+
+    print(f"\n{'':<22} {'NÓS':>9} {'RETIDO':>12} {'PARSER':>9} {'TAC':>9} {'INSTRUÇÕES':>11}")
+    for nome, hash_cons in (('Árvore', False), ('DAG (hash_cons)', True)):
+        parser, retido, _ = medir_memoria(lambda: Parser(tokens, hash_cons=hash_cons))
+        ast, mem_ast, _ = medir_memoria(parser.parse)
+        distintos = {}
+
+        def contar(node, _):
+            distintos[id(node)] = node
+            return node_children(node)
+
+        walk(ast, contar)
+        t_parser = medir_tempo(lambda: Parser(tokens, hash_cons=hash_cons).parse())
+        gerar = lambda: TACGenerator(parser.bindings, reuse_shared=hash_cons).generate(ast)
+        t_tac = medir_tempo(gerar)
+        print(f"{nome:<22} {len(distintos):>9} {mb(retido + mem_ast):>12} "
+              f"{t_parser:>8.3f}s {t_tac:>8.3f}s {len(gerar()):>11}")
+
+
+def bench_binario():
+    """AST em JSON (export_ast_to_json) vs formato binário (ast_binary): tamanho, gravação e leitura."""
+    import contextlib
+    import io
+    import json
+    import tempfile
+    from ast_binary import load_ast, save_ast
+    from ast_exporter import export_ast_to_json
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    t_parse = medir_tempo(lambda: Parser(list(Lexer(codigo).tokenize())).parse(), repeticoes=1)
+    ast = Parser(list(Lexer(codigo).tokenize())).parse()
+    print(f"\nPrograma sintético: {len(codigo)} caracteres (léxico + parser: {t_parse:.3f}s)")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_json = os.path.join(pasta, 'ast.json')
+        caminho_bin = os.path.join(pasta, 'ast.bin')
+        with contextlib.redirect_stdout(io.StringIO()):
+            t_grava_json = medir_tempo(lambda: export_ast_to_json(ast, caminho_json), repeticoes=1)
+        t_grava_bin = medir_tempo(lambda: save_ast(ast, caminho_bin), repeticoes=1)
+
+        def ler_json():
+            with open(caminho_json, encoding='utf-8') as f:
+                return json.load(f)
+
+        def ler_bin():
+            with load_ast(caminho_bin) as arquivo:
+                return arquivo.tree()
+
+        def abrir_bin():
+            load_ast(caminho_bin).close()
+
+        t_le_json = medir_tempo(ler_json)
+        t_le_bin = medir_tempo(ler_bin)
+        t_abre_bin = medir_tempo(abrir_bin)
+        tamanhos = os.path.getsize(caminho_json), os.path.getsize(caminho_bin)
+
+    print(f"\n{'':<14} {'ARQUIVO':>12} {'GRAVAÇÃO':>10} {'LEITURA':>10}")
+    print(f"{'JSON':<14} {mb(tamanhos[0]):>12} {t_grava_json:>9.3f}s {t_le_json:>9.3f}s  (só dicionários)")
+    print(f"{'Binário':<14} {mb(tamanhos[1]):>12} {t_grava_bin:>9.3f}s {t_le_bin:>9.3f}s  (nós da AST)")
+    print(f"{'Binário (mmap)':<14} {'':>12} {'':>10} {t_abre_bin:>9.3f}s  (abrir, nós sob demanda)")
+
+
+def bench_cache():
+    """Compilação completa sem cache (fria) vs reaproveitada do PipelineCache (quente)."""
+    import tempfile
+    from pipeline_cache import PipelineCache
+
+    entradas = [('exemplo3.pas', open('exemplo3.pas', encoding='utf-8').read()),
+                ('sintético', gerar_programa(n_funcoes=400, comandos=25))]
+    print(f"\n{'':<14} {'FRIA':>10} {'QUENTE':>10} {'+ TAC':>10} {'+ AST':>10} {'ENTRADA':>12}")
+    for nome, codigo in entradas:
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = PipelineCache(pasta)
+            t_fria = medir_tempo(lambda: cache.compile(codigo), repeticoes=1)
+            t_quente = medir_tempo(lambda: cache.compile(codigo))
+            # Artefatos são decodificados só quando usados
+            t_tac = medir_tempo(lambda: cache.compile(codigo).tac)
+            t_ast = medir_tempo(lambda: cache.compile(codigo).ast)
+            tamanho = sum(stat.st_size for stat in cache.entries().values())
+        print(f"{nome:<14} {t_fria:>9.3f}s {t_quente * 1000:>8.2f}ms {t_tac * 1000:>8.1f}ms "
+              f"{t_ast * 1000:>8.1f}ms {mb(tamanho):>12}")
+
+
+def bench_exportacao():
+    """Exportadores que montam a saída em memória vs exportadores em streaming: pico de memória e tempo."""
+    import json
+    import tempfile
+    from ast_exporter import ast_to_dict, DotExporter, write_ast_json
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    ast = Parser(list(Lexer(codigo).tokenize())).parse()
+    print(f"\nPrograma sintético: {len(codigo)} caracteres")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'saida')
+
+        def json_dicionario():
+            with open(caminho, 'w', encoding='utf-8') as f:
+                json.dump(ast_to_dict(ast), f, indent=2, ensure_ascii=False)
+
+        def json_streaming(indent=2):
+            with open(caminho, 'w', encoding='utf-8') as f:
+                write_ast_json(ast, f, indent)
+
+        def dot_linhas():
+            dot = DotExporter()
+            dot.write(ast)
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write("\n".join(dot.lines))
+
+        def dot_streaming(compact=False):
+            with open(caminho, 'w', encoding='utf-8') as f:
+                DotExporter(f, compact).write(ast)
+
+        etapas = [
+            ('JSON dicionário', json_dicionario),
+            ('JSON streaming', json_streaming),
+            ('JSON compacto', lambda: json_streaming(None)),
+            ('DOT em memória', dot_linhas),
+            ('DOT streaming', dot_streaming),
+            ('DOT compacto', lambda: dot_streaming(True)),
+        ]
+        print(f"\n{'':<18} {'PICO':>12} {'TEMPO':>9} {'ARQUIVO':>12}")
+        for nome, func in etapas:
+            _, _, pico = medir_memoria(func)
+            tempo = medir_tempo(func, repeticoes=1)
+            print(f"{nome:<18} {mb(pico):>12} {tempo:>8.3f}s {mb(os.path.getsize(caminho)):>12}")
+
+
+def bench_carregamento():
+    """Lexer + parser do código-fonte vs carregar a AST do export/ast.json, até o TAC."""
+    import json
+    import tempfile
+    from ast_exporter import dict_to_ast, load_ast_from_json, write_ast_json
+    from tac_generator import TACGenerator
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    ast = Parser(list(Lexer(codigo).tokenize())).parse()
+    print(f"\nPrograma sintético: {len(codigo)} caracteres")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'ast.json')
+        with open(caminho, 'w', encoding='utf-8') as f:
+            write_ast_json(ast, f)
+
+        def do_fonte():
+            return Parser(Lexer(codigo).tokenize_buffer()).parse()
+
+        def json_load():
+            with open(caminho, encoding='utf-8') as f:
+                return json.load(f)
+
+        dados = json_load()
+        etapas = [
+            ('lexer + parser', do_fonte),
+            ('json.load', json_load),
+            ('dict_to_ast', lambda: dict_to_ast(dados)),
+            ('JSON -> AST', lambda: load_ast_from_json(caminho)),
+            ('JSON -> AST + TAC', lambda: TACGenerator().generate(load_ast_from_json(caminho))),
+            ('fonte -> AST + TAC', lambda: TACGenerator().generate(do_fonte())),
+        ]
+        print(f"\n{'':<20} {'TEMPO':>9}")
+        for nome, func in etapas:
+            print(f"{nome:<20} {medir_tempo(func):>8.3f}s")
+
+
+def bench_visualizacao():
+    """SVG com orçamento de nós: tempo de fold + layout + escrita conforme a AST cresce."""
+    import io
+    from ast_exporter import ast_to_dict
+    from ast_to_svg import fold_ast, write_svg
+    from walker import node_children, walk
+
+    print(f"\n{'FUNÇÕES':>8} {'NÓS NA AST':>11} {'DESENHADOS':>11} {'TEMPO':>9} {'SEM BinOp':>10} {'SVG':>10}")
+    for n_funcoes in (50, 200, 800):
+        ast = Parser(list(Lexer(gerar_programa(n_funcoes, 25)).tokenize())).parse()
+        dados = ast_to_dict(ast)
+        total = [0]
+
+        def contar(node, _):
+            total[0] += 1
+            return node_children(node)
+
+        walk(ast, contar)
+        saida = io.StringIO()
+
+        def desenhar(fold_types=()):
+            saida.seek(0)
+            saida.truncate()
+            nos = fold_ast(dados, fold_types=fold_types)
+            write_svg(nos, saida)
+            return nos
+
+        nos = desenhar()
+        tempo = medir_tempo(desenhar)
+        tempo_binop = medir_tempo(lambda: desenhar(('BinOp',)))
+        print(f"{n_funcoes:>8} {total[0]:>11} {len(nos):>11} {tempo:>8.3f}s {tempo_binop:>9.3f}s "
+              f"{mb(len(saida.getvalue())):>10}")
+
+
+def bench_tac():
+    """TAC em listas de TACInstruction vs PackedTAC: geração e otimização (tempo e memória)."""
+    from optimizer import optimize_tac
+    from tac_generator import TACGenerator
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    parser = Parser(list(Lexer(codigo).tokenize()))
+    ast = parser.parse()
+    print(f"\nPrograma sintético: {len(codigo)} caracteres")
+
+    gc.collect()
+    gc.freeze()  # a AST não entra nas coletas feitas durante as medições
+    try:
+        print(f"\n{'':<16} {'GERAÇÃO':>9} {'RETIDO':>12} {'OTIMIZAÇÃO':>11} {'PICO':>12} {'INSTRUÇÕES':>11}")
+        for nome, packed in (('TACInstruction', False), ('PackedTAC', True)):
+            gerar = lambda: TACGenerator(parser.bindings, packed=packed).generate(ast)
+            codigo_tac, retido, _ = medir_memoria(gerar)
+            t_gerar = medir_tempo(gerar, repeticoes=5)
+            otimizar = lambda: optimize_tac(codigo_tac, verbose=False)
+            otimizado, _, pico = medir_memoria(otimizar)
+            t_otimizar = medir_tempo(otimizar)
+            print(f"{nome:<16} {t_gerar:>8.3f}s {mb(retido):>12} {t_otimizar:>10.3f}s {mb(pico):>12} "
+                  f"{len(codigo_tac):>5} → {len(otimizado):<5}")
+    finally:
+        gc.unfreeze()
+
+
+def bench_tac_io():
+    """TAC em texto (export_tac) vs binário: tamanho, gravação e carga."""
+    import tempfile
+    from tac_generator import TACGenerator
+    from tac_io import load_tac, save_tac_binary, save_tac_text
+
+    codigo = gerar_programa(n_funcoes=400, comandos=25)
+    parser = Parser(list(Lexer(codigo).tokenize()))
+    ast = parser.parse()
+    instrucoes = TACGenerator(parser.bindings).generate(ast)
+    packed = TACGenerator(parser.bindings, packed=True).generate(ast)
+    print(f"\nPrograma sintético: {len(codigo)} caracteres, {len(instrucoes)} instruções")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"\n{'':<8} {'ARQUIVO':>12} {'GRAVAÇÃO':>9} {'CARGA':>9}")
+        for nome, extensao, salvar, fonte in (('texto', '.tac', save_tac_text, instrucoes),
+                                               ('binário', '.tacb', save_tac_binary, packed)):
+            caminho = os.path.join(pasta, 'codigo' + extensao)
+            t_salvar = medir_tempo(lambda: salvar(fonte, caminho))
+            t_carregar = medir_tempo(lambda: load_tac(caminho))
+            print(f"{nome:<8} {mb(os.path.getsize(caminho)):>12} {t_salvar:>8.3f}s {t_carregar:>8.3f}s")
+
+        t_gerar = medir_tempo(lambda: Parser(Lexer(codigo).tokenize_buffer()).parse())
+        print(f"\n(lexer + parser do fonte, para comparação: {t_gerar:.3f}s)")
+
+
+def bench_cfg():
+    """Construção do CFG: tempo por instrução conforme o programa cresce (deve ser linear)."""
+    from cfg import build_cfg
+    from tac_generator import TACGenerator
+
+    print(f"\n{'FUNÇÕES':>8} {'INSTRUÇÕES':>11} {'BLOCOS':>8} {'ARESTAS':>8} {'TEMPO':>9} {'µs/INSTR':>9}")
+    for n_funcoes in (100, 400, 1200):
+        parser = Parser(list(Lexer(gerar_programa(n_funcoes, 25)).tokenize()))
+        codigo = TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+        cfg = build_cfg(codigo)
+        tempo = medir_tempo(lambda: build_cfg(codigo), repeticoes=5)
+        print(f"{n_funcoes:>8} {len(codigo):>11} {len(cfg):>8} {cfg.edge_count():>8} {tempo:>8.3f}s "
+              f"{tempo / len(codigo) * 1e6:>9.2f}")
+
+
+def bench_ssa():
+    """SSA de uma função com milhares de blocos: construção e volta ao TAC (deve ser linear)."""
+    from ssa import build_ssa
+    from tac_generator import TACGenerator
+
+    print(f"\n{'COMANDOS':>9} {'INSTRUÇÕES':>11} {'BLOCOS':>8} {'PHIS':>7} {'SSA':>9} {'VOLTA':>9} "
+          f"{'µs/BLOCO':>9}")
+    gc.collect()
+    gc.freeze()
+    try:
+        for comandos in (1000, 4000, 16000):
+            # Uma função só: um while com um if a cada quatro comandos
+            parser = Parser(list(Lexer(gerar_programa(1, comandos)).tokenize()))
+            codigo = TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+            ssa = build_ssa(codigo)
+            assert list(ssa.to_code()) == list(codigo)
+            t_ssa = medir_tempo(lambda: build_ssa(codigo))
+            t_volta = medir_tempo(ssa.to_code)
+            blocos = len(ssa.cfg)
+            print(f"{comandos:>9} {len(codigo):>11} {blocos:>8} {ssa.phi_count():>7} {t_ssa:>8.3f}s "
+                  f"{t_volta:>8.3f}s {(t_ssa + t_volta) / blocos * 1e6:>9.1f}")
+    finally:
+        gc.unfreeze()
+
+
+def bench_liveness():
+    """Vivacidade com vetores de bits: passadas até o ponto fixo e atribuições mortas."""
+    from cfg import build_cfg
+    from liveness import Liveness
+    from tac_generator import TACGenerator
+
+    print(f"\n{'FUNÇÕES':>8} {'COMANDOS':>9} {'BLOCOS':>8} {'VARIÁVEIS':>10} {'PASSADAS':>9} "
+          f"{'TEMPO':>9} {'µs/BLOCO':>9} {'MORTAS':>7}")
+    gc.collect()
+    gc.freeze()
+    try:
+        for n_funcoes, comandos in ((1, 4000), (1, 16000), (200, 80)):
+            parser = Parser(list(Lexer(gerar_programa(n_funcoes, comandos)).tokenize()))
+            codigo = TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+            cfg = build_cfg(codigo)
+            liveness = Liveness(cfg)
+            mortas = len(liveness.dead_stores())
+            tempo = medir_tempo(lambda: Liveness(cfg).dead_stores())
+            print(f"{n_funcoes:>8} {comandos:>9} {len(cfg):>8} {len(liveness.variables):>10} "
+                  f"{liveness.sweeps:>9} {tempo:>8.3f}s {tempo / len(cfg) * 1e6:>9.1f} {mortas:>7}")
+    finally:
+        gc.unfreeze()
+
+
+def bench_sccp():
+    """SCCP em um programa com constantes de configuração: instruções que sobram e tempo."""
+    from optimizer import optimize_tac
+    from tac_generator import TACGenerator
+
+    locais = ['constant_folding', 'constant_propagation', 'copy_propagation',
+              'dead_code', 'dead_stores', 'cse']
+    print(f"\n{'TRECHOS':>8} {'INSTRUÇÕES':>11} {'SEM SCCP':>9} {'COM SCCP':>9} "
+          f"{'T. SEM':>9} {'T. COM':>9} {'SÓ SCCP':>9}")
+    gc.collect()
+    gc.freeze()
+    try:
+        for n_trechos in (300, 1000, 3000):
+            parser = Parser(list(Lexer(gerar_configuracao(n_trechos)).tokenize()))
+            codigo = TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+            sem = optimize_tac(codigo, locais, verbose=False)
+            com = optimize_tac(codigo, verbose=False)
+            t_sem = medir_tempo(lambda: optimize_tac(codigo, locais, verbose=False), 1)
+            t_com = medir_tempo(lambda: optimize_tac(codigo, verbose=False), 1)
+            t_sccp = medir_tempo(lambda: optimize_tac(codigo, ['sccp'], verbose=False))
+            print(f"{n_trechos:>8} {len(codigo):>11} {len(sem):>9} {len(com):>9} "
+                  f"{t_sem:>8.3f}s {t_com:>8.3f}s {t_sccp:>8.3f}s")
+    finally:
+        gc.unfreeze()
+
+
+def bench_licm():
+    """LICM: instruções executadas a cada volta dos laços, antes e depois, e tempo do passe."""
+    from cfg import build_cfg
+    from loops import find_loops
+    from optimizer import TACOptimizer
+    from tac_generator import TACGenerator
+
+    def por_volta(codigo):
+        # Instruções nos corpos dos laços (cada laço interno conta uma vez)
+        cfg = build_cfg(codigo)
+        return sum(len(cfg.block_range(b)) for loop in find_loops(cfg) for b in loop.body)
+
+    print(f"\n{'FUNÇÕES':>8} {'COMANDOS':>9} {'INSTRUÇÕES':>11} {'NOS LAÇOS':>10} {'DEPOIS':>8} "
+          f"{'MOVIDAS':>8} {'TEMPO':>9}")
+    gc.collect()
+    gc.freeze()
+    try:
+        for n_funcoes, comandos in ((1, 4000), (1, 16000), (200, 80)):
+            parser = Parser(list(Lexer(gerar_programa(n_funcoes, comandos)).tokenize()))
+            codigo = TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+            otimizador = TACOptimizer(codigo)
+            otimizado = otimizador.optimize(['licm'])
+            movidas = sum(1 for m in otimizador.optimizations_applied if m.startswith('LICM'))
+            tempo = medir_tempo(lambda: TACOptimizer(codigo).optimize(['licm']), 1)
+            print(f"{n_funcoes:>8} {comandos:>9} {len(codigo):>11} {por_volta(codigo):>10} "
+                  f"{por_volta(otimizado):>8} {movidas:>8} {tempo:>8.3f}s")
+    finally:
+        gc.unfreeze()
+
+
+BENCHMARKS = {
+    'tokens': bench_tokens,
+    'lexer': bench_lexer,
+    'paralelo': bench_paralelo,
+    'incremental': bench_incremental,
+    'streaming': bench_streaming,
+    'tipos': bench_tipos,
+    'expressoes': bench_expressoes,
+    'walker': bench_walker,
+    'nos': bench_nos,
+    'hashcons': bench_hashcons,
+    'binario': bench_binario,
+    'cache': bench_cache,
+    'exportacao': bench_exportacao,
+    'carregamento': bench_carregamento,
+    'visualizacao': bench_visualizacao,
+    'tac': bench_tac,
+    'tac_io': bench_tac_io,
+    'cfg': bench_cfg,
+    'ssa': bench_ssa,
+    'liveness': bench_liveness,
+    'sccp': bench_sccp,
+    'licm': bench_licm,
+}
+
+
+if __name__ == '__main__':
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        if nome not in BENCHMARKS:
+            print(f" Benchmark desconhecido: {nome} (opções: {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+        print("\n" + "=" * 70)
+        print(f" BENCHMARK: {nome}")
+        print("=" * 70)
+        BENCHMARKS[nome]()
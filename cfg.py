@@ -0,0 +1,195 @@
+"""
+Blocos básicos e grafo de fluxo de controle (CFG) do TAC.
+
+build_cfg() divide o código (PackedTAC ou lista de TACInstruction) em
+blocos básicos em uma única passada:
+
+- um bloco começa na primeira instrução, em cada LABEL (rótulos
+  consecutivos ficam no mesmo bloco) e depois de JMP/JZ/JNZ/RETURN/HALT;
+- JMP liga o bloco ao rótulo de destino; JZ/JNZ ao bloco seguinte e ao
+  destino; RETURN e HALT encerram o bloco sem sucessores; os demais blocos
+  seguem para o próximo.
+
+CALL não encerra o bloco: a chamada volta para a instrução seguinte, então
+dentro da função ela é uma instrução comum (que pode alterar globais). As
+chamadas ficam em `calls` (grafo de chamadas), separadas das arestas.
+
+Os rótulos FUNC_* e MAIN são as entradas: cada função ocupa os blocos da
+sua entrada até a entrada seguinte (o gerador emite as funções em
+sequência e o programa principal por último).
+
+O CFG guarda só arrays e listas indexadas pelo número do bloco, então
+reconstruí-lo depois de um passe que reescreve o código custa uma passada
+linear. Um passe pode montar o novo código bloco a bloco e chamar
+build_cfg() de novo.
+
+Exemplo:
+    cfg = build_cfg(TACGenerator(packed=True).generate(ast))
+    for name, first, end in cfg.functions:
+        for block in cfg.reverse_postorder(first):
+            for i in cfg.block_range(block):
+                ...
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from tac_packed import Op, PackedTAC
+
+LABEL, JMP, JZ, JNZ = int(Op.LABEL), int(Op.JMP), int(Op.JZ), int(Op.JNZ)
+RETURN, HALT, CALL = int(Op.RETURN), int(Op.HALT), int(Op.CALL)
+# Instruções que encerram um bloco básico
+TERMINATORS = frozenset((JMP, JZ, JNZ, RETURN, HALT))
+ENTRY_PREFIX = 'FUNC_'
+MAIN_LABEL = 'MAIN'
+
+
+class CFGError(ValueError):
+    """TAC com salto para um rótulo que não existe"""
+
+
+class CFG:
+    """
+    Blocos básicos de um PackedTAC e as arestas entre eles.
+
+    - starts[b]:  índice da primeira instrução do bloco b (starts[-1] é o
+                  total de instruções, sentinela do último bloco)
+    - succs[b]:   blocos sucessores (fall-through primeiro)
+    - preds[b]:   blocos predecessores
+    - labels:     id do operando do rótulo -> bloco
+    - entries:    nome da entrada (FUNC_*/MAIN) -> bloco
+    - functions:  (nome da entrada, primeiro bloco, fim exclusivo) em ordem
+    - calls:      (índice do CALL, bloco da entrada chamada ou None)
+    """
+
+    def __init__(self, code: PackedTAC):
+        self.code = code
+        self.starts = array('I')
+        self.succs: List[Tuple[int, ...]] = []
+        self.preds: List[List[int]] = []
+        self.labels: Dict[int, int] = {}
+        self.entries: Dict[str, int] = {}
+        self.functions: List[Tuple[str, int, int]] = []
+        self.calls: List[Tuple[int, Optional[int]]] = []
+
+    def __len__(self) -> int:
+        return len(self.succs)
+
+    def block_range(self, block: int) -> range:
+        """Índices das instruções do bloco"""
+        return range(self.starts[block], self.starts[block + 1])
+
+    def block_of(self, index: int) -> int:
+        """Bloco que contém a instrução `index`"""
+        return bisect_right(self.starts, index, 0, len(self.succs)) - 1
+
+    def function_of(self, block: int) -> Optional[str]:
+        """Nome da entrada da função que contém o bloco (None antes da primeira)"""
+        for name, first, end in self.functions:
+            if first <= block < end:
+                return name
+        return None
+
+    def edge_count(self) -> int:
+        return sum(len(succs) for succs in self.succs)
+
+    def reverse_postorder(self, entry: int) -> List[int]:
+        """Blocos alcançáveis a partir de `entry` em pós-ordem reversa (sem recursão)"""
+        succs = self.succs
+        seen = bytearray(len(succs))
+        seen[entry] = 1
+        order = []
+        stack = [(entry, iter(succs[entry]))]
+        while stack:
+            block, children = stack[-1]
+            for child in children:
+                if not seen[child]:
+                    seen[child] = 1
+                    stack.append((child, iter(succs[child])))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def reachable(self) -> bytearray:
+        """1 para cada bloco alcançável a partir de alguma entrada (ou do bloco 0)"""
+        seen = bytearray(len(self.succs))
+        stack = list(self.entries.values()) or ([0] if self.succs else [])
+        for block in stack:
+            seen[block] = 1
+        while stack:
+            for child in self.succs[stack.pop()]:
+                if not seen[child]:
+                    seen[child] = 1
+                    stack.append(child)
+        return seen
+
+
+def build_cfg(code) -> CFG:
+    """Divide o código em blocos básicos e liga os blocos (tempo linear)"""
+    if not isinstance(code, PackedTAC):
+        code = PackedTAC.from_instructions(code)
+    cfg = CFG(code)
+    ops, a1 = code.ops, code.a1
+    texts = code.operands.texts
+    starts, labels = cfg.starts, cfg.labels
+
+    # Líderes: rótulos (os consecutivos juntos) e instruções após um terminador
+    pending = True       # a próxima instrução começa um bloco
+    only_labels = False  # o bloco atual até aqui só tem rótulos
+    for i, op in enumerate(ops):
+        if op == LABEL:
+            if pending or not only_labels:
+                starts.append(i)
+                pending, only_labels = False, True
+            labels[a1[i]] = len(starts) - 1
+            continue
+        if pending:
+            starts.append(i)
+            pending = False
+        only_labels = False
+        if op in TERMINATORS:
+            pending = True
+        elif op == CALL:
+            cfg.calls.append((i, a1[i]))
+    n_blocks = len(starts)
+    starts.append(len(ops))
+
+    # Arestas a partir da última instrução de cada bloco
+    succs = cfg.succs
+    for block in range(n_blocks):
+        last = starts[block + 1] - 1
+        op = ops[last]
+        if op in TERMINATORS and op != RETURN and op != HALT:
+            target = labels.get(a1[last])
+            if target is None:
+                raise CFGError(f"Salto para rótulo inexistente: {texts[a1[last]]!r} (instrução {last})")
+            if op == JMP or block + 1 == n_blocks or target == block + 1:
+                succs.append((target,))
+            else:
+                succs.append((block + 1, target))
+        elif op == RETURN or op == HALT or block + 1 == n_blocks:
+            succs.append(())
+        else:
+            succs.append((block + 1,))
+
+    preds = cfg.preds = [[] for _ in range(n_blocks)]
+    for block, targets in enumerate(succs):
+        for target in targets:
+            preds[target].append(block)
+
+    # Entradas das funções e do programa principal
+    for label, block in labels.items():
+        name = texts[label]
+        if name == MAIN_LABEL or name.startswith(ENTRY_PREFIX):
+            cfg.entries[name] = block
+    firsts = sorted((block, name) for name, block in cfg.entries.items())
+    for k, (block, name) in enumerate(firsts):
+        end = firsts[k + 1][0] if k + 1 < len(firsts) else n_blocks
+        cfg.functions.append((name, block, end))
+    cfg.calls = [(i, labels.get(label) if texts[label] in cfg.entries else None)
+                 for i, label in cfg.calls]
+    return cfg
@@ -0,0 +1,409 @@
+"""
+Scanner dirigido por tabela (DFA) gerado a partir de Lexer.token_specs.
+
+As expressões regulares de TOKEN_SPECS e as palavras reservadas são
+convertidas em um autômato finito não determinístico (construção de
+Thompson) e depois em um DFA (construção de subconjuntos) sobre classes
+de caracteres. As palavras reservadas entram no mesmo autômato, com
+prioridade sobre ID, de modo que são reconhecidas na mesma passada.
+
+O DFA é gerado uma única vez na importação do módulo e guardado em disco
+(__pycache__/dfa_<hash>.json); as execuções seguintes apenas carregam a
+tabela. O Lexer baseado em expressões regulares continua sendo a
+implementação de referência.
+
+Limitação: caracteres não ASCII formam uma única classe, que não é
+dígito nem letra; eles só são aceitos dentro de strings e comentários.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from lexer import Lexer, Token, TOKEN_SPECS, KEYWORDS
+
+# Versão do gerador: alterar invalida os DFAs guardados em disco
+GENERATOR_VERSION = 1
+
+# Códigos ASCII têm classe própria; os demais caracteres caem em uma classe única
+N_ASCII = 128
+
+CharSet = Tuple[FrozenSet[int], bool]  # (códigos ASCII, inclui não-ASCII?)
+
+ALL_ASCII = frozenset(range(N_ASCII))
+DIGITS = frozenset(range(ord('0'), ord('9') + 1))
+SPACES = frozenset(ord(c) for c in ' \t\n\r\f\v')
+
+
+class RegexSyntaxError(Exception):
+    pass
+
+
+# ==========================================
+# PARSER DO SUBCONJUNTO DE REGEX USADO EM TOKEN_SPECS
+# ==========================================
+
+class _RegexParser:
+    """
+    Converte um padrão em uma árvore de tuplas:
+        ('set', CharSet) | ('cat', a, b) | ('alt', a, b) | ('star', a)
+        ('plus', a) | ('opt', a) | ('empty',)
+    Quantificadores preguiçosos (*?) são marcados em self.lazy.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.pos = 0
+        self.lazy = False
+
+    def parse(self):
+        node = self.parse_alt()
+        if self.pos != len(self.pattern):
+            raise RegexSyntaxError(f'Caractere inesperado na posição {self.pos}: {self.pattern!r}')
+        return node
+
+    def peek(self) -> Optional[str]:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def parse_alt(self):
+        node = self.parse_cat()
+        while self.peek() == '|':
+            self.pos += 1
+            node = ('alt', node, self.parse_cat())
+        return node
+
+    def parse_cat(self):
+        node = ('empty',)
+        while self.peek() not in (None, '|', ')'):
+            atom = self.parse_repeat()
+            node = atom if node == ('empty',) else ('cat', node, atom)
+        return node
+
+    def parse_repeat(self):
+        atom = self.parse_atom()
+        while self.peek() in ('*', '+', '?'):
+            op = self.pattern[self.pos]
+            self.pos += 1
+            if self.peek() == '?':
+                self.pos += 1
+                self.lazy = True
+            atom = ({'*': 'star', '+': 'plus', '?': 'opt'}[op], atom)
+        return atom
+
+    def parse_atom(self):
+        ch = self.pattern[self.pos]
+        if ch == '(':
+            self.pos += 1
+            if self.pattern.startswith('?:', self.pos):
+                self.pos += 2
+            node = self.parse_alt()
+            if self.peek() != ')':
+                raise RegexSyntaxError(f'Parêntese não fechado: {self.pattern!r}')
+            self.pos += 1
+            return node
+        if ch == '[':
+            return ('set', self.parse_class())
+        if ch == '.':
+            self.pos += 1
+            return ('set', (ALL_ASCII - {ord('\n')}, True))
+        if ch == '\\':
+            return ('set', self.parse_escape())
+        self.pos += 1
+        return ('set', (frozenset({ord(ch)}), False))
+
+    def parse_escape(self) -> CharSet:
+        ch = self.pattern[self.pos + 1]
+        self.pos += 2
+        if ch == 'd':
+            return (DIGITS, False)
+        if ch == 's':
+            return (SPACES, False)
+        if ch == 'S':
+            return (ALL_ASCII - SPACES, True)
+        if ch in 'ntr':
+            return (frozenset({ord({'n': '\n', 't': '\t', 'r': '\r'}[ch])}), False)
+        if ch.isalnum():
+            raise RegexSyntaxError(f'Escape não suportado: \\{ch}')
+        return (frozenset({ord(ch)}), False)
+
+    def parse_class(self) -> CharSet:
+        self.pos += 1
+        negate = self.peek() == '^'
+        if negate:
+            self.pos += 1
+        codes = set()
+        other = False
+        while self.peek() != ']':
+            if self.peek() is None:
+                raise RegexSyntaxError(f'Classe não fechada: {self.pattern!r}')
+            if self.peek() == '\\':
+                item_codes, item_other = self.parse_escape()
+                codes |= item_codes
+                other = other or item_other
+                continue
+            first = self.pattern[self.pos]
+            self.pos += 1
+            if self.peek() == '-' and self.pattern[self.pos + 1] != ']':
+                last = self.pattern[self.pos + 1]
+                self.pos += 2
+                codes |= set(range(ord(first), ord(last) + 1))
+            else:
+                codes.add(ord(first))
+        self.pos += 1
+        if negate:
+            return (ALL_ASCII - codes, not other)
+        return (frozenset(codes), other)
+
+
+def _keyword_tree(word: str):
+    """Padrão insensível a maiúsculas/minúsculas para uma palavra reservada."""
+    node = ('empty',)
+    for ch in word:
+        atom = ('set', (frozenset({ord(ch.lower()), ord(ch.upper())}), False))
+        node = atom if node == ('empty',) else ('cat', node, atom)
+    return node
+
+
+# ==========================================
+# NFA (THOMPSON) E DFA (SUBCONJUNTOS)
+# ==========================================
+
+class _NFA:
+    def __init__(self):
+        self.eps: List[List[int]] = []
+        self.moves: List[List[Tuple[int, int]]] = []  # (índice do CharSet, destino)
+        self.sets: List[CharSet] = []
+        self.accept: Dict[int, int] = {}  # estado -> prioridade do token
+
+    def new_state(self) -> int:
+        self.eps.append([])
+        self.moves.append([])
+        return len(self.eps) - 1
+
+    def build(self, node) -> Tuple[int, int]:
+        """Retorna (início, fim) do fragmento correspondente a `node`."""
+        kind = node[0]
+        if kind == 'set':
+            start, end = self.new_state(), self.new_state()
+            self.sets.append(node[1])
+            self.moves[start].append((len(self.sets) - 1, end))
+            return start, end
+        if kind == 'empty':
+            start, end = self.new_state(), self.new_state()
+            self.eps[start].append(end)
+            return start, end
+        if kind == 'cat':
+            s1, e1 = self.build(node[1])
+            s2, e2 = self.build(node[2])
+            self.eps[e1].append(s2)
+            return s1, e2
+        if kind == 'alt':
+            start, end = self.new_state(), self.new_state()
+            for sub in node[1:]:
+                s, e = self.build(sub)
+                self.eps[start].append(s)
+                self.eps[e].append(end)
+            return start, end
+        s, e = self.build(node[1])
+        start, end = self.new_state(), self.new_state()
+        self.eps[start].append(s)
+        self.eps[e].append(end)
+        if kind in ('star', 'opt'):
+            self.eps[start].append(end)
+        if kind in ('star', 'plus'):
+            self.eps[e].append(s)
+        return start, end
+
+    def closure(self, states) -> FrozenSet[int]:
+        stack = list(states)
+        seen = set(states)
+        while stack:
+            for nxt in self.eps[stack.pop()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return frozenset(seen)
+
+
+def _char_classes(sets: List[CharSet]) -> Tuple[List[int], int, List[List[bool]]]:
+    """
+    Particiona o alfabeto (128 códigos ASCII + "não ASCII") em classes
+    de caracteres equivalentes para todos os CharSets do NFA.
+    Retorna (classe de cada código ASCII, classe dos não ASCII, pertinência por classe).
+    """
+    signatures: Dict[Tuple[bool, ...], int] = {}
+    members: List[List[bool]] = []
+
+    def class_of(signature):
+        if signature not in signatures:
+            signatures[signature] = len(members)
+            members.append(list(signature))
+        return signatures[signature]
+
+    ascii_classes = [class_of(tuple(code in codes for codes, _ in sets)) for code in range(N_ASCII)]
+    other_class = class_of(tuple(other for _, other in sets))
+    return ascii_classes, other_class, members
+
+
+def build_dfa(token_specs=TOKEN_SPECS, keywords=KEYWORDS) -> dict:
+    """Gera a tabela do DFA para as regras de tokens e palavras reservadas."""
+    names: List[str] = []
+    trees = []
+    shortest: List[bool] = []
+    for name, pattern in token_specs:
+        if name == 'ID':
+            # Palavras reservadas têm prioridade sobre ID no mesmo comprimento
+            for word in sorted(keywords):
+                names.append(word.upper())
+                trees.append(_keyword_tree(word))
+                shortest.append(False)
+        parser = _RegexParser(pattern)
+        trees.append(parser.parse())
+        names.append(name)
+        shortest.append(parser.lazy)
+
+    nfa = _NFA()
+    start = nfa.new_state()
+    for priority, tree in enumerate(trees):
+        s, e = nfa.build(tree)
+        nfa.eps[start].append(s)
+        nfa.accept[e] = priority
+
+    ascii_classes, other_class, members = _char_classes(nfa.sets)
+    n_classes = len(members)
+
+    start_set = nfa.closure([start])
+    dfa_states: Dict[FrozenSet[int], int] = {start_set: 0}
+    pending = [start_set]
+    table: List[int] = []
+    accept: List[int] = []
+
+    while pending:
+        current = pending.pop(0)
+        priorities = [nfa.accept[s] for s in current if s in nfa.accept]
+        token = min(priorities) if priorities else -1
+        accept.append(token)
+        row = [-1] * n_classes
+        # Tokens preguiçosos (ex.: COMMENT) terminam no primeiro aceite
+        if token < 0 or not shortest[token]:
+            for cls in range(n_classes):
+                targets = [dst for s in current for set_index, dst in nfa.moves[s]
+                           if members[cls][set_index]]
+                if not targets:
+                    continue
+                target = nfa.closure(targets)
+                if target not in dfa_states:
+                    dfa_states[target] = len(dfa_states)
+                    pending.append(target)
+                row[cls] = dfa_states[target]
+        table.extend(row)
+
+    return {
+        'names': names,
+        'ascii_classes': ascii_classes,
+        'other_class': other_class,
+        'n_classes': n_classes,
+        'table': table,
+        'accept': accept,
+    }
+
+
+def _cache_path(token_specs, keywords) -> str:
+    key = json.dumps([GENERATOR_VERSION, token_specs, sorted(keywords)]).encode('utf-8')
+    digest = hashlib.sha256(key).hexdigest()[:16]
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', f'dfa_{digest}.json')
+
+
+def load_dfa(token_specs=TOKEN_SPECS, keywords=KEYWORDS) -> dict:
+    """Carrega o DFA do cache em disco ou o gera (e grava) se necessário."""
+    path = _cache_path(token_specs, keywords)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    dfa = build_dfa(token_specs, keywords)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dfa, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Sem permissão de escrita: usa o DFA apenas em memória
+    return dfa
+
+
+DFA = load_dfa()
+
+
+# ==========================================
+# SCANNER
+# ==========================================
+
+class DFALexer(Lexer):
+    """
+    Lexer que percorre a tabela do DFA em vez da regex mestre.
+    Gera o mesmo fluxo de Token que Lexer.tokenize(), inclusive nos modos
+    from_file/from_stream.
+    """
+
+    def _scan(self, text: str, final: bool, start: int = 0):
+        names = DFA['names']
+        ascii_classes = DFA['ascii_classes']
+        other_class = DFA['other_class']
+        n_classes = DFA['n_classes']
+        table = DFA['table']
+        accept = DFA['accept']
+
+        n = len(text)
+        pos = start
+        while pos < n:
+            state = 0
+            i = pos
+            token = -1
+            end = pos
+            while i < n:
+                code = ord(text[i])
+                state = table[state * n_classes + (ascii_classes[code] if code < N_ASCII else other_class)]
+                if state < 0:
+                    break
+                i += 1
+                if accept[state] >= 0:
+                    token = accept[state]
+                    end = i
+
+            # O token pode continuar no próximo bloco
+            if not final and i == n and state >= 0:
+                return pos
+
+            kind = names[token] if token >= 0 else 'MISMATCH'
+            if token < 0:
+                end = pos + 1
+            value = text[pos:end]
+            pos = end
+
+            if kind == 'NEWLINE':
+                self.line += 1
+                self.col = 1
+                continue
+            elif kind == 'SKIP':
+                self.col += len(value)
+                continue
+            elif kind == 'COMMENT':
+                newlines = value.count('\n')
+                if newlines:
+                    self.line += newlines
+                    self.col = len(value) - value.rfind('\n')
+                else:
+                    self.col += len(value)
+                continue
+            elif kind == 'MISMATCH':
+                raise self._mismatch(value, self.line, self.col)
+
+            self.pos = pos
+            yield Token(kind, value, self.line, self.col)
+            self.col += len(value)
+        return n
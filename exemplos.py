@@ -0,0 +1,5 @@
+"""
+Programas de exemplo percorridos pelos testes.
+"""
+
+EXEMPLOS = ['exemplo1.pas', 'exemplo2.pas', 'exemplo3.pas', 'exemplo_otimizacao.pas']
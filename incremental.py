@@ -0,0 +1,341 @@
+"""
+Análise incremental para integração com editores.
+
+Uma IncrementalSession guarda o código-fonte, os tokens e a AST da última
+compilação. Após uma edição, apenas os tokens das linhas afetadas são
+reconhecidos de novo, e apenas o menor Compound ou FunctionDecl que contém
+a mudança é reanalisado; as demais subárvores e suas entradas na tabela de
+símbolos são reaproveitadas.
+
+O custo de uma edição depende do tamanho da edição e do nó reanalisado, não
+do arquivo: os offsets e as linhas dos tokens depois da edição, assim como
+os índices de token e de erro dos intervalos (NodeSpan) seguintes, não são
+reescritos. Como em um gap buffer, cada lista guarda um índice de corte e
+um deslocamento pendente, somado na leitura às posições a partir do corte;
+o corte só anda até a próxima edição (ou até o fim, quando `tokens`,
+`offsets` ou `spans` são lidos de fora). O pai de cada intervalo e o lugar
+do seu nó na AST ficam no próprio NodeSpan.
+
+Exemplo:
+    sessao = IncrementalSession(codigo)
+    sessao.edit(inicio, fim, 'novo texto')   # substitui codigo[inicio:fim]
+    sessao.ast, sessao.errors
+"""
+
+from typing import List, Optional
+
+from ast_nodes import *
+from lexer import Lexer, Token
+from parser import GlobalScopeView, NodeSpan, Parser, ParserError, SymbolTable
+
+
+class IncrementalSession:
+    """Mantém tokens, AST e erros semânticos atualizados a cada edição."""
+
+    def __init__(self, source: str, enable_semantic: bool = True):
+        self.source = source
+        self.enable_semantic = enable_semantic
+        self.ast: Optional[Program] = None
+        self.errors: List[str] = []
+        # Estatísticas da última edição: tipo de reanálise ('nada', 'Compound',
+        # 'FunctionDecl' ou 'completo'), tokens reconhecidos de novo e posições
+        # de tokens e intervalos reescritas ao mover os cortes
+        self.last_reparse = None
+        self.last_relexed = 0
+        self.last_shifted = 0
+        self.rebuild()
+
+    # ======== Compilação completa ========
+
+    def rebuild(self):
+        """Reconhece e analisa todo o código-fonte"""
+        self.ast = None
+        tokens, offsets = self._lex_from(0, 1, 1, None)
+        self._set_tokens(tokens, offsets)
+        parser = Parser(tokens, self.enable_semantic, record_spans=True)
+        self.ast = parser.parse_program()
+        self.errors = parser.semantic_errors
+        self._set_spans(parser.node_spans)
+        self.last_reparse = 'completo'
+        self.last_relexed = len(tokens)
+
+    def _lex_from(self, start: int, line: int, col: int, resync):
+        """
+        Reconhece tokens a partir do offset `start` com o estado (linha, coluna)
+        informado. `resync(offset, token)` pode interromper a análise ao
+        reencontrar um token antigo; retorna (tokens, offsets).
+        """
+        lexer = Lexer(self.source)
+        lexer.pos, lexer.line, lexer.col = start, line, col
+        tokens, offsets = [], []
+        for tok in lexer.tokenize():
+            offset = lexer.pos - len(tok.lexeme)
+            if resync is not None and resync(offset, tok):
+                break
+            tokens.append(tok)
+            offsets.append(offset)
+        return tokens, offsets
+
+    # ======== Posições com deslocamento pendente ========
+
+    def _set_tokens(self, tokens: List[Token], offsets: List[int]):
+        self._tokens = tokens
+        self._offsets = offsets  # offset de início de cada token
+        # Tokens a partir de _token_gap ainda sem o deslocamento pendente
+        self._token_gap = len(tokens)
+        self._offset_shift = 0
+        self._line_shift = 0
+
+    def _set_spans(self, spans: List[NodeSpan]):
+        self._spans = spans  # pré-ordem: ordenados pelo token de início
+        # Intervalos a partir de _span_gap ainda sem o deslocamento pendente
+        self._span_gap = len(spans)
+        self._token_shift = 0
+        self._error_shift = 0
+
+    @property
+    def tokens(self) -> List[Token]:
+        self._move_token_gap(len(self._tokens))
+        return self._tokens
+
+    @property
+    def offsets(self) -> List[int]:
+        self._move_token_gap(len(self._tokens))
+        return self._offsets
+
+    @property
+    def spans(self) -> List[NodeSpan]:
+        self._move_span_gap(len(self._spans))
+        return self._spans
+
+    def _offset(self, i: int) -> int:
+        return self._offsets[i] + (self._offset_shift if i >= self._token_gap else 0)
+
+    def _line(self, i: int) -> int:
+        return self._tokens[i].line + (self._line_shift if i >= self._token_gap else 0)
+
+    def _span_start(self, k: int) -> int:
+        return self._spans[k].start + (self._token_shift if k >= self._span_gap else 0)
+
+    def _move_token_gap(self, gap: int):
+        """Aplica ou retira o deslocamento pendente entre o corte atual e `gap`"""
+        old = self._token_gap
+        offset_shift, line_shift = self._offset_shift, self._line_shift
+        if offset_shift or line_shift:
+            self.last_shifted += abs(gap - old)
+            sign = 1 if gap > old else -1
+            offsets, tokens = self._offsets, self._tokens
+            for i in range(min(old, gap), max(old, gap)):
+                offsets[i] += sign * offset_shift
+                tokens[i].line += sign * line_shift
+        self._token_gap = gap
+
+    def _move_span_gap(self, gap: int):
+        old = self._span_gap
+        token_shift, error_shift = self._token_shift, self._error_shift
+        if token_shift or error_shift:
+            self.last_shifted += abs(gap - old)
+            sign = 1 if gap > old else -1
+            for span in self._spans[min(old, gap):max(old, gap)]:
+                span.start += sign * token_shift
+                span.end += sign * token_shift
+                span.err_start += sign * error_shift
+                span.err_end += sign * error_shift
+        self._span_gap = gap
+
+    # ======== Edição ========
+
+    def edit(self, start: int, end: int, text: str) -> str:
+        """
+        Substitui source[start:end] por `text` e atualiza tokens, AST e erros.
+        Retorna o tipo de reanálise feita (ver last_reparse).
+        """
+        self.source = self.source[:start] + text + self.source[end:]
+        self.last_relexed = self.last_shifted = 0
+        if self.ast is None:
+            # A última compilação falhou: não há estado para reaproveitar
+            self.rebuild()
+            return self.last_reparse
+
+        try:
+            self._apply_edit(start, end, len(text) - (end - start))
+        except Exception:
+            # Estado inconsistente (ex.: erro léxico/sintático): a próxima
+            # edição refaz a análise completa
+            self.ast = None
+            raise
+        return self.last_reparse
+
+    def _apply_edit(self, start: int, end: int, delta: int):
+        first, last, new_tokens, new_offsets, line_shift = self._relex(start, end, delta)
+        self.last_relexed = len(new_tokens)
+
+        old_tokens = self._tokens[first:last]
+        same_tokens = len(old_tokens) == len(new_tokens) and all(
+            a.type == b.type and a.lexeme == b.lexeme for a, b in zip(old_tokens, new_tokens)
+        )
+
+        # Os tokens [first, last) são trocados; os seguintes ganham o
+        # deslocamento da edição, que fica pendente
+        self._move_token_gap(last)
+        self._tokens[first:last] = new_tokens
+        self._offsets[first:last] = new_offsets
+        self._token_gap = first + len(new_tokens)
+        self._offset_shift += delta
+        self._line_shift += line_shift
+
+        if same_tokens:
+            # Só espaços, comentários ou posições mudaram: a AST continua válida
+            self.last_reparse = 'nada'
+        elif not self._reparse(first, last, len(new_tokens) - (last - first)):
+            self.rebuild()
+
+    def _relex(self, start: int, end: int, delta: int):
+        """
+        Reconhece de novo os tokens afetados pela edição de source[start:end].
+
+        A análise recomeça no fim do último token que termina antes da linha
+        editada (um ponto sempre "limpo" para o lexer) e para no primeiro
+        token, após a edição, que coincide com um token antigo deslocado.
+        Retorna (primeiro índice antigo, índice antigo de ressincronização,
+        tokens novos, offsets novos, deslocamento de linhas).
+        """
+        line_start = self.source.rfind('\n', 0, start) + 1
+        # Primeiro token cujo fim ultrapassa o início da linha editada
+        first = self._first_token_ending_after(line_start)
+        if first == 0:
+            relex_from, line, col = 0, 1, 1
+        else:
+            prev = self._tokens[first - 1]
+            relex_from = self._offset(first - 1) + len(prev.lexeme)
+            line, col = self._line(first - 1), prev.column + len(prev.lexeme)
+
+        edit_end = end + delta
+        old_tokens = self._tokens
+        state = {'j': first, 'last': len(old_tokens), 'line_shift': 0}
+
+        def resync(offset, tok):
+            if offset < edit_end:
+                return False
+            old_offset = offset - delta
+            j = state['j']
+            while j < len(old_tokens) and self._offset(j) < old_offset:
+                j += 1
+            state['j'] = j
+            if j < len(old_tokens) and self._offset(j) == old_offset:
+                old = old_tokens[j]
+                if old.type == tok.type and old.column == tok.column:
+                    state['last'] = j
+                    state['line_shift'] = tok.line - self._line(j)
+                    return True
+            return False
+
+        new_tokens, new_offsets = self._lex_from(relex_from, line, col, resync)
+        return first, state['last'], new_tokens, new_offsets, state['line_shift']
+
+    def _first_token_ending_after(self, offset: int) -> int:
+        """Busca binária pelo primeiro token que termina depois de `offset`"""
+        lo, hi = 0, len(self._tokens)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._offset(mid) + len(self._tokens[mid].lexeme) <= offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _span_index(self, token: int) -> int:
+        """Busca binária: quantos intervalos começam antes do token de índice `token`"""
+        lo, hi = 0, len(self._spans)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._span_start(mid) < token:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # ======== Reanálise ========
+
+    def _reparse(self, first: int, last: int, token_delta: int) -> bool:
+        """
+        Reanalisa o menor Compound/FunctionDecl que contém os tokens antigos
+        [first, last). Retorna False se nenhum nó serve (exige análise completa).
+        """
+        # O último intervalo que começa antes de `first` é o menor que contém
+        # a edição ou está dentro dele: os candidatos são ele e seus ancestrais
+        index = self._span_index(first) - 1
+        if index < 0:
+            return False
+        self._move_span_gap(index + 1)
+        span = self._spans[index]
+        while span is not None:
+            if last <= span.end:
+                try:
+                    node, parser = self._parse_span(span, token_delta)
+                except ParserError:
+                    node = None
+                if node is not None:
+                    self._splice(span, node, parser, token_delta)
+                    self.last_reparse = type(node).__name__
+                    return True
+            span = span.parent
+        return False
+
+    def _parse_span(self, span: NodeSpan, token_delta: int):
+        """Analisa novamente o nó de `span` sobre a lista de tokens atualizada"""
+        parser = Parser(self._tokens, self.enable_semantic, record_spans=True)
+        parser.pos = span.start
+
+        global_scope = span.scopes[0]
+        if span.global_count < len(global_scope):
+            # Só os símbolos globais declarados antes do nó são visíveis
+            global_scope = GlobalScopeView(global_scope, span.global_count)
+        parser.symbol_table = SymbolTable.from_scopes([global_scope] + span.scopes[1:])
+
+        old = span.node
+        if isinstance(old, FunctionDecl):
+            node = parser.parse_function_section()[0]
+            # Mudança no cabeçalho afeta quem chama a função: exige análise completa
+            if (node.name, node.params, node.return_type) != (old.name, old.params, old.return_type):
+                return None, parser
+        else:
+            node = parser.parse_block()
+
+        if parser.pos - 1 != span.end + token_delta:
+            return None, parser
+        return node, parser
+
+    def _splice(self, span: NodeSpan, node, parser: Parser, token_delta: int):
+        """Troca o nó antigo pelo novo na AST e atualiza intervalos e erros"""
+        span.replace_node(node)
+
+        new_errors = parser.semantic_errors
+        error_delta = len(new_errors) - (span.err_end - span.err_start)
+        self.errors[span.err_start:span.err_end] = new_errors
+
+        # O intervalo e os seus descendentes são contíguos na pré-ordem e
+        # dão lugar aos da nova análise (a raiz herda pai e slot)
+        first = self._span_index(span.start)
+        last = self._span_index(span.end + 1)
+        self._move_span_gap(last)
+        new_spans = parser.node_spans
+        for new in new_spans:
+            new.err_start += span.err_start
+            new.err_end += span.err_start
+            # O escopo global pode ter sido limitado em uma visão: volta a
+            # apontar para o original (global_count continua válido)
+            new.scopes = span.scopes[:1] + new.scopes[1:]
+        new_spans[0].parent, new_spans[0].slot = span.parent, span.slot
+        self._spans[first:last] = new_spans
+
+        # Os intervalos seguintes ficam com o deslocamento pendente; os que
+        # contêm o nó (todos antes do corte) são ajustados agora
+        self._span_gap = first + len(new_spans)
+        self._token_shift += token_delta
+        self._error_shift += error_delta
+        ancestor = span.parent
+        while ancestor is not None:
+            ancestor.end += token_delta
+            ancestor.err_end += error_delta
+            ancestor = ancestor.parent
@@ -1,4 +1,8 @@
+import os
 import re
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 
 @dataclass
@@ -11,73 +15,342 @@ class Token:
 class LexerError(Exception):
     pass
 
+# Regras de tokens — ordem importa
+TOKEN_SPECS = [
+    ('COMMENT', r'\{#[\s\S]*?#\}'),
+
+    # Literais
+    ('CONST_STR', r'"(?:\\.|[^"\\])*"'),
+    ('CONST_NUM', r'\d+(?:\.\d+)?'),
+
+    # Operadores relacionais e lógicos
+    ('OP_REL', r'(<=|>=|<>|<|>|=)'),
+    ('OP_ASSIGN', r':='),
+    ('OP_MAT', r'[+\-*/]'),
+
+    # Pontuação
+    ('PONT_VIRG', r';'),
+    ('VIRG', r','),
+    ('DOIS_PONT', r':'),
+    ('PONT', r'\.'),
+    ('ABRE_PARENT', r'\('),
+    ('FECHA_PARENT', r'\)'),
+    ('ABRE_COL', r'\['),
+    ('FECHA_COL', r'\]'),
+
+    # Identificadores
+    ('ID', r'[A-Za-z_][A-Za-z0-9_]*'),
+
+    # Espaços e nova linha
+    ('NEWLINE', r'\n'),
+    ('SKIP', r'[ \t\r]+'),
+
+    # Qualquer outro caractere
+    ('MISMATCH', r'.'),
+]
+
+MASTER_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECS))
+
+# Palavras reservadas da gramática Pascal simplificada
+KEYWORDS = frozenset({
+    # Estrutura
+    'program','begin','end','type','var','const','function','procedure',
+    # Controle de fluxo
+    'if','then','else','while','do',
+    # Estruturas de dados
+    'array','of','record',
+    # Entrada e saída
+    'read','write',
+    # Booleanos
+    'true','false',
+    # Operadores lógicos
+    'and','or','not',
+    # Tipos básicos
+    'integer','real','boolean','string'
+})
+
+# Únicos tokens que podem conter '\n': usados para achar pontos de corte seguros
+PROTECTED_RE = re.compile(r'\{#[\s\S]*?#\}|"(?:\\.|[^"\\])*"')
+
+# Resto de uma string já aberta (usado para retomar a busca pelo fechamento)
+STRING_BODY_RE = re.compile(r'(?:\\.|[^"\\])*')
+
+# Códigos inteiros dos tipos de token (usados pelo TokenBuffer)
+TOKEN_KINDS = [name for name, _ in TOKEN_SPECS
+               if name not in ('COMMENT', 'NEWLINE', 'SKIP', 'MISMATCH')] + sorted(k.upper() for k in KEYWORDS)
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_KINDS)}
+
+class TokenBuffer:
+    """
+    Sequência compacta de tokens, armazenada em colunas array('i').
+
+    Guarda apenas o código do tipo, os offsets de início/fim e a linha de cada
+    token. O lexema é recortado do código-fonte somente quando pedido, e a
+    coluna é calculada a partir do índice de inícios de linha. Indexar o
+    buffer devolve um Token equivalente ao gerado por Lexer.tokenize().
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.kinds = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.lines = array('i')
+        # line_starts[n] = offset do primeiro caractere da linha n (linhas começam em 1)
+        self.line_starts = array('i', [0, 0])
+        # Cache de dois tokens materializados, indexado pela paridade do
+        # índice: peek() e peek_next() do parser não se sobrescrevem
+        self._cache_index = [-1, -1]
+        self._cache_token = [None, None]
+
+    def append(self, kind: str, start: int, end: int, line: int):
+        self.kinds.append(KIND_CODES[kind])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def kind(self, i: int) -> str:
+        return TOKEN_KINDS[self.kinds[i]]
+
+    def lexeme(self, i: int) -> str:
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def column(self, i: int) -> int:
+        return self.starts[i] - self.line_starts[self.lines[i]] + 1
+
+    def __getitem__(self, i: int) -> Token:
+        if i < 0:
+            i += len(self.kinds)
+        slot = i & 1
+        if self._cache_index[slot] == i:
+            return self._cache_token[slot]
+        start = self.starts[i]
+        line = self.lines[i]
+        token = Token(TOKEN_KINDS[self.kinds[i]], self.source[start:self.ends[i]],
+                      line, start - self.line_starts[line] + 1)
+        self._cache_index[slot] = i
+        self._cache_token[slot] = token
+        return token
+
+    def __iter__(self):
+        for i in range(len(self.kinds)):
+            yield self[i]
+
 class Lexer:
+    # Tamanho padrão dos blocos lidos no modo streaming (from_file/from_stream)
+    CHUNK_SIZE = 1 << 16
+
+    # Caracteres que um token pode examinar além do seu fim (ex.: '12.5', ':=')
+    LOOKAHEAD = 2
+
     def __init__(self, source: str):
         self.source = source
+        self._stream = None
+        self._path = None
+        self._chunk_size = self.CHUNK_SIZE
+        # Offset onde a análise começa; após cada token, offset do fim do token
         self.pos = 0
         self.line = 1
         self.col = 1
 
-        # Regras de tokens — ordem importa
-        self.token_specs = [
-            ('COMMENT', r'\{#[\s\S]*?#\}'),
-
-            # Literais
-            ('CONST_STR', r'"(?:\\.|[^"\\])*"'),
-            ('CONST_NUM', r'\d+(?:\.\d+)?'),
-
-            # Operadores relacionais e lógicos
-            ('OP_REL', r'(<=|>=|<>|<|>|=)'),
-            ('OP_ASSIGN', r':='),
-            ('OP_MAT', r'[+\-*/]'),
-
-            # Pontuação
-            ('PONT_VIRG', r';'),
-            ('VIRG', r','),
-            ('DOIS_PONT', r':'),
-            ('PONT', r'\.'),
-            ('ABRE_PARENT', r'\('),
-            ('FECHA_PARENT', r'\)'),
-            ('ABRE_COL', r'\['),
-            ('FECHA_COL', r'\]'),
-
-            # Identificadores
-            ('ID', r'[A-Za-z_][A-Za-z0-9_]*'),
-
-            # Espaços e nova linha
-            ('NEWLINE', r'\n'),
-            ('SKIP', r'[ \t\r]+'),
-
-            # Qualquer outro caractere
-            ('MISMATCH', r'.'),
-        ]
-
-        parts = [f'(?P<{name}>{pattern})' for name, pattern in self.token_specs]
-        self.master_re = re.compile('|'.join(parts))
-
-        # Palavras reservadas da gramática Pascal simplificada
-        self.keywords = {
-            # Estrutura
-            'program','begin','end','type','var','const','function','procedure',
-            # Controle de fluxo
-            'if','then','else','while','do',
-            # Estruturas de dados
-            'array','of','record',
-            # Entrada e saída
-            'read','write',
-            # Booleanos
-            'true','false',
-            # Operadores lógicos
-            'and','or','not',
-            # Tipos básicos
-            'integer','real','boolean','string'
-        }
+        # Tabelas compartilhadas por todas as instâncias (compiladas uma única vez)
+        self.token_specs = TOKEN_SPECS
+        self.master_re = MASTER_RE
+        self.keywords = KEYWORDS
+
+    @classmethod
+    def from_stream(cls, stream, chunk_size: int = None):
+        """Cria um lexer que lê o código-fonte de um stream de texto em blocos."""
+        lexer = cls('')
+        lexer._stream = stream
+        if chunk_size is not None:
+            lexer._chunk_size = chunk_size
+        return lexer
+
+    @classmethod
+    def from_file(cls, path: str, chunk_size: int = None, encoding: str = 'utf-8'):
+        """Cria um lexer que lê o arquivo em blocos, sem carregá-lo inteiro na memória."""
+        lexer = cls('')
+        lexer._path = (path, encoding)
+        if chunk_size is not None:
+            lexer._chunk_size = chunk_size
+        return lexer
 
     def tokenize(self):
-        for mo in self.master_re.finditer(self.source):
+        if self._path is not None:
+            path, encoding = self._path
+            with open(path, 'r', encoding=encoding) as f:
+                yield from self._tokenize_stream(f)
+        elif self._stream is not None:
+            yield from self._tokenize_stream(self._stream)
+        else:
+            yield from self._scan(self.source, final=True, start=self.pos)
+
+    def tokenize_buffer(self) -> TokenBuffer:
+        """
+        Reconhece todo o código-fonte e devolve um TokenBuffer compacto,
+        sem criar um objeto Token por token.
+        """
+        if self._stream is not None or self._path is not None:
+            raise LexerError('tokenize_buffer requer o código-fonte em memória')
+
+        source = self.source
+        buffer = TokenBuffer(source)
+        append = buffer.append
+        line_starts = buffer.line_starts
+        keywords = self.keywords
+        line = 1
+
+        for mo in self.master_re.finditer(source):
+            kind = mo.lastgroup
+
+            if kind == 'NEWLINE':
+                line += 1
+                line_starts.append(mo.end())
+                continue
+            elif kind == 'SKIP':
+                continue
+            elif kind == 'COMMENT':
+                value = mo.group()
+                offset = value.find('\n')
+                while offset != -1:
+                    line += 1
+                    line_starts.append(mo.start() + offset + 1)
+                    offset = value.find('\n', offset + 1)
+                continue
+            elif kind == 'ID':
+                value = mo.group()
+                if value.lower() in keywords:
+                    kind = value.upper()
+            elif kind == 'MISMATCH':
+                raise self._mismatch(mo.group(), line, mo.start() - line_starts[line] + 1)
+
+            append(kind, mo.start(), mo.end(), line)
+
+        self.line = line
+        return buffer
+
+    def tokenize_parallel(self, workers: int = None, min_chunk_size: int = 1 << 20):
+        """
+        Reconhece o código-fonte dividindo-o em blocos analisados em paralelo
+        por um pool de processos. Gera exatamente os mesmos tokens (e o mesmo
+        LexerError) que tokenize().
+
+        Os blocos são cortados logo após um '\n' que não esteja dentro de um
+        comentário {# #} ou de uma string; assim cada bloco começa na coluna 1
+        e basta deslocar as linhas ao juntar os resultados.
+        """
+        if self._stream is not None or self._path is not None:
+            raise LexerError('tokenize_parallel requer o código-fonte em memória')
+
+        workers = workers or os.cpu_count() or 1
+        chunks = split_source(self.source, max(1, min(workers, len(self.source) // min_chunk_size)))
+        if len(chunks) == 1:
+            yield from self.tokenize()
+            return
+
+        offset = self.line - 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for tokens, lines, error in executor.map(_tokenize_chunk, chunks):
+                for kind, value, line, col in tokens:
+                    yield Token(kind, value, line + offset, col)
+                if error is not None:
+                    value, line, col = error
+                    raise self._mismatch(value, line + offset, col)
+                offset += lines
+
+    @staticmethod
+    def _mismatch(value: str, line: int, col: int) -> LexerError:
+        error = LexerError(f'Caractere inesperado {value!r} na linha {line}, coluna {col}')
+        error.char, error.line, error.column = value, line, col
+        return error
+
+    def _tokenize_stream(self, stream):
+        """
+        Lê blocos de tamanho fixo e mantém um buffer de sobra com o trecho
+        ainda não reconhecido (token cortado na borda do bloco).
+
+        Um comentário {# ... #} ou uma string ainda aberta no fim do buffer
+        não é reanalisado a cada bloco: a busca pelo fechamento continua de
+        onde parou. O comentário é descartado à medida que chega (só a linha
+        e a coluna avançam); a string, que pode atravessar linhas, é
+        acumulada em partes até o fechamento e só então reconhecida. A
+        memória fica limitada ao tamanho do bloco mais a maior string.
+        """
+        buffer = ''
+        pending = None  # 'COMMENT' ou 'CONST_STR' aberto no início do buffer
+        parts = []      # início da string aberta, já percorrido
+        resume = 0      # onde a busca pelo fechamento continua
+        start_line = start_col = 0
+        while True:
+            chunk = stream.read(self._chunk_size)
+            final = not chunk
+            buffer += chunk
+
+            if pending == 'COMMENT':
+                end = buffer.find('#}', resume)
+                if end == -1:
+                    if final:
+                        raise self._mismatch('{', start_line, start_col)
+                    # Guarda o último caractere: pode ser o '#' de um '#}' cortado
+                    keep = max(resume, len(buffer) - 1)
+                    self._advance(buffer[:keep])
+                    buffer, resume = buffer[keep:], 0
+                    continue
+                self._advance(buffer[:end + 2])
+                buffer, pending = buffer[end + 2:], None
+            elif pending == 'CONST_STR':
+                end = STRING_BODY_RE.match(buffer, resume).end()
+                if not final and end > len(buffer) - 1 - self.LOOKAHEAD:
+                    # Sem fechamento (ou perto demais da borda): o trecho já
+                    # percorrido sai do buffer, que não cresce com a string
+                    parts.append(buffer[:end])
+                    buffer, resume = buffer[end:], 0
+                    continue
+                # Fechada, ou sem fechamento até o fim (_scan acusa o erro)
+                buffer = ''.join(parts) + buffer
+                parts, pending = [], None
+
+            consumed = yield from self._scan(buffer, final)
+            if final:
+                return
+            buffer = buffer[consumed:]
+            if buffer.startswith('{#'):
+                pending, resume = 'COMMENT', 2
+            elif buffer.startswith('"'):
+                pending, resume = 'CONST_STR', 1
+            else:
+                continue
+            start_line, start_col = self.line, self.col
+
+    def _advance(self, text: str):
+        """Avança a linha e a coluna sobre um trecho descartado"""
+        newlines = text.count('\n')
+        if newlines:
+            self.line += newlines
+            self.col = len(text) - text.rfind('\n')
+        else:
+            self.col += len(text)
+
+    def _scan(self, text: str, final: bool, start: int = 0):
+        """
+        Reconhece os tokens de `text` e retorna quantos caracteres consumiu.
+
+        Quando `final` é falso, o texto pode continuar no próximo bloco: um
+        token que termina perto da borda (ou um comentário/string ainda não
+        fechado) é devolvido ao buffer para ser reconhecido com mais dados.
+        """
+        limit = len(text) - self.LOOKAHEAD
+        for mo in self.master_re.finditer(text, start):
             kind = mo.lastgroup
             value = mo.group()
 
+            if not final and (mo.end() > limit or self._may_continue(text, mo)):
+                return mo.start()
+
             if kind == 'NEWLINE':
                 self.line += 1
                 self.col = 1
@@ -86,18 +359,70 @@ class Lexer:
                 self.col += len(value)
                 continue
             elif kind == 'COMMENT':
-                self.line += value.count('\n')
-                if '\n' in value:
-                    last_line = value.split('\n')[-1]
-                    self.col = len(last_line) + 1
-                else:
-                    self.col += len(value)
+                self._advance(value)
                 continue
             elif kind == 'ID' and value.lower() in self.keywords:
                 kind = value.upper()
             elif kind == 'MISMATCH':
-                raise LexerError(f'Caractere inesperado {value!r} na linha {self.line}, coluna {self.col}')
+                raise self._mismatch(value, self.line, self.col)
 
             token = Token(kind, value, self.line, self.col)
+            self.pos = mo.end()
             yield token
             self.col += len(value)
+        return len(text)
+
+    @staticmethod
+    def _may_continue(text: str, mo) -> bool:
+        """Indica se um MISMATCH pode ser o início de um comentário ou string ainda incompleto."""
+        if mo.lastgroup != 'MISMATCH':
+            return False
+        value = mo.group()
+        if value == '"':
+            return True
+        return value == '{' and text[mo.end():mo.end() + 1] in ('', '#')
+
+
+def split_source(source: str, n_chunks: int):
+    """
+    Divide o código-fonte em até n_chunks blocos de tamanho semelhante.
+    Cada corte fica logo após um '\n' fora de comentários e strings.
+    """
+    if n_chunks <= 1:
+        return [source]
+
+    # Pré-varredura: intervalos protegidos (comentários e strings)
+    spans = [mo.span() for mo in PROTECTED_RE.finditer(source)]
+    starts = [start for start, _ in spans]
+
+    cuts = [0]
+    for i in range(1, n_chunks):
+        pos = max(len(source) * i // n_chunks, cuts[-1])
+        while True:
+            newline = source.find('\n', pos)
+            if newline == -1:
+                break
+            k = bisect_right(starts, newline) - 1
+            if k >= 0 and spans[k][1] > newline:
+                pos = spans[k][1]  # '\n' dentro de comentário/string: pula o intervalo
+                continue
+            if newline + 1 > cuts[-1]:
+                cuts.append(newline + 1)
+            break
+    cuts.append(len(source))
+    return [source[a:b] for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def _tokenize_chunk(text: str):
+    """
+    Analisa um bloco em um processo do pool. Retorna (tokens como tuplas,
+    linhas consumidas, erro) com linhas relativas ao início do bloco.
+    """
+    lexer = Lexer(text)
+    tokens = []
+    try:
+        for tok in lexer.tokenize():
+            tokens.append((tok.type, tok.lexeme, tok.line, tok.column))
+    except LexerError as e:
+        return tokens, lexer.line - 1, (e.char, e.line, e.column)
+    return tokens, lexer.line - 1, None
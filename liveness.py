@@ -0,0 +1,213 @@
+"""
+Análise de vivacidade (liveness) das variáveis do programa com vetores de
+bits, e a eliminação de atribuições mortas (dead stores) feita com ela.
+
+Cada variável (operando VAR; os temporários ficam com o passe dead_code)
+ganha um bit, e um conjunto de variáveis é um int do Python. As equações
+de cada bloco básico viram operações de bits:
+
+    out[b] = OR de in[s] para cada sucessor s
+    in[b]  = use[b] | (out[b] & ~def[b])
+
+use/def de cada bloco são calculados uma vez. As varreduras visitam os
+blocos de trás para frente (os sucessores vêm antes, exceto nos saltos
+para trás), então o ponto fixo chega em poucas passadas lineares: no
+código do gerador, a profundidade dos laços mais duas (a última só
+confirma que nada mudou).
+
+Os nomes do TAC são globais, então a análise atravessa as chamadas:
+
+- CALL g lê o que está vivo na entrada de g (todas as variáveis, se g é
+  desconhecida) e define RETVAL; as outras variáveis que g altera podem
+  não ser escritas, então continuam vivas;
+- RETURN define RETVAL e lê o valor retornado e o que está vivo depois
+  de alguma chamada da função (todas as variáveis, se ninguém a chama);
+- HALT não lê nada: depois do fim do programa só o que foi escrito com
+  WRITE é observável.
+
+Exemplo:
+    liveness = Liveness(build_cfg(codigo))
+    liveness.names(liveness.live_in[bloco])   # ['i', 'n', 'soma']
+    mortas = liveness.dead_stores()           # índices das instruções
+"""
+
+from typing import Dict, List
+
+from cfg import CFG
+from tac_packed import ASSIGN_OPS, Kind, Op
+
+CALL, RETURN, READ = int(Op.CALL), int(Op.RETURN), int(Op.READ)
+VAR = int(Kind.VAR)
+# Instruções que leem o endereço 1
+USES_ADDR1 = frozenset((int(Op.WRITE), RETURN, int(Op.PARAM)))
+RETVAL_NAME = 'RETVAL'
+
+# Passos de um bloco com CALL/RETURN (os demais só têm use/def)
+_PLAIN, _CALL, _RETURN = 0, 1, 2
+
+
+class Liveness:
+    """
+    Variáveis vivas na entrada e na saída de cada bloco do CFG.
+
+    - bits:      id da variável -> máscara do seu bit
+    - variables: id da variável de cada bit
+    - live_in[b] / live_out[b]: conjuntos (ints) de variáveis vivas
+    - exit_live[k]: vivas depois das chamadas da função cfg.functions[k]
+    - sweeps:    passadas até o ponto fixo
+    """
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        code = cfg.code
+        table = code.operands
+        kinds = table.kinds
+        n_blocks = len(cfg)
+
+        # Um bit para cada variável que aparece no código
+        self.bits: Dict[int, int] = {}
+        self.variables: List[int] = []
+        masks = self._masks = [0] * len(table)
+        for operands in (code.a1, code.a2, code.a3):
+            for operand in operands:
+                if kinds[operand] == VAR and not masks[operand]:
+                    masks[operand] = self.bits[operand] = 1 << len(self.variables)
+                    self.variables.append(operand)
+        self.all = (1 << len(self.variables)) - 1
+        self._retval = next((masks[var] for var in self.variables if table.texts[var] == RETVAL_NAME), 0)
+
+        # Funções: a que contém cada bloco e a chamada por cada CALL
+        function_of = [-1] * n_blocks
+        function_at = {}
+        for k, (_, first, end) in enumerate(cfg.functions):
+            function_at[first] = k
+            for block in range(first, end):
+                function_of[block] = k
+        self._function_of = function_of
+        callee_of = {index: function_at.get(entry, -1) for index, entry in cfg.calls}
+        self._callee_of = callee_of
+        called = {k for k in callee_of.values() if k >= 0}
+        self.exit_live = [0 if k in called else self.all for k in range(len(cfg.functions))]
+
+        self.use = [0] * n_blocks
+        self.defs = [0] * n_blocks
+        self._steps: List = [None] * n_blocks
+        self._summarize()
+
+        self.live_in = [0] * n_blocks
+        self.live_out = [0] * n_blocks
+        self.sweeps = 0
+        self._solve()
+
+    def _gen_kill(self, i: int):
+        """Variáveis lidas e definidas pela instrução i"""
+        code, masks = self.cfg.code, self._masks
+        op = code.ops[i]
+        gen = masks[code.a2[i]] | masks[code.a3[i]]
+        if op in USES_ADDR1:
+            gen |= masks[code.a1[i]]
+        kill = masks[code.a1[i]] if op in ASSIGN_OPS or op == READ else 0
+        return op, gen, kill
+
+    def _summarize(self):
+        """use/def de cada bloco; blocos com CALL/RETURN guardam os passos"""
+        cfg = self.cfg
+        for block in range(len(cfg)):
+            use = kill = 0
+            steps = None
+            for i in cfg.block_range(block):
+                op, gen, defined = self._gen_kill(i)
+                if op == CALL or op == RETURN:
+                    if steps is None:
+                        steps = []
+                    steps.append((_PLAIN, use, kill))
+                    use = kill = 0
+                    if op == CALL:
+                        steps.append((_CALL, self._callee_of[i], 0))
+                    else:
+                        steps.append((_RETURN, gen, self._function_of[block]))
+                    continue
+                use |= gen & ~kill
+                kill |= defined
+            if steps is None:
+                self.use[block], self.defs[block] = use, kill
+            else:
+                steps.append((_PLAIN, use, kill))
+                steps.reverse()  # percorridos de trás para frente
+                self._steps[block] = steps
+
+    def _after_return(self, function: int) -> int:
+        """Vivas depois de um RETURN (que define RETVAL) da função"""
+        live = self.exit_live[function] if function >= 0 else self.all
+        return live & ~self._retval
+
+    def _through_call(self, callee: int, live: int) -> int:
+        """Vivas antes de um CALL, dadas as vivas depois dele"""
+        live &= ~self._retval
+        if callee < 0:
+            return live | self.all
+        return live | self.live_in[self.cfg.functions[callee][1]]
+
+    def _transfer(self, steps, live: int) -> int:
+        for kind, x, y in steps:
+            if kind == _PLAIN:
+                live = x | (live & ~y)
+            elif kind == _CALL:
+                if x >= 0 and live & ~self.exit_live[x]:
+                    self.exit_live[x] |= live
+                    self._grew = True
+                live = self._through_call(x, live)
+            else:
+                live = x | self._after_return(y)
+        return live
+
+    def _solve(self):
+        succs, steps_of = self.cfg.succs, self._steps
+        use, defs = self.use, self.defs
+        live_in, live_out = self.live_in, self.live_out
+        changed = True
+        while changed:
+            changed = self._grew = False
+            self.sweeps += 1
+            for block in range(len(succs) - 1, -1, -1):
+                out = 0
+                for succ in succs[block]:
+                    out |= live_in[succ]
+                live_out[block] = out
+                steps = steps_of[block]
+                if steps is None:
+                    new = use[block] | (out & ~defs[block])
+                else:
+                    new = self._transfer(steps, out)
+                if new != live_in[block]:
+                    live_in[block] = new
+                    changed = True
+            changed = changed or self._grew
+
+    def names(self, live: int) -> List[str]:
+        """Nomes das variáveis de um conjunto, em ordem alfabética"""
+        texts = self.cfg.code.operands.texts
+        return sorted(texts[var] for var, mask in self.bits.items() if live & mask)
+
+    def dead_stores(self) -> List[int]:
+        """
+        Índices das atribuições a variáveis que ninguém lê antes de a
+        variável ser redefinida (ou do fim do programa), em ordem crescente
+        """
+        cfg = self.cfg
+        a1s, masks = cfg.code.a1, self._masks
+        dead = []
+        for block in range(len(cfg)):
+            live = self.live_out[block]
+            for i in reversed(cfg.block_range(block)):
+                op, gen, kill = self._gen_kill(i)
+                if op == CALL:
+                    live = self._through_call(self._callee_of[i], live)
+                elif op == RETURN:
+                    live = gen | self._after_return(self._function_of[block])
+                elif op in ASSIGN_OPS and masks[a1s[i]] and not live & kill:
+                    dead.append(i)  # removida: o que ela lê não fica vivo
+                else:
+                    live = gen | (live & ~kill)
+        dead.sort()
+        return dead
@@ -0,0 +1,286 @@
+"""
+Laços naturais do CFG e movimentação de código invariante (LICM).
+
+Um laço natural vem de uma aresta de volta b -> h em que h (o cabeçalho)
+domina b: o corpo é h mais os blocos que chegam a b sem passar por h.
+Laços com o mesmo cabeçalho são unidos (o `continue` implícito de um while
+com vários caminhos de volta).
+
+hoist_invariants() move para fora dos laços as operações sem efeito
+colateral (aritméticas, comparações, NOT) cujos operandos não são
+definidos dentro do laço:
+
+1. os laços com alguma candidata (operandos constantes ou não atribuídos
+   no corpo, nem por uma chamada) ganham um pré-cabeçalho no TAC: um
+   rótulo novo "LPn" antes dos rótulos de volta do cabeçalho, e os saltos
+   de fora do laço para eles passam a ir para o pré-cabeçalho;
+2. em SSA (ssa.py) uma operação é invariante se as versões que ela lê são
+   definidas fora do corpo (ou por operações já movidas); os laços
+   internos vêm primeiro, então o que sai de um laço interno pode sair
+   também do externo;
+3. to_code() volta para o TAC e um JMP para o rótulo logo em seguida
+   (o fim do pré-cabeçalho) é removido.
+
+Só as definições de temporários são movidas: o gerador põe cada expressão
+em um temporário novo, e mover a atribuição a uma variável do programa
+deixaria a versão antiga e a nova vivas juntas (uma cópia a mais por
+volta do laço). DIV só sai do laço com divisor constante diferente de
+zero, porque a operação movida executa mesmo quando o laço não executa.
+
+Exemplo:
+    for loop in natural_loops(cfg, entry):
+        print(loop.header, sorted(loop.body))
+    codigo, movidas = hoist_invariants(codigo)
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from cfg import CFG, build_cfg
+from ssa import DEFINES_ADDR1, SSAFunction, build_ssa, dominates, dominators
+from tac_packed import BINARY_OPS, Kind, Op, PackedTAC
+
+LABEL, JMP, JZ, JNZ = int(Op.LABEL), int(Op.JMP), int(Op.JZ), int(Op.JNZ)
+CALL, RETURN, HALT, DIV = int(Op.CALL), int(Op.RETURN), int(Op.HALT), int(Op.DIV)
+TEMP, VAR, NUM = int(Kind.TEMP), int(Kind.VAR), int(Kind.NUM)
+# Operações sem efeito colateral que podem sair do laço
+HOISTABLE = BINARY_OPS | {int(Op.NOT)}
+JUMPS = frozenset((JMP, JZ, JNZ))
+PREHEADER_PREFIX = 'LP'
+
+
+@dataclass
+class Loop:
+    """Laço natural: cabeçalho, blocos do corpo (com o cabeçalho) e origens das arestas de volta"""
+    header: int
+    body: Set[int] = field(default_factory=set)
+    latches: List[int] = field(default_factory=list)
+
+
+def natural_loops(cfg: CFG, entry: int,
+                  dominance: Optional[Tuple[List[int], Dict[int, int]]] = None) -> List[Loop]:
+    """
+    Laços naturais dos blocos alcançáveis a partir de `entry`, os internos
+    primeiro. `dominance` é o resultado de ssa.dominators(), se já calculado.
+    """
+    order, idom = dominance if dominance is not None else dominators(cfg, entry)
+    number = {block: k for k, block in enumerate(order)}
+    loops: Dict[int, Loop] = {}
+    for block in order:
+        for succ in cfg.succs[block]:
+            # Só as arestas que voltam na pós-ordem reversa podem ser de volta
+            if number[succ] <= number[block] and dominates(idom, succ, block):
+                loop = loops.setdefault(succ, Loop(succ, {succ}))
+                loop.latches.append(block)
+                stack = [block]
+                while stack:
+                    b = stack.pop()
+                    if b not in loop.body:
+                        loop.body.add(b)
+                        stack.extend(pred for pred in cfg.preds[b] if pred in idom)
+    return sorted(loops.values(), key=lambda loop: (len(loop.body), loop.header))
+
+
+def find_loops(cfg: CFG) -> List[Loop]:
+    """Laços naturais de todas as funções do CFG, os internos primeiro"""
+    ranges = cfg.functions or ([(None, 0, len(cfg))] if len(cfg) else [])
+    loops = [loop for _, first, _ in ranges for loop in natural_loops(cfg, first)]
+    loops.sort(key=lambda loop: len(loop.body))
+    return loops
+
+
+def _clobbered(cfg: CFG) -> Set[int]:
+    """Operandos que alguma função (fora do MAIN) atribui: um CALL pode alterá-los"""
+    code = cfg.code
+    clobbered = set()
+    for name, first, end in cfg.functions:
+        if name != 'MAIN':
+            for i in range(cfg.starts[first], cfg.starts[end]):
+                if code.ops[i] in DEFINES_ADDR1:
+                    clobbered.add(code.a1[i])
+    clobbered.update(operand for operand, text in enumerate(code.operands.texts) if text == 'RETVAL')
+    return clobbered
+
+
+def _hoistable(code: PackedTAC, i: int) -> bool:
+    """A instrução i é uma operação que pode sair de um laço (sem olhar os operandos)"""
+    op = code.ops[i]
+    if op not in HOISTABLE or code.operands.kinds[code.a1[i]] != TEMP:
+        return False
+    if op == DIV:
+        divisor = code.a3[i]
+        return code.operands.kinds[divisor] == NUM and code.operands.values[divisor] != 0
+    return True
+
+
+def _has_candidate(cfg: CFG, loop: Loop, clobbered: Set[int]) -> bool:
+    """O corpo tem uma operação cujos operandos não são atribuídos nele"""
+    code = cfg.code
+    kinds = code.operands.kinds
+    defined: Set[int] = set()
+    candidates = []
+    for block in loop.body:
+        for i in cfg.block_range(block):
+            op = code.ops[i]
+            if op in DEFINES_ADDR1:
+                defined.add(code.a1[i])
+            elif op == CALL:
+                defined |= clobbered
+            if _hoistable(code, i):
+                candidates.append(i)
+    for i in candidates:
+        if all(kinds[a] != TEMP and kinds[a] != VAR or a not in defined for a in (code.a2[i], code.a3[i])):
+            return True
+    return False
+
+
+def _fresh_labels(code: PackedTAC) -> Iterator[int]:
+    """Rótulos LP1, LP2, ... ainda não usados no código"""
+    table = code.operands
+    taken = set(table.texts[1:])
+    n = 0
+    while True:
+        n += 1
+        text = f"{PREHEADER_PREFIX}{n}"
+        if text not in taken:
+            yield table.add(text, int(Kind.LABEL))
+
+
+def insert_preheaders(cfg: CFG, loops: List[Loop]) -> PackedTAC:
+    """
+    Código com um pré-cabeçalho vazio antes do cabeçalho de cada laço:
+
+        rótulos de fora      (só alcançados de fora do laço, ex.: FUNC_f)
+        LABEL LPn            (os saltos de fora para os rótulos de volta vêm para cá)
+        JMP   L1
+        LABEL L1             (rótulos alcançados pelas arestas de volta)
+
+    Os laços cujo último bloco antes do cabeçalho é do corpo e cai nele
+    (volta sem salto) ou que voltam para o rótulo de entrada da função
+    ficam sem pré-cabeçalho.
+    """
+    code = cfg.code
+    ops, a1s = code.ops, code.a1
+    fresh = _fresh_labels(code)
+    preheader_at: Dict[int, Tuple[int, Set[int]]] = {}  # 1ª instrução do cabeçalho -> (LPn, rótulos de volta)
+    retarget: Dict[int, int] = {}                        # índice do salto -> LPn
+    for loop in loops:
+        header = loop.header
+        before = header - 1
+        if before in loop.body and ops[cfg.starts[header] - 1] not in (JMP, RETURN, HALT):
+            continue
+        start = cfg.starts[header]
+        if start in preheader_at or ops[start] != LABEL:
+            continue
+        back = {a1s[cfg.starts[latch + 1] - 1] for latch in loop.latches}
+        if any(code.operands.texts[label] in cfg.entries for label in back):
+            continue  # o pré-cabeçalho cairia na função anterior
+        label = next(fresh)
+        preheader_at[start] = (label, back)
+        for pred in cfg.preds[header]:
+            last = cfg.starts[pred + 1] - 1
+            if pred not in loop.body and ops[last] in JUMPS and a1s[last] in back:
+                retarget[last] = label
+
+    out = code.copy_empty()
+    i = 0
+    while i < len(ops):
+        if i in preheader_at:
+            label, back = preheader_at[i]
+            labels = []
+            while i < len(ops) and ops[i] == LABEL:
+                labels.append(a1s[i])
+                i += 1
+            for outer in labels:
+                if outer not in back:
+                    out.append(LABEL, outer)
+            out.append(LABEL, label)
+            inner = [inner for inner in labels if inner in back]
+            out.append(JMP, inner[0])
+            for inner_label in inner:
+                out.append(LABEL, inner_label)
+            continue
+        out.append(ops[i], retarget.get(i, a1s[i]), code.a2[i], code.a3[i])
+        i += 1
+    return out
+
+
+def _hoist(func: SSAFunction) -> List[Tuple[int, List[int]]]:
+    """
+    Move as operações invariantes de cada laço da função para o
+    pré-cabeçalho; retorna (rótulo do cabeçalho, instrução) das movidas
+    """
+    cfg = func.program.cfg
+    table = func.program.code.operands
+    kinds, values = table.kinds, table.values
+    defs, _ = func.def_use()
+    def_block = {version: block for version, (block, _) in defs.items()}
+    moved = []
+    for loop in natural_loops(cfg, func.first, (func.order, func.idom)):
+        outside = [pred for pred in func.preds[loop.header] if pred not in loop.body]
+        if len(outside) != 1 or func.blocks[outside[0]][-1][0] != JMP or cfg.succs[outside[0]] != (loop.header,):
+            continue  # sem pré-cabeçalho
+        preheader = outside[0]
+        body = loop.body
+
+        def invariant(operand):
+            kind = kinds[operand]
+            return (kind != TEMP and kind != VAR) or def_block.get(operand) not in body
+
+        hoisted = []
+        for block in func.order:  # dominadores primeiro: os operandos já movidos vêm antes
+            if block not in body:
+                continue
+            for index, instr in enumerate(func.blocks[block]):
+                op, a1, a2, a3 = instr
+                if (op in HOISTABLE and kinds[a1] == TEMP and a1 in func.origin
+                        and invariant(a2) and invariant(a3)
+                        and (op != DIV or (kinds[a3] == NUM and values[a3] != 0))):
+                    hoisted.append(list(instr))
+                    def_block[a1] = preheader
+                    func.remove((block, index))
+        if hoisted:
+            instrs = func.blocks[preheader]
+            instrs[-1:-1] = hoisted  # antes do JMP para o cabeçalho
+            label = func.blocks[loop.header][0][1]
+            moved.extend((label, instr) for instr in hoisted)
+    return moved
+
+
+def _drop_jumps_to_next(code: PackedTAC) -> PackedTAC:
+    """Remove os JMP para um rótulo que vem logo em seguida"""
+    ops, a1s = code.ops, code.a1
+    out = code.copy_empty()
+    for i, op in enumerate(ops):
+        if op == JMP:
+            j = i + 1
+            while j < len(ops) and ops[j] == LABEL and a1s[j] != a1s[i]:
+                j += 1
+            if j < len(ops) and ops[j] == LABEL:
+                continue
+        out.append(op, a1s[i], code.a2[i], code.a3[i])
+    return out
+
+
+def hoist_invariants(code) -> Tuple[PackedTAC, List[Tuple[int, int, int, int, int]]]:
+    """
+    Move as operações invariantes para fora dos laços. Retorna o código novo
+    (o mesmo objeto se nada saiu) e as instruções movidas, como (rótulo do
+    cabeçalho do laço, op, a1, a2, a3) com os operandos originais; uma
+    instrução que sai de dois laços aninhados aparece duas vezes.
+    """
+    if not isinstance(code, PackedTAC):
+        code = PackedTAC.from_instructions(code)
+    cfg = build_cfg(code)
+    clobbered = _clobbered(cfg)
+    loops = [loop for loop in find_loops(cfg) if _has_candidate(cfg, loop, clobbered)]
+    if not loops:
+        return code, []
+    ssa = build_ssa(insert_preheaders(cfg, loops))
+    moved = []
+    for func in ssa.functions:
+        for label, (op, a1, a2, a3) in _hoist(func):
+            moved.append((label, op, func.var_of(a1), func.var_of(a2), func.var_of(a3)))
+    if not moved:
+        return code, []
+    return _drop_jumps_to_next(ssa.to_code()), moved
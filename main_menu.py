@@ -8,8 +8,13 @@ from tac_generator import TACGenerator
 from optimizer import TACOptimizer, optimize_tac
 from ast_nodes import *
 from ast_exporter import export_ast_to_json, DotExporter
+from pipeline_cache import PipelineCache
+from walker import run
 import sys, os
 
+# Cache dos artefatos de processar_arquivo_completo
+CACHE_DIR = os.path.join(".cache", "pipeline")
+
 # ==========================================
 # FUNÇÕES AUXILIARES
 # ==========================================
@@ -41,22 +46,26 @@ def testar_lexer(codigo_fonte: str):
 
 def print_ast(node, indent=0):
     """Impressão hierárquica da AST."""
+    run(_print_ast(node, indent))
+
+def _print_ast(node, indent):
+    """Visitante de print_ast (gerador executado por walker.run)"""
     pad = '  ' * indent
     if isinstance(node, Program):
         print(f"{pad}Program(name='{node.name}')")
         if node.decls:
             print(f"{pad}  Declarações:")
             for d in node.decls:
-                print_ast(d, indent+2)
+                yield _print_ast(d, indent+2)
         print(f"{pad}  Bloco principal:")
-        print_ast(node.block, indent+2)
+        yield _print_ast(node.block, indent+2)
 
     elif isinstance(node, VarDecl):
         print(f"{pad}VarDecl(names={node.names}, type={node.type_name})")
 
     elif isinstance(node, ConstDecl):
         print(f"{pad}ConstDecl(name='{node.name}')")
-        print_ast(node.value, indent+1)
+        yield _print_ast(node.value, indent+1)
 
     elif isinstance(node, TypeDecl):
         print(f"{pad}TypeDecl(name='{node.name}', definition='{node.definition}')")
@@ -66,23 +75,23 @@ def print_ast(node, indent=0):
         if node.params:
             print(f"{pad}  Params:")
             for p in node.params:
-                print_ast(p, indent+2)
+                yield _print_ast(p, indent+2)
         if node.local_vars:
             print(f"{pad}  LocalVars:")
             for v in node.local_vars:
-                print_ast(v, indent+2)
+                yield _print_ast(v, indent+2)
         print(f"{pad}  Body:")
-        print_ast(node.body, indent+2)
+        yield _print_ast(node.body, indent+2)
 
     elif isinstance(node, Compound):
         print(f"{pad}Compound:")
         for s in node.statements:
-            print_ast(s, indent+1)
+            yield _print_ast(s, indent+1)
 
     elif isinstance(node, Assign):
         print(f"{pad}Assign:")
-        print_ast(node.target, indent+1)
-        print_ast(node.value, indent+1)
+        yield _print_ast(node.target, indent+1)
+        yield _print_ast(node.value, indent+1)
 
     elif isinstance(node, Var):
         print(f"{pad}Var(name='{node.name}')")
@@ -95,30 +104,30 @@ def print_ast(node, indent=0):
 
     elif isinstance(node, BinOp):
         print(f"{pad}BinOp(op='{node.op}')")
-        if node.left: print_ast(node.left, indent+1)
-        if node.right: print_ast(node.right, indent+1)
+        if node.left: yield _print_ast(node.left, indent+1)
+        if node.right: yield _print_ast(node.right, indent+1)
 
     elif isinstance(node, If):
         print(f"{pad}If:")
         print(f"{pad}  Condition:")
-        print_ast(node.condition, indent+2)
+        yield _print_ast(node.condition, indent+2)
         print(f"{pad}  Then:")
-        print_ast(node.then_branch, indent+2)
+        yield _print_ast(node.then_branch, indent+2)
         if node.else_branch:
             print(f"{pad}  Else:")
-            print_ast(node.else_branch, indent+2)
+            yield _print_ast(node.else_branch, indent+2)
 
     elif isinstance(node, While):
         print(f"{pad}While:")
         print(f"{pad}  Condition:")
-        print_ast(node.condition, indent+2)
+        yield _print_ast(node.condition, indent+2)
         print(f"{pad}  Body:")
-        print_ast(node.body, indent+2)
+        yield _print_ast(node.body, indent+2)
 
     elif isinstance(node, Call):
         print(f"{pad}Call(name='{node.name}')")
         for a in node.args:
-            print_ast(a, indent+1)
+            yield _print_ast(a, indent+1)
 
     else:
         print(f"{pad}{node!r}")
@@ -148,8 +157,8 @@ def testar_parser_com_semantica(codigo: str, habilitar_semantica=True):
         print(f"\n {e}")
         return None
 
-def gerar_codigo_intermediario(ast):
-    """Gera código intermediário (TAC) a partir da AST"""
+def gerar_codigo_intermediario(ast, bindings=None):
+    """Gera código intermediário (TAC) a partir da AST (e das ligações do parser)"""
     if not ast:
         print(" Nenhuma AST disponível para gerar código intermediário!")
         return None
@@ -157,7 +166,7 @@ def gerar_codigo_intermediario(ast):
     print("\n Gerando código intermediário...")
     
     try:
-        generator = TACGenerator()
+        generator = TACGenerator(bindings)
         tac_instructions = generator.generate(ast)
         
         # Exibe o código TAC
@@ -216,9 +225,14 @@ def otimizar_codigo_tac(generator: TACGenerator):
     print("-"*70)
     generator.print_tac()
 
-    # Aplica otimizações
-    original_instructions = generator.instructions.copy()
-    optimized_instructions = optimize_tac(original_instructions, verbose=True)
+    # Aplica otimizações (ou reaproveita as que o cache já aplicou)
+    cached = getattr(generator, 'optimized_instructions', None)
+    if cached is not None:
+        print("\n Passes padrão já aplicados: TAC otimizado reaproveitado do cache")
+        optimized_instructions = list(cached)
+    else:
+        original_instructions = generator.instructions.copy()
+        optimized_instructions = optimize_tac(original_instructions, verbose=True)
 
     # Cria um novo gerador com instruções otimizadas
     optimized_generator = TACGenerator()
@@ -271,8 +285,16 @@ def comparar_codigo_tac(generator_original: TACGenerator, generator_otimizado: T
         print(f"Redução: {reduction} instruções ({percentage:.1f}%)")
     print("="*70)
 
-def processar_arquivo_completo(caminho: str):
-    """Processa um arquivo completamente: léxico, sintático, semântico e TAC"""
+def processar_arquivo_completo(caminho: str, usar_cache: bool = True):
+    """
+    Processa um arquivo completamente: léxico, sintático, semântico e TAC.
+
+    Com o cache, um arquivo já processado (mesmo código, versão do
+    compilador e opções) é carregado sem refazer as etapas; senão as etapas
+    rodam normalmente e os artefatos são gravados. O gerador retornado traz
+    as ligações do parser (bindings) e o TAC otimizado pelos passes padrão
+    (optimized_instructions), usado pela opção 6.
+    """
     try:
         print(f"\n Carregando arquivo: {caminho}")
         codigo = carregar_codigo(caminho)
@@ -282,12 +304,25 @@ def processar_arquivo_completo(caminho: str):
         for i, linha in enumerate(codigo.split('\n'), 1):
             print(f"{i:3}: {linha}")
         print("-" * 70)
+
+        # Mesmo código, versão do compilador e opções: nenhuma etapa é refeita
+        cache = PipelineCache(CACHE_DIR) if usar_cache else None
+        if cache is not None:
+            resultado = cache.lookup(codigo)
+            if resultado is not None:
+                print(f"\n Tokens, AST e TAC reaproveitados do cache ({CACHE_DIR})")
+                print(f" {len(resultado.tokens)} tokens, {len(resultado.tac)} instruções TAC")
+                generator = TACGenerator(resultado.bindings)
+                generator.instructions = resultado.tac
+                generator.optimized_instructions = resultado.optimized_tac
+                generator.print_tac()
+                return resultado.ast, generator
         
         # 1. Análise Léxica
         print("\n ETAPA 1: Análise Léxica")
         try:
             lexer = Lexer(codigo)
-            tokens = list(lexer.tokenize())
+            tokens = lexer.tokenize_buffer()
             print(f" {len(tokens)} tokens identificados")
         except LexerError as e:
             print(f"❌ Erro léxico: {e}")
@@ -306,10 +341,14 @@ def processar_arquivo_completo(caminho: str):
         
         # 3. Geração de Código Intermediário
         print("\n ETAPA 3: Geração de Código Intermediário")
-        generator = gerar_codigo_intermediario(ast)
+        generator = gerar_codigo_intermediario(ast, parser.bindings)
         
         if generator:
             print(f" {len(generator.instructions)} instruções TAC geradas")
+            if cache is not None:
+                resultado = cache.store(codigo, tokens, ast, parser.bindings, generator.instructions)
+                generator.optimized_instructions = resultado.optimized_tac
+                print(f" Tokens, AST e TAC gravados no cache ({CACHE_DIR})")
         
         return ast, generator
         
@@ -325,6 +364,7 @@ def processar_arquivo_completo(caminho: str):
 def menu():
     """Menu interativo do compilador"""
     ultima_ast = None
+    ultimas_ligacoes = None  # Parser.bindings da última AST (opção 4)
     ultimo_tac = None
     ultimo_tac_otimizado = None
 
@@ -362,17 +402,20 @@ def menu():
 
             elif op == '2':
                 ultima_ast = testar_parser_com_semantica(codigo, habilitar_semantica=False)
+                ultimas_ligacoes = None
 
             elif op == '3':
                 ultima_ast = testar_parser_com_semantica(codigo, habilitar_semantica=True)
+                ultimas_ligacoes = None
 
             elif op == '4':
                 ultima_ast, ultimo_tac = processar_arquivo_completo(caminho)
+                ultimas_ligacoes = ultimo_tac.bindings if ultimo_tac else None
                 ultimo_tac_otimizado = None  # Reset otimização
 
         elif op == '5':
             if ultima_ast:
-                ultimo_tac = gerar_codigo_intermediario(ultima_ast)
+                ultimo_tac = gerar_codigo_intermediario(ultima_ast, ultimas_ligacoes)
                 ultimo_tac_otimizado = None  # Reset otimização
             else:
                 print(" Nenhuma AST disponível! Execute a análise sintática primeiro.")
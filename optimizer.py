@@ -3,37 +3,58 @@ Otimizador de Código Intermediário (TAC)
 Implementa várias técnicas de otimização para o código de três endereços.
 """
 
-from typing import List, Dict, Set, Optional, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, Union
+from cfg import CFGError, build_cfg
+from liveness import Liveness
+from loops import hoist_invariants
+from sccp import SCCP
 from tac_generator import TACInstruction
+from tac_packed import (Kind, Op, OP_NAMES, PackedTAC, ASSIGN_OPS, BINARY_OPS, CONTROL_OPS)
+
+# Opcodes e tipos de operando como inteiros simples (mais rápidos nos laços)
+ATR, ADD, SUB, MUL, DIV = int(Op.ATR), int(Op.ADD), int(Op.SUB), int(Op.MUL), int(Op.DIV)
+JEQ, JNE, JLT, JGT, JLE, JGE = (int(Op.JEQ), int(Op.JNE), int(Op.JLT), int(Op.JGT),
+                                int(Op.JLE), int(Op.JGE))
+AND, OR = int(Op.AND), int(Op.OR)
+LABEL = int(Op.LABEL)
+NUM, TEMP = int(Kind.NUM), int(Kind.TEMP)
+# Instruções que leem o operando do endereço 1
+USES_ADDR1 = frozenset(int(op) for op in (Op.JZ, Op.JNZ, Op.WRITE, Op.RETURN, Op.PARAM))
+# Instruções que definem o operando do endereço 1
+DEFINES_ADDR1 = ASSIGN_OPS | {int(Op.READ)}
 
 
 class TACOptimizer:
     """
     Otimizador de código TAC que aplica múltiplas passes de otimização.
+
+    Os passes trabalham sobre o PackedTAC (tac_packed): operandos são ids
+    com tipo e valor já conhecidos. Uma lista de TACInstruction é
+    empacotada na entrada e desempacotada na saída.
     """
 
-    def __init__(self, instructions: List[TACInstruction]):
+    def __init__(self, instructions: Union[List[TACInstruction], PackedTAC]):
         self.instructions = instructions
         self.optimizations_applied = []
 
-    def optimize(self, passes: Optional[List[str]] = None) -> List[TACInstruction]:
+    def optimize(self, passes: Optional[List[str]] = None) -> Union[List[TACInstruction], PackedTAC]:
         """
         Aplica passes de otimização no código TAC.
 
         Args:
             passes: Lista de passes a aplicar. Se None, aplica todas.
-                   Opções: 'constant_folding', 'constant_propagation',
-                          'copy_propagation', 'dead_code', 'cse'
+                   Opções: 'constant_folding', 'constant_propagation', 'sccp',
+                          'copy_propagation', 'dead_code', 'dead_stores', 'cse', 'licm'
 
         Returns:
-            Lista de instruções otimizadas
+            Instruções otimizadas, no mesmo formato da entrada
         """
         if passes is None:
-            passes = ['constant_folding', 'constant_propagation',
-                     'copy_propagation', 'dead_code', 'cse']
+            passes = ['constant_folding', 'constant_propagation', 'sccp',
+                     'copy_propagation', 'dead_code', 'dead_stores', 'cse', 'licm']
 
-        optimized = self.instructions.copy()
+        packed = isinstance(self.instructions, PackedTAC)
+        optimized = self.instructions if packed else PackedTAC.from_instructions(self.instructions)
 
         # Aplicar múltiplas iterações até não haver mais mudanças
         max_iterations = 10
@@ -46,12 +67,18 @@ class TACOptimizer:
                     optimized = self._constant_folding(optimized)
                 elif pass_name == 'constant_propagation':
                     optimized = self._constant_propagation(optimized)
+                elif pass_name == 'sccp':
+                    optimized = self._sparse_conditional_constant_propagation(optimized)
                 elif pass_name == 'copy_propagation':
                     optimized = self._copy_propagation(optimized)
                 elif pass_name == 'dead_code':
                     optimized = self._dead_code_elimination(optimized)
+                elif pass_name == 'dead_stores':
+                    optimized = self._dead_store_elimination(optimized)
                 elif pass_name == 'cse':
                     optimized = self._common_subexpression_elimination(optimized)
+                elif pass_name == 'licm':
+                    optimized = self._loop_invariant_code_motion(optimized)
 
             # Verifica se houve mudança
             if len(optimized) != initial_count:
@@ -60,282 +87,321 @@ class TACOptimizer:
             if not changed:
                 break
 
-        return optimized
+        return optimized if packed else optimized.to_instructions()
 
-    def _is_constant(self, value: Optional[str]) -> bool:
-        """Verifica se um valor é uma constante numérica."""
-        if value is None:
-            return False
-        try:
-            float(value)
-            return True
-        except (ValueError, TypeError):
-            return False
-
-    def _is_temp(self, value: Optional[str]) -> bool:
-        """Verifica se um valor é uma variável temporária."""
-        if value is None:
-            return False
-        return isinstance(value, str) and value.startswith('T')
-
-    def _is_variable(self, value: Optional[str]) -> bool:
-        """Verifica se um valor é uma variável (não constante e não None)."""
-        return value is not None and not self._is_constant(value)
-
-    def _eval_binop(self, op: str, left: str, right: str) -> Optional[str]:
+    def _eval_binop(self, op: int, left_val: float, right_val: float) -> Optional[str]:
         """
-        Avalia uma operação binária entre constantes.
+        Avalia uma operação binária entre constantes (valores já convertidos
+        pela tabela de operandos).
 
         Returns:
             String com o resultado ou None se não puder avaliar
         """
-        try:
-            left_val = float(left)
-            right_val = float(right)
-
-            if op == 'ADD':
-                result = left_val + right_val
-            elif op == 'SUB':
-                result = left_val - right_val
-            elif op == 'MUL':
-                result = left_val * right_val
-            elif op == 'DIV':
-                if right_val == 0:
-                    return None  # Não otimizar divisão por zero
-                result = left_val / right_val
-            elif op == 'JEQ':
-                return 'true' if left_val == right_val else 'false'
-            elif op == 'JNE':
-                return 'true' if left_val != right_val else 'false'
-            elif op == 'JLT':
-                return 'true' if left_val < right_val else 'false'
-            elif op == 'JGT':
-                return 'true' if left_val > right_val else 'false'
-            elif op == 'JLE':
-                return 'true' if left_val <= right_val else 'false'
-            elif op == 'JGE':
-                return 'true' if left_val >= right_val else 'false'
-            elif op == 'AND':
-                # Trata como booleano: 0 = false, não-zero = true
-                return 'true' if (left_val != 0 and right_val != 0) else 'false'
-            elif op == 'OR':
-                return 'true' if (left_val != 0 or right_val != 0) else 'false'
-            else:
-                return None
-
-            # Retorna como inteiro se possível, senão como float
-            if isinstance(result, float) and result.is_integer():
-                return str(int(result))
-            return str(result)
-
-        except (ValueError, TypeError, ZeroDivisionError):
+        if op == ADD:
+            result = left_val + right_val
+        elif op == SUB:
+            result = left_val - right_val
+        elif op == MUL:
+            result = left_val * right_val
+        elif op == DIV:
+            if right_val == 0:
+                return None  # Não otimizar divisão por zero
+            result = left_val / right_val
+        elif op == JEQ:
+            return 'true' if left_val == right_val else 'false'
+        elif op == JNE:
+            return 'true' if left_val != right_val else 'false'
+        elif op == JLT:
+            return 'true' if left_val < right_val else 'false'
+        elif op == JGT:
+            return 'true' if left_val > right_val else 'false'
+        elif op == JLE:
+            return 'true' if left_val <= right_val else 'false'
+        elif op == JGE:
+            return 'true' if left_val >= right_val else 'false'
+        elif op == AND:
+            # Trata como booleano: 0 = false, não-zero = true
+            return 'true' if (left_val != 0 and right_val != 0) else 'false'
+        elif op == OR:
+            return 'true' if (left_val != 0 or right_val != 0) else 'false'
+        else:
             return None
 
-    def _constant_folding(self, instructions: List[TACInstruction]) -> List[TACInstruction]:
+        # Retorna como inteiro se possível, senão como float
+        if isinstance(result, float) and result.is_integer():
+            return str(int(result))
+        return str(result)
+
+    def _constant_folding(self, code: PackedTAC) -> PackedTAC:
         """
         Dobramento de constantes: Avalia expressões constantes em tempo de compilação.
         Exemplo: T1 := 5 + 3  =>  T1 := 8
         """
-        optimized = []
-
-        for inst in instructions:
-            if inst.op in ['ADD', 'SUB', 'MUL', 'DIV', 'JEQ', 'JNE', 'JLT', 'JGT', 'JLE', 'JGE', 'AND', 'OR']:
-                # Se ambos operandos são constantes, avalia
-                if self._is_constant(inst.addr2) and self._is_constant(inst.addr3):
-                    result = self._eval_binop(inst.op, inst.addr2, inst.addr3)
-                    if result is not None:
-                        # Substitui por atribuição direta
-                        optimized.append(TACInstruction('ATR', inst.addr1, result, None))
-                        self.optimizations_applied.append(f'Constant folding: {inst.op} {inst.addr2} {inst.addr3} => {result}')
-                        continue
-
-            optimized.append(inst)
+        table = code.operands
+        kinds, values, texts = table.kinds, table.values, table.texts
+        optimized = code.copy_empty()
+        emit = optimized.append
+
+        for op, a1, a2, a3 in zip(code.ops, code.a1, code.a2, code.a3):
+            # Se ambos operandos são constantes, avalia
+            if op in BINARY_OPS and kinds[a2] == NUM and kinds[a3] == NUM:
+                result = self._eval_binop(op, values[a2], values[a3])
+                if result is not None:
+                    # Substitui por atribuição direta
+                    emit(ATR, a1, table.intern(result))
+                    self.optimizations_applied.append(
+                        f'Constant folding: {OP_NAMES[op]} {texts[a2]} {texts[a3]} => {result}')
+                    continue
+
+            emit(op, a1, a2, a3)
 
         return optimized
 
-    def _constant_propagation(self, instructions: List[TACInstruction]) -> List[TACInstruction]:
+    def _constant_propagation(self, code: PackedTAC) -> PackedTAC:
         """
         Propagação de constantes: Substitui variáveis por seus valores constantes.
         Exemplo:
             A := 5
             B := A + 3  =>  B := 5 + 3
         """
-        constants: Dict[str, str] = {}
-        optimized = []
+        kinds = code.operands.kinds
+        constants: Dict[int, int] = {}
+        optimized = code.copy_empty()
+        emit = optimized.append
 
-        for inst in instructions:
+        for op, a1, a2, a3 in zip(code.ops, code.a1, code.a2, code.a3):
             # Limpa constantes em pontos de controle
-            if inst.op in ['LABEL', 'JMP', 'JZ', 'JNZ', 'CALL']:
+            if op in CONTROL_OPS:
                 constants.clear()
 
             # Propaga constantes nos operandos
-            addr2 = inst.addr2
-            addr3 = inst.addr3
-
-            if addr2 and addr2 in constants:
-                addr2 = constants[addr2]
+            emit(op, a1, constants.get(a2, a2), constants.get(a3, a3))
 
-            if addr3 and addr3 in constants:
-                addr3 = constants[addr3]
+            # Registra novas constantes (qualquer outra definição invalida)
+            if op == ATR and a1 and a2 and kinds[a2] == NUM:
+                constants[a1] = a2
+            elif a1 in constants and op in DEFINES_ADDR1:
+                del constants[a1]
 
-            # Cria instrução com operandos propagados
-            new_inst = TACInstruction(inst.op, inst.addr1, addr2, addr3)
-            optimized.append(new_inst)
+        return optimized
 
-            # Registra novas constantes
-            if inst.op == 'ATR' and inst.addr1 and inst.addr2:
-                if self._is_constant(inst.addr2):
-                    constants[inst.addr1] = inst.addr2
-                elif inst.addr1 in constants:
-                    del constants[inst.addr1]
+    def _sparse_conditional_constant_propagation(self, code: PackedTAC) -> PackedTAC:
+        """
+        Propagação de constantes condicional esparsa (sccp.py): propaga
+        constantes através de rótulos e desvios sobre a SSA, decide os
+        saltos condicionais com condição constante e remove os blocos que
+        nenhuma execução alcança.
+        Exemplo:
+            debug := 0
+            JZ L1 debug   =>  JMP L1  (e o bloco do then some)
+        """
+        try:
+            sccp = SCCP(code, self._eval_binop)
+        except CFGError:
+            return code  # salto para rótulo inexistente: sem CFG, sem análise
+        cfg = sccp.cfg
+        if sccp.ssa.prologue:
+            return code  # código antes da primeira entrada: fora das funções
+
+        texts = code.operands.texts
+
+        def show(op, *operands):
+            return ' '.join([OP_NAMES[op]] + [texts[a] for a in operands if a])
+
+        optimized = code.copy_empty()
+        emit = optimized.append
+        for block in range(len(cfg)):
+            start = cfg.starts[block]
+            if not sccp.executable[block]:
+                name = texts[code.a1[start]] if code.ops[start] == LABEL else f'at {start}'
+                self.optimizations_applied.append(f'SCCP: unreachable block {name} removed')
+                continue
+            for i in cfg.block_range(block):
+                original = (code.ops[i], code.a1[i], code.a2[i], code.a3[i])
+                instruction = sccp.fold(block, i)
+                if instruction is None:
+                    self.optimizations_applied.append(f'SCCP: {show(*original)} removed')
+                    continue
+                if instruction != original:
+                    self.optimizations_applied.append(f'SCCP: {show(*original)} => {show(*instruction)}')
+                emit(*instruction)
 
         return optimized
 
-    def _copy_propagation(self, instructions: List[TACInstruction]) -> List[TACInstruction]:
+    def _copy_propagation(self, code: PackedTAC) -> PackedTAC:
         """
         Propagação de cópias: Substitui variáveis que são cópias de outras.
         Exemplo:
             T1 := A
             T2 := T1 + B  =>  T2 := A + B
         """
-        copies: Dict[str, str] = {}
-        optimized = []
-
-        for inst in instructions:
+        kinds = code.operands.kinds
+        copies: Dict[int, int] = {}
+        # Origem -> variáveis registradas como cópia dela (para invalidar)
+        copied_from: Dict[int, List[int]] = {}
+        optimized = code.copy_empty()
+        emit = optimized.append
+
+        for op, a1, a2, a3 in zip(code.ops, code.a1, code.a2, code.a3):
             # Limpa cópias em pontos de controle
-            if inst.op in ['LABEL', 'JMP', 'JZ', 'JNZ', 'CALL']:
+            if op in CONTROL_OPS:
                 copies.clear()
+                copied_from.clear()
 
             # Propaga cópias nos operandos
-            addr2 = inst.addr2
-            addr3 = inst.addr3
+            emit(op, a1, copies.get(a2, a2), copies.get(a3, a3))
 
-            if addr2 and addr2 in copies:
-                addr2 = copies[addr2]
-
-            if addr3 and addr3 in copies:
-                addr3 = copies[addr3]
-
-            # Cria instrução com operandos propagados
-            new_inst = TACInstruction(inst.op, inst.addr1, addr2, addr3)
-            optimized.append(new_inst)
-
-            # Registra novas cópias (A := B)
-            if inst.op == 'ATR' and inst.addr1 and inst.addr2:
-                if self._is_variable(inst.addr2) and not self._is_constant(inst.addr2):
-                    copies[inst.addr1] = inst.addr2
-                elif inst.addr1 in copies:
-                    del copies[inst.addr1]
+            # Registra novas cópias (A := B); qualquer outra definição invalida
+            if op == ATR and a1 and a2 and kinds[a2] != NUM:
+                copies[a1] = a2
+                copied_from.setdefault(a2, []).append(a1)
+            elif a1 in copies and op in DEFINES_ADDR1:
+                del copies[a1]
 
             # Invalida cópias se a variável é modificada
-            if inst.addr1:
+            if a1:
                 # Remove todas as cópias que dependem desta variável
-                to_remove = [k for k, v in copies.items() if v == inst.addr1]
-                for k in to_remove:
-                    del copies[k]
+                for k in copied_from.pop(a1, ()):
+                    if copies.get(k) == a1:
+                        del copies[k]
 
         return optimized
 
-    def _dead_code_elimination(self, instructions: List[TACInstruction]) -> List[TACInstruction]:
+    def _dead_code_elimination(self, code: PackedTAC) -> PackedTAC:
         """
         Eliminação de código morto: Remove instruções que nunca são usadas.
         Remove temporárias que são atribuídas mas nunca lidas.
         """
+        table = code.operands
+        kinds, texts = table.kinds, table.texts
         # Primeira passagem: identifica variáveis usadas
-        used_vars: Set[str] = set()
+        used = bytearray(len(table))
 
-        for inst in instructions:
+        for op, a1, a2, a3 in zip(code.ops, code.a1, code.a2, code.a3):
             # Marcar operandos como usados
-            if inst.addr2:
-                used_vars.add(inst.addr2)
-            if inst.addr3:
-                used_vars.add(inst.addr3)
+            used[a2] = used[a3] = 1
 
             # Instruções especiais sempre marcam seus operandos como usados
-            if inst.op in ['JZ', 'JNZ', 'WRITE', 'RETURN', 'PARAM']:
-                if inst.addr1:
-                    used_vars.add(inst.addr1)
+            if op in USES_ADDR1:
+                used[a1] = 1
 
         # Segunda passagem: remove atribuições a variáveis não usadas
-        optimized = []
+        optimized = code.copy_empty()
+        emit = optimized.append
+
+        for op, a1, a2, a3 in zip(code.ops, code.a1, code.a2, code.a3):
+            # Mantém instruções que não são atribuições, atribuições a
+            # variáveis do programa (não temporárias) e temporárias usadas
+            if op not in ASSIGN_OPS or kinds[a1] != TEMP or used[a1]:
+                emit(op, a1, a2, a3)
+            else:
+                self.optimizations_applied.append(f'Dead code eliminated: {OP_NAMES[op]} {texts[a1]}')
 
-        for inst in instructions:
-            # Mantém instruções que não são atribuições
-            if inst.op not in ['ATR', 'ADD', 'SUB', 'MUL', 'DIV', 'JEQ', 'JNE', 'JLT', 'JGT', 'JLE', 'JGE', 'AND', 'OR', 'NOT']:
-                optimized.append(inst)
-                continue
+        return optimized
 
-            # Mantém atribuições a variáveis usadas ou não-temporárias
-            if inst.addr1:
-                # Sempre mantém variáveis do programa (não temporárias)
-                if not self._is_temp(inst.addr1):
-                    optimized.append(inst)
-                # Mantém temporárias se forem usadas
-                elif inst.addr1 in used_vars:
-                    optimized.append(inst)
-                else:
-                    self.optimizations_applied.append(f'Dead code eliminated: {inst.op} {inst.addr1}')
-            else:
-                optimized.append(inst)
+    def _dead_store_elimination(self, code: PackedTAC) -> PackedTAC:
+        """
+        Eliminação de atribuições mortas: remove atribuições a variáveis do
+        programa que não são lidas antes de serem redefinidas (ou do fim do
+        programa), pela análise de vivacidade sobre o CFG (liveness.py).
+        """
+        try:
+            dead = Liveness(build_cfg(code)).dead_stores()
+        except CFGError:
+            return code  # salto para rótulo inexistente: sem CFG, sem análise
+        if not dead:
+            return code
+
+        texts = code.operands.texts
+        optimized = code.copy_empty()
+        emit = optimized.append
+        dead.append(len(code))
+        start = 0
+        for index in dead:
+            for i in range(start, index):
+                emit(code.ops[i], code.a1[i], code.a2[i], code.a3[i])
+            if index < len(code):
+                self.optimizations_applied.append(
+                    f'Dead store eliminated: {OP_NAMES[code.ops[index]]} {texts[code.a1[index]]}')
+            start = index + 1
 
         return optimized
 
-    def _common_subexpression_elimination(self, instructions: List[TACInstruction]) -> List[TACInstruction]:
+    def _common_subexpression_elimination(self, code: PackedTAC) -> PackedTAC:
         """
         Eliminação de subexpressões comuns (CSE): Reutiliza resultados de cálculos idênticos.
         Exemplo:
             T1 := A + B
             T2 := A + B  =>  T2 := T1
         """
+        texts = code.operands.texts
         # Mapeia expressões para suas variáveis resultado
-        expressions: Dict[Tuple[str, str, str], str] = {}
+        expressions: Dict[Tuple[int, int, int], int] = {}
+        # Operando -> expressões que o leem (para invalidar)
+        readers: Dict[int, List[Tuple[int, int, int]]] = {}
         # Mapeia variáveis para suas substituições
-        replacements: Dict[str, str] = {}
-        optimized = []
+        replacements: Dict[int, int] = {}
+        optimized = code.copy_empty()
+        emit = optimized.append
 
-        for inst in instructions:
+        for op, a1, a2, a3 in zip(code.ops, code.a1, code.a2, code.a3):
             # Limpa expressões em pontos de controle
-            if inst.op in ['LABEL', 'JMP', 'JZ', 'JNZ', 'CALL']:
+            if op in CONTROL_OPS:
                 expressions.clear()
+                readers.clear()
                 replacements.clear()
 
             # Aplica substituições nos operandos
-            addr2 = inst.addr2
-            addr3 = inst.addr3
-
-            if addr2 and addr2 in replacements:
-                addr2 = replacements[addr2]
-
-            if addr3 and addr3 in replacements:
-                addr3 = replacements[addr3]
+            a2 = replacements.get(a2, a2)
+            a3 = replacements.get(a3, a3)
 
             # Verifica se é uma operação que pode ser eliminada
-            if inst.op in ['ADD', 'SUB', 'MUL', 'DIV', 'JEQ', 'JNE', 'JLT', 'JGT', 'JLE', 'JGE', 'AND', 'OR']:
-                expr_key = (inst.op, addr2, addr3)
+            if op in BINARY_OPS:
+                expr_key = (op, a2, a3)
+                existing_var = expressions.get(expr_key)
 
-                if expr_key in expressions:
+                if existing_var is not None:
                     # Subexpressão comum encontrada! Substitui por cópia
-                    existing_var = expressions[expr_key]
-                    optimized.append(TACInstruction('ATR', inst.addr1, existing_var, None))
-                    replacements[inst.addr1] = existing_var
-                    self.optimizations_applied.append(f'CSE: {inst.op} {addr2} {addr3} reused as {existing_var}')
+                    emit(ATR, a1, existing_var)
+                    replacements[a1] = existing_var
+                    self.optimizations_applied.append(
+                        f'CSE: {OP_NAMES[op]} {texts[a2]} {texts[a3]} reused as {texts[existing_var]}')
                 else:
                     # Nova expressão
-                    new_inst = TACInstruction(inst.op, inst.addr1, addr2, addr3)
-                    optimized.append(new_inst)
-                    expressions[expr_key] = inst.addr1
+                    emit(op, a1, a2, a3)
+                    expressions[expr_key] = a1
+                    readers.setdefault(a2, []).append(expr_key)
+                    readers.setdefault(a3, []).append(expr_key)
             else:
                 # Outras instruções
-                new_inst = TACInstruction(inst.op, inst.addr1, addr2, addr3)
-                optimized.append(new_inst)
+                emit(op, a1, a2, a3)
 
             # Invalida expressões quando variáveis são modificadas
-            if inst.addr1:
+            if a1:
                 # Remove expressões que usam esta variável
-                to_remove = [k for k, v in expressions.items() if inst.addr1 in (k[1], k[2])]
-                for k in to_remove:
-                    del expressions[k]
+                for k in readers.pop(a1, ()):
+                    expressions.pop(k, None)
+
+        return optimized
 
+    def _loop_invariant_code_motion(self, code: PackedTAC) -> PackedTAC:
+        """
+        Movimentação de código invariante (loops.py): operações cujos
+        operandos não mudam dentro de um laço saem para um pré-cabeçalho
+        antes dele e executam uma vez só.
+        Exemplo:
+            LABEL L1                    T3 := a * b
+            T3 := a * b           =>    LABEL L1
+            T4 := s + T3                T4 := s + T3
+        """
+        try:
+            optimized, moved = hoist_invariants(code)
+        except CFGError:
+            return code  # salto para rótulo inexistente: sem CFG, sem análise
+        texts = code.operands.texts
+        for label, op, a1, a2, a3 in moved:
+            self.optimizations_applied.append(
+                f'LICM: {OP_NAMES[op]} {texts[a1]} {texts[a2]} {texts[a3]} hoisted out of loop {texts[label]}')
         return optimized
 
     def print_optimizations(self):
@@ -365,14 +431,14 @@ class TACOptimizer:
         print('='*60)
 
 
-def optimize_tac(instructions: List[TACInstruction],
+def optimize_tac(instructions: Union[List[TACInstruction], PackedTAC],
                  passes: Optional[List[str]] = None,
-                 verbose: bool = True) -> List[TACInstruction]:
+                 verbose: bool = True) -> Union[List[TACInstruction], PackedTAC]:
     """
     Função utilitária para otimizar código TAC.
 
     Args:
-        instructions: Lista de instruções TAC
+        instructions: Lista de instruções TAC ou PackedTAC
         passes: Passes de otimização a aplicar (None = todas)
         verbose: Se True, imprime informações sobre otimizações
 
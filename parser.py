@@ -1,6 +1,9 @@
-from lexer import Token
+import sys
+
+from lexer import TOKEN_KINDS, Token, TokenBuffer
 from ast_nodes import *
-from typing import List, Dict, Optional
+from walker import node_fields
+from typing import List, Dict, Optional, Tuple
 
 class ParserError(Exception):
     pass
@@ -8,32 +11,115 @@ class ParserError(Exception):
 class SemanticError(Exception):
     pass
 
+class Type:
+    """
+    Tipo da análise semântica. Há um único objeto por tipo declarado: os
+    primitivos são os objetos abaixo e cada alias da seção 'type' cria o seu
+    ao ser declarado, já apontando para o tipo primitivo final (a cadeia de
+    aliases é resolvida uma única vez). `id` é o do tipo base e indexa as
+    tabelas COMPATIBLE e ARITH_RESULT.
+    """
+    __slots__ = ('name', 'base', 'id')
+
+    def __init__(self, name: str, base: Optional['Type'] = None, id: int = -1):
+        self.name = name
+        self.base = base.base if base is not None else self
+        self.id = self.base.id if base is not None else id
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"Type({self.name!r})" if self.base is self else f"Type({self.name!r} -> {self.base.name!r})"
+
+
+INTEGER = Type('integer', id=0)
+REAL = Type('real', id=1)
+BOOLEAN = Type('boolean', id=2)
+STRING = Type('string', id=3)
+VOID = Type('void', id=4)  # read/write
+UNKNOWN = Type('unknown', id=5)  # resultado de uma expressão com erro
+BUILTIN_TYPES = (INTEGER, REAL, BOOLEAN, STRING, VOID, UNKNOWN)
+
+
+def _build_type_tables():
+    """Compatibilidade e resultado aritmético (+ - * /) entre tipos base"""
+    n = len(BUILTIN_TYPES)
+    numeric = (INTEGER.id, REAL.id)
+    compatible = [[a == b or a == UNKNOWN.id or b == UNKNOWN.id or (a in numeric and b in numeric)
+                   for b in range(n)] for a in range(n)]
+    arith = [[None] * n for _ in range(n)]
+    for a in numeric:
+        for b in numeric:
+            arith[a][b] = REAL if REAL.id in (a, b) else INTEGER
+    return tuple(map(tuple, compatible)), tuple(map(tuple, arith))
+
+
+# COMPATIBLE[a.id][b.id]: valores dos tipos a e b são compatíveis
+# ARITH_RESULT[a.id][b.id]: tipo de 'a + b' (None se os operandos não são numéricos)
+COMPATIBLE, ARITH_RESULT = _build_type_tables()
+
+# Classe de cada operador de BinOp.op (o parser grava os operadores já em
+# minúsculas), usada por infer_binop_type
+_ARITH_OP, _REL_OP, _BOOL_OP, _NOT_OP = 1, 2, 3, 4
+_OPERATOR_CLASS = {
+    '+': _ARITH_OP, '-': _ARITH_OP, '*': _ARITH_OP, '/': _ARITH_OP,
+    '=': _REL_OP, '<>': _REL_OP, '<': _REL_OP, '>': _REL_OP, '<=': _REL_OP, '>=': _REL_OP,
+    'and': _BOOL_OP, 'or': _BOOL_OP,
+    'not': _NOT_OP,
+}
+
+
 class Symbol:
     """Representa um símbolo na tabela de símbolos"""
-    def __init__(self, name: str, symbol_type: str, kind: str, scope_level: int):
+    def __init__(self, name: str, symbol_type: Type, kind: str, scope_level: int):
         self.name = name
-        self.symbol_type = symbol_type  # tipo do símbolo (integer, real, etc)
+        self.symbol_type = symbol_type  # tipo do símbolo (INTEGER, REAL, alias etc)
         self.kind = kind  # 'var', 'const', 'function', 'type', 'param'
         self.scope_level = scope_level
-        self.params = []  # para funções: lista de (nome, tipo)
+        self.index = 0  # posição de declaração no seu escopo
+        self.params = []  # para funções: lista de (nome, Type)
         self.return_type = None  # para funções
 
 class SymbolTable:
-    """Tabela de símbolos com suporte a escopos aninhados"""
+    """
+    Tabela de símbolos com suporte a escopos aninhados.
+
+    Além da lista de escopos, cada nome (em minúsculas) aponta para a pilha
+    de símbolos visíveis com esse nome; o topo da pilha é a declaração mais
+    interna. A busca é um único acesso a dicionário, e entrar/sair de um
+    escopo custa O(1) por declaração.
+    """
     def __init__(self):
         self.scopes: List[Dict[str, Symbol]] = [{}]
         self.current_level = 0
+        self.visible: Dict[str, List[Symbol]] = {}
+        self.base: List[Dict[str, Symbol]] = []  # escopos herdados (from_scopes)
         self._add_builtin_types()
     
     def _add_builtin_types(self):
         """Adiciona tipos primitivos à tabela"""
-        for type_name in ['integer', 'real', 'boolean', 'string']:
-            self.scopes[0][type_name] = Symbol(
-                name=type_name,
-                symbol_type=type_name,
+        for builtin in [INTEGER, REAL, BOOLEAN, STRING]:
+            self.declare(Symbol(
+                name=builtin.name,
+                symbol_type=builtin,
                 kind='type',
                 scope_level=0
-            )
+            ))
+
+    @classmethod
+    def from_scopes(cls, scopes: List[Dict[str, Symbol]]) -> 'SymbolTable':
+        """
+        Recria uma tabela sobre dicionários de escopo já preenchidos, sem
+        percorrê-los: um nome que não foi declarado na nova tabela é
+        procurado nesses escopos, do mais interno ao global.
+        """
+        table = cls.__new__(cls)
+        table.scopes = list(scopes)
+        table.current_level = len(table.scopes) - 1
+        table.visible = {}
+        table.base = table.scopes[::-1]
+        return table
     
     def enter_scope(self):
         """Entra em um novo escopo"""
@@ -43,12 +129,16 @@ class SymbolTable:
     def exit_scope(self):
         """Sai do escopo atual"""
         if self.current_level > 0:
-            self.scopes.pop()
+            for name_lower in self.scopes.pop():
+                stack = self.visible[name_lower]
+                stack.pop()
+                if not stack:
+                    del self.visible[name_lower]
             self.current_level -= 1
     
     def declare(self, symbol: Symbol):
         """Declara um símbolo no escopo atual"""
-        name_lower = symbol.name.lower()
+        name_lower = sys.intern(symbol.name.lower())
         
         if name_lower in self.scopes[self.current_level]:
             raise SemanticError(
@@ -56,57 +146,224 @@ class SymbolTable:
             )
         
         symbol.scope_level = self.current_level
+        symbol.index = len(self.scopes[self.current_level])
         self.scopes[self.current_level][name_lower] = symbol
+        self.visible.setdefault(name_lower, []).append(symbol)
     
     def lookup(self, name: str) -> Optional[Symbol]:
-        """Busca um símbolo em todos os escopos"""
+        """Busca o símbolo visível mais interno com o nome dado"""
         name_lower = name.lower()
-        for i in range(self.current_level, -1, -1):
-            if name_lower in self.scopes[i]:
-                return self.scopes[i][name_lower]
+        stack = self.visible.get(name_lower)
+        if stack:
+            return stack[-1]
+        for scope in self.base:
+            symbol = scope.get(name_lower)
+            if symbol is not None:
+                return symbol
         return None
     
-    def resolve_type(self, type_name: str) -> str:
-        """Resolve um tipo customizado para seu tipo base"""
+    def lookup_type(self, type_name: str) -> Optional[Type]:
+        """Objeto Type declarado com o nome dado (None se não é um tipo)"""
         symbol = self.lookup(type_name)
         if not symbol or symbol.kind != 'type':
-            return type_name
-        if symbol.symbol_type == type_name:
-            return type_name
-        return self.resolve_type(symbol.symbol_type)
+            return None
+        return symbol.symbol_type
+
+    def resolve_type(self, type_name: str) -> str:
+        """Resolve um tipo customizado para o nome do seu tipo base"""
+        type_obj = self.lookup_type(type_name)
+        return type_obj.base.name if type_obj else type_name
+
+
+class GlobalScopeView:
+    """
+    Escopo global visto por um nó reanalisado isoladamente: só os `limit`
+    primeiros símbolos de `base` (os declarados antes do nó) são visíveis,
+    sem copiar o dicionário. Declarações novas ficam em `added`.
+    """
+
+    def __init__(self, base: Dict[str, Symbol], limit: int):
+        self.base = base
+        self.limit = limit
+        self.added: Dict[str, Symbol] = {}
+
+    def get(self, name_lower: str, default=None) -> Optional[Symbol]:
+        symbol = self.added.get(name_lower)
+        if symbol is None:
+            symbol = self.base.get(name_lower)
+            if symbol is None or symbol.index >= self.limit:
+                return default
+        return symbol
+
+    def __contains__(self, name_lower: str) -> bool:
+        return self.get(name_lower) is not None
+
+    def __setitem__(self, name_lower: str, symbol: Symbol):
+        self.added[name_lower] = symbol
+
+    def __len__(self) -> int:
+        return self.limit + len(self.added)
+
+
+class NodeSpan:
+    """
+    Intervalo de tokens de um Compound ou FunctionDecl, registrado quando o
+    parser é criado com record_spans=True (usado pela análise incremental).
+
+    Guarda também o intervalo de erros semânticos gerados pelo nó e o estado
+    dos escopos visíveis no início do nó, para que ele possa ser reanalisado
+    isoladamente, além do intervalo que o contém (parent) e do lugar do nó
+    na AST (slot), para trocá-lo sem percorrer a árvore.
+    """
+    __slots__ = ('node', 'start', 'end', 'err_start', 'err_end', 'scopes', 'global_count',
+                 'parent', 'slot')
+
+    def __init__(self, node, start, end, err_start, err_end, scopes, global_count, parent=None):
+        self.node = node
+        self.start = start  # índice do primeiro token ('begin' ou 'function')
+        self.end = end  # índice do último token ('end' ou ';' da função)
+        self.err_start = err_start
+        self.err_end = err_end
+        self.scopes = scopes  # dicionários de escopo visíveis (referências)
+        self.global_count = global_count  # símbolos globais já declarados
+        self.parent = parent  # menor intervalo que contém este (None: filho do Program)
+        self.slot = None  # (lista, índice) ou (nó, campo) onde o nó está na AST
+
+    def replace_node(self, node):
+        """Coloca `node` no lugar do nó deste intervalo, na AST"""
+        container, key = self.slot
+        if isinstance(key, int):
+            container[key] = node
+        else:
+            setattr(container, key, node)
+        self.node = node
+
+
+# Precedência dos operadores (maior = liga mais forte). 'not' é prefixo e se
+# aplica só ao fator seguinte, por isso fica acima de todos os binários.
+_OR_PREC, _REL_PREC, _ADD_PREC, _MUL_PREC, _NOT_PREC = 1, 2, 3, 4, 5
+_NOT_OPERATOR = (_NOT_PREC, 'not')
+_PAREN_FRAME = (0, None)
+_OP_MAT_PREC = {'+': _ADD_PREC, '-': _ADD_PREC, '*': _MUL_PREC, '/': _MUL_PREC}
+
+
+_TOKEN_PREC = {'OP_REL': _REL_PREC, 'AND': _OR_PREC, 'OR': _OR_PREC}
+# Operadores escritos como palavras: o BinOp guarda a forma minúscula
+_KEYWORD_OPS = {'AND': 'and', 'OR': 'or'}
+
+
+def _new_leaf(cls, value):
+    return cls(value)
+
+
+def _link_slots(node, children: List[NodeSpan]):
+    """
+    Preenche o slot de cada intervalo filho procurando o seu nó abaixo de
+    `node`, sem descer nos nós dos filhos (cada nó é visitado uma vez só).
+    """
+    if not children:
+        return
+    by_id = {id(child.node): child for child in children}
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for field in node_fields(current):
+            value = getattr(current, field)
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    if id(item) in by_id:
+                        by_id[id(item)].slot = (value, i)
+                    elif isinstance(item, ASTNode):
+                        stack.append(item)
+            elif id(value) in by_id:
+                by_id[id(value)].slot = (current, field)
+            elif isinstance(value, ASTNode):
+                stack.append(value)
 
 
 class Parser:
-    def __init__(self, tokens: List[Token], enable_semantic=True):
-        self.tokens = list(tokens)
+    def __init__(self, tokens: List[Token], enable_semantic=True, record_spans=False,
+                 recursive_expressions=False, hash_cons=False):
+        # Listas e TokenBuffers são indexados diretamente, sem cópia. O parser
+        # lê só o tipo e o lexema de cada posição: de um TokenBuffer eles saem
+        # das colunas, sem criar Token (só peek()/peek_next() criam um).
+        self.tokens = tokens if isinstance(tokens, (list, TokenBuffer)) else list(tokens)
+        self.n_tokens = len(self.tokens)
         self.pos = 0
+        if isinstance(self.tokens, TokenBuffer):
+            self._kinds = self.tokens.kinds
+            self.peek_type = self._buffer_type
+            self.lexeme_at = self.tokens.lexeme
+        else:
+            self.peek_type = self._list_type
+            self.lexeme_at = self._list_lexeme
         self.enable_semantic = enable_semantic
+        # Expressões por descida recursiva (referência) em vez de precedence climbing
+        self.recursive_expressions = recursive_expressions
+
+        # Hash-consing: subexpressões iguais sem chamadas são o mesmo objeto
+        # (a AST vira um DAG). Chave: classe e valor das folhas, ou operador e
+        # id dos filhos; o próprio nó fica no valor, então os ids não mudam.
+        self.hash_cons = hash_cons
+        self.cons_table: Dict[tuple, ASTNode] = {}
+        self.shared_ids = set()
+        self.new_leaf = self._cons_leaf if hash_cons else _new_leaf
+        self.new_binop = self._cons_binop if hash_cons else BinOp
         
         # Análise Semântica
         self.symbol_table = SymbolTable()
         self.semantic_errors = []
         self.current_function = None
+        # Tipos inferidos: id(nó) -> (nó, tipo), lido por type_of()
+        self.expr_types: Dict[int, Tuple[ASTNode, str]] = {}
+        # Ligações resolvidas de Var/Call/Assign: id(nó) -> (nó, Symbol)
+        self.bindings: Dict[int, Tuple[ASTNode, Symbol]] = {}
+
+        # Análise incremental: intervalos de Compound/FunctionDecl (pré-ordem)
+        # e, para cada intervalo aberto, os filhos já fechados
+        self.record_spans = record_spans
+        self.node_spans: List[NodeSpan] = []
+        self._open_spans: List[Tuple[Optional[NodeSpan], List[NodeSpan]]] = [(None, [])]
 
     # ======== Funções utilitárias ========
     def peek(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        return self.tokens[self.pos] if self.pos < self.n_tokens else None
+
+    def peek_next(self):
+        """Retorna o token seguinte ao atual (lookahead de 2)"""
+        return self.tokens[self.pos + 1] if (self.pos + 1) < self.n_tokens else None
+
+    def _list_type(self, offset=0):
+        """Tipo do token em pos + offset (None no fim da entrada)"""
+        pos = self.pos + offset
+        return self.tokens[pos].type if pos < self.n_tokens else None
+
+    def _list_lexeme(self, index):
+        return self.tokens[index].lexeme
+
+    def _buffer_type(self, offset=0):
+        pos = self.pos + offset
+        return TOKEN_KINDS[self._kinds[pos]] if pos < self.n_tokens else None
+
+    def peek_lexeme(self):
+        """Lexema do token atual (None no fim da entrada)"""
+        return None if self.peek_type() is None else self.lexeme_at(self.pos)
 
     def consume(self, expected_type=None, expected_value=None):
-        tok = self.peek()
-        if not tok:
+        """Avança um token, conferindo o tipo e o valor esperados, e retorna o lexema"""
+        tok_type = self.peek_type()
+        if tok_type is None:
             raise ParserError('Fim inesperado da entrada.')
-        if expected_type and tok.type != expected_type:
-            raise ParserError(f'Esperado token {expected_type}, mas encontrado {tok.type} ({tok.lexeme})')
-        if expected_value and tok.lexeme.lower() != expected_value.lower():
-            raise ParserError(f'Esperado {expected_value}, mas encontrado {tok.lexeme}')
+        lexeme = self.lexeme_at(self.pos)
+        if expected_type and tok_type != expected_type:
+            raise ParserError(f'Esperado token {expected_type}, mas encontrado {tok_type} ({lexeme})')
+        if expected_value and lexeme.lower() != expected_value.lower():
+            raise ParserError(f'Esperado {expected_value}, mas encontrado {lexeme}')
         self.pos += 1
-        return tok
+        return lexeme
 
     def match(self, *token_types):
-        tok = self.peek()
-        if tok and tok.type in token_types:
-            return True
-        return False
+        return self.peek_type() in token_types
     
     def add_semantic_error(self, message: str):
         """Adiciona erro semântico à lista"""
@@ -119,105 +376,187 @@ class Parser:
             error_msg = "\n".join(self.semantic_errors)
             raise SemanticError(f"Erros semânticos encontrados:\n{error_msg}")
 
+    def _span_context(self):
+        """Abre o intervalo de um nó que começa na posição atual"""
+        scopes = list(self.symbol_table.scopes)
+        span = NodeSpan(None, self.pos, None, len(self.semantic_errors), None,
+                        scopes, len(scopes[0]), self._open_spans[-1][0])
+        self.node_spans.append(span)
+        self._open_spans.append((span, []))
+        return span
+
+    def _record_span(self, node, span):
+        """Fecha o intervalo aberto por _span_context() e localiza os filhos no nó"""
+        span.node = node
+        span.end = self.pos - 1
+        span.err_end = len(self.semantic_errors)
+        _, children = self._open_spans.pop()
+        self._open_spans[-1][1].append(span)
+        _link_slots(node, children)
+
+    def _link_root_spans(self, program):
+        """Localiza os intervalos de nível mais externo no Program"""
+        _, children = self._open_spans[-1]
+        _link_slots(program, children)
+        children.clear()
+
+    def _cons_leaf(self, cls, value):
+        """Num/String/Var compartilhado para o mesmo valor (e tipo do número)"""
+        return self._cons((cls, type(value), value), cls, value)
+
+    def _cons_binop(self, op: str, left: ASTNode, right: Optional[ASTNode]) -> BinOp:
+        """BinOp compartilhado quando os operandos também são (sem Call abaixo)"""
+        shared = self.shared_ids
+        if id(left) not in shared or (right is not None and id(right) not in shared):
+            return BinOp(op, left, right)
+        return self._cons((op, id(left), id(right)), BinOp, op, left, right)
+
+    def _cons(self, key: tuple, cls, *values) -> ASTNode:
+        node = self.cons_table.get(key)
+        if node is None:
+            node = self.cons_table[key] = cls(*values)
+            self.shared_ids.add(id(node))
+        return node
+
+    def _reset_cons(self):
+        """Novo escopo: nomes iguais podem ser outros símbolos, então nada é compartilhado"""
+        self.cons_table.clear()
+        self.shared_ids.clear()
+
     # ======== Verificações Semânticas ========
+
+    def _bind(self, name: str, *nodes: ASTNode) -> Optional[Symbol]:
+        """Resolve `name` uma única vez e liga o símbolo encontrado aos nós"""
+        symbol = self.symbol_table.lookup(name)
+        if symbol is not None:
+            for node in nodes:
+                self.bindings[id(node)] = (node, symbol)
+        return symbol
+
+    def symbol_of(self, node: ASTNode) -> Optional[Symbol]:
+        """Símbolo ligado a um Var/Call/Assign (None se não foi resolvido)"""
+        bound = self.bindings.get(id(node))
+        return bound[1] if bound is not None else None
     
-    def types_compatible(self, type1: str, type2: str) -> bool:
-        """Verifica se dois tipos são compatíveis"""
-        if type1 == 'unknown' or type2 == 'unknown':
-            return True
-        
-        type1_lower = type1.lower()
-        type2_lower = type2.lower()
-        
-        if type1_lower == type2_lower:
-            return True
-        
-        # Integer pode ser promovido para real
-        if (type1_lower == 'real' and type2_lower == 'integer') or \
-           (type1_lower == 'integer' and type2_lower == 'real'):
-            return True
-        
-        # Resolve tipos customizados
-        base1 = self.symbol_table.resolve_type(type1)
-        base2 = self.symbol_table.resolve_type(type2)
-        return base1.lower() == base2.lower()
+    def types_compatible(self, type1: Type, type2: Type) -> bool:
+        """Verifica se dois tipos são compatíveis (integer e real se promovem)"""
+        return COMPATIBLE[type1.id][type2.id]
 
-    def infer_expression_type(self, node: ASTNode) -> str:
-        """Infere o tipo de uma expressão"""
+    def infer_expression_type(self, node: ASTNode) -> Type:
+        """
+        Infere o tipo de uma expressão. Cada nó é tipado uma única vez: o
+        resultado fica em expr_types e as chamadas seguintes (ex.: o comando
+        que contém uma chamada já tipada) não repetem a travessia nem os erros.
+        A árvore de operadores é percorrida com uma pilha explícita, então
+        expressões muito profundas não estouram a pilha do Python.
+        """
+        cached = self.expr_types.get(id(node))
+        if cached is not None:
+            return cached[1]
+
+        # Nós ainda sem tipo em pré-ordem (nó, direita, esquerda): percorrida
+        # ao contrário, cada filho é tipado antes do pai, da esquerda para a direita
+        pending = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            pending.append(current)
+            if isinstance(current, BinOp):
+                for child in (current.left, current.right):
+                    if child is not None and id(child) not in self.expr_types:
+                        stack.append(child)
+
+        for current in reversed(pending):
+            cached = self.expr_types.get(id(current))
+            result = cached[1] if cached is not None else self._infer_node_type(current)
+            # Guarda o próprio nó junto do tipo para que o id não seja reutilizado
+            self.expr_types[id(current)] = (current, result)
+        return result
+
+    def _infer_node_type(self, node: ASTNode) -> Type:
+        """Tipo de um nó cujos operandos (se houver) já foram tipados"""
         if isinstance(node, Num):
-            return 'integer' if isinstance(node.value, int) else 'real'
+            return INTEGER if isinstance(node.value, int) else REAL
         elif isinstance(node, String):
-            return 'string'
+            return STRING
         elif isinstance(node, Var):
-            symbol = self.symbol_table.lookup(node.name)
+            symbol = self._bind(node.name, node)
             if not symbol:
                 self.add_semantic_error(f"Erro: Variável '{node.name}' não foi declarada")
-                return 'unknown'
+                return UNKNOWN
             return symbol.symbol_type
         elif isinstance(node, BinOp):
             return self.infer_binop_type(node)
         elif isinstance(node, Call):
-            return self.infer_call_type(node)
-        return 'unknown'
+            return self._infer_call_type(node)
+        return UNKNOWN
+
+    def type_of(self, node: ASTNode) -> Optional[Type]:
+        """Tipo já inferido de uma expressão (None se ela não foi tipada)"""
+        cached = self.expr_types.get(id(node))
+        return cached[1] if cached is not None else None
     
-    def infer_binop_type(self, node: BinOp) -> str:
+    def infer_binop_type(self, node: BinOp) -> Type:
         """Infere o tipo de uma operação binária"""
-        op = node.op.lower()
+        op = node.op
+        op_class = _OPERATOR_CLASS.get(op)
         
-        if op == 'not':
+        if op_class == _NOT_OP:
             operand_type = self.infer_expression_type(node.left)
-            if operand_type != 'boolean':
+            if operand_type.base is not BOOLEAN:
                 self.add_semantic_error(
                     f"Erro: Operador 'not' requer operando booleano, mas recebeu '{operand_type}'"
                 )
-            return 'boolean'
+            return BOOLEAN
         
         left_type = self.infer_expression_type(node.left)
         right_type = self.infer_expression_type(node.right)
         
-        if op in ['+', '-', '*', '/']:
-            if left_type not in ['integer', 'real'] or right_type not in ['integer', 'real']:
+        if op_class == _ARITH_OP:
+            result = ARITH_RESULT[left_type.id][right_type.id]
+            if result is None:
                 self.add_semantic_error(
                     f"Erro: Operador '{op}' requer operandos numéricos, mas recebeu '{left_type}' e '{right_type}'"
                 )
-                return 'unknown'
-            if left_type == 'real' or right_type == 'real':
-                return 'real'
-            return 'integer'
+                return UNKNOWN
+            return result
         
-        elif op in ['=', '<>', '<', '>', '<=', '>=']:
-            if not self.types_compatible(left_type, right_type):
+        elif op_class == _REL_OP:
+            if not COMPATIBLE[left_type.id][right_type.id]:
                 self.add_semantic_error(
                     f"Erro: Operador '{op}' requer operandos do mesmo tipo, mas recebeu '{left_type}' e '{right_type}'"
                 )
-            return 'boolean'
+            return BOOLEAN
         
-        elif op in ['and', 'or']:
-            if left_type != 'boolean' or right_type != 'boolean':
+        elif op_class == _BOOL_OP:
+            if left_type.base is not BOOLEAN or right_type.base is not BOOLEAN:
                 self.add_semantic_error(
                     f"Erro: Operador '{op}' requer operandos booleanos, mas recebeu '{left_type}' e '{right_type}'"
                 )
-            return 'boolean'
+            return BOOLEAN
         
-        return 'unknown'
+        return UNKNOWN
     
-    def infer_call_type(self, node: Call) -> str:
-        """Infere o tipo de uma chamada de função"""
+    def infer_call_type(self, node: Call) -> Type:
+        """Infere o tipo de uma chamada de função (memoizado, ver infer_expression_type)"""
+        return self.infer_expression_type(node)
+
+    def _infer_call_type(self, node: Call) -> Type:
         func_name_lower = node.name.lower()
         
         if func_name_lower in ['read', 'write']:
             for arg in node.args:
                 self.infer_expression_type(arg)
-            return 'void'
+            return VOID
         
-        func_symbol = self.symbol_table.lookup(node.name)
+        func_symbol = self._bind(node.name, node)
         if not func_symbol:
             self.add_semantic_error(f"Erro: Função '{node.name}' não foi declarada")
-            return 'unknown'
+            return UNKNOWN
         
         if func_symbol.kind != 'function':
             self.add_semantic_error(f"Erro: '{node.name}' não é uma função")
-            return 'unknown'
+            return UNKNOWN
         
         expected_params = len(func_symbol.params)
         actual_params = len(node.args)
@@ -241,18 +580,27 @@ class Parser:
 
     # ======== Ponto de entrada ========
     def parse(self):
+        program = self.parse_program()
+
+        # Verifica erros semânticos ao final
+        self.check_semantic_errors()
+
+        return program
+
+    def parse_program(self):
+        """Analisa o programa sem lançar SemanticError (erros ficam em semantic_errors)"""
         self.consume('PROGRAM')
-        name_tok = self.consume('ID')
+        name = self.consume('ID')
         self.consume('PONT_VIRG')
 
         decls = self.parse_declarations()
         block = self.parse_block()
         self.consume('PONT')
-        
-        # Verifica erros semânticos ao final
-        self.check_semantic_errors()
 
-        return Program(name_tok.lexeme, decls, block)
+        program = Program(name, decls, block)
+        if self.record_spans:
+            self._link_root_spans(program)
+        return program
 
     # ======== Declarações ========
     def parse_declarations(self):
@@ -272,7 +620,7 @@ class Parser:
         consts = []
         self.consume('CONST')
         while not self.match('TYPE', 'VAR', 'FUNCTION', 'BEGIN'):
-            name = self.consume('ID').lexeme
+            name = self.consume('ID')
             self.consume('OP_ASSIGN')
             value = self.parse_expression()
             self.consume('PONT_VIRG')
@@ -293,23 +641,24 @@ class Parser:
         types = []
         self.consume('TYPE')
         while not self.match('VAR', 'FUNCTION', 'BEGIN'):
-            name = self.consume('ID').lexeme
+            name = self.consume('ID')
             self.consume('OP_REL', '=')
 
             if self.match('ID', 'INTEGER', 'REAL', 'BOOLEAN', 'STRING'):
-                definition = self.consume().lexeme
+                definition = self.consume()
             else:
-                raise ParserError(f'Definição de tipo inválida: {self.peek().lexeme}')
+                raise ParserError(f'Definição de tipo inválida: {self.peek_lexeme()}')
 
             self.consume('PONT_VIRG')
             
             # Semântica: verifica tipo base e declara novo tipo
             if self.enable_semantic:
-                base_type = self.symbol_table.lookup(definition)
-                if not base_type or base_type.kind != 'type':
+                base_type = self.symbol_table.lookup_type(definition)
+                if not base_type:
                     self.add_semantic_error(f"Erro: Tipo '{definition}' não foi declarado")
                 else:
-                    symbol = Symbol(name, definition, 'type', self.symbol_table.current_level)
+                    # O alias aponta direto para o tipo primitivo final
+                    symbol = Symbol(name, Type(name, base_type), 'type', self.symbol_table.current_level)
                     try:
                         self.symbol_table.declare(symbol)
                     except SemanticError as e:
@@ -322,26 +671,26 @@ class Parser:
         vars = []
         self.consume('VAR')
         while not self.match('BEGIN', 'FUNCTION'):
-            names = [self.consume('ID').lexeme]
+            names = [self.consume('ID')]
             while self.match('VIRG'):
                 self.consume('VIRG')
-                names.append(self.consume('ID').lexeme)
+                names.append(self.consume('ID'))
             self.consume('DOIS_PONT')
 
             if self.match('ID', 'INTEGER', 'REAL', 'BOOLEAN', 'STRING'):
-                type_tok = self.consume().lexeme
+                type_tok = self.consume()
             else:
-                raise ParserError(f'Tipo inválido: {self.peek().lexeme}')
+                raise ParserError(f'Tipo inválido: {self.peek_lexeme()}')
             self.consume('PONT_VIRG')
             
             # Semântica: verifica tipo e declara variáveis
             if self.enable_semantic:
-                type_symbol = self.symbol_table.lookup(type_tok)
-                if not type_symbol or type_symbol.kind != 'type':
+                var_type = self.symbol_table.lookup_type(type_tok)
+                if not var_type:
                     self.add_semantic_error(f"Erro: Tipo '{type_tok}' não foi declarado")
                 else:
                     for var_name in names:
-                        symbol = Symbol(var_name, type_tok, 'var', self.symbol_table.current_level)
+                        symbol = Symbol(var_name, var_type, 'var', self.symbol_table.current_level)
                         try:
                             self.symbol_table.declare(symbol)
                         except SemanticError as e:
@@ -351,8 +700,10 @@ class Parser:
         return vars
 
     def parse_function_section(self):
+        context = self._span_context() if self.record_spans else None
+        self._reset_cons()
         self.consume('FUNCTION')
-        name = self.consume('ID').lexeme
+        name = self.consume('ID')
         self.consume('ABRE_PARENT')
         params = []
         if not self.match('FECHA_PARENT'):
@@ -362,21 +713,23 @@ class Parser:
                 params.append(self.parse_param())
         self.consume('FECHA_PARENT')
         self.consume('DOIS_PONT')
-        return_type = self.consume().lexeme
+        return_type = self.consume()
         self.consume('PONT_VIRG')
         
         # Semântica: declara função no escopo atual
         if self.enable_semantic:
-            return_type_symbol = self.symbol_table.lookup(return_type)
-            if not return_type_symbol or return_type_symbol.kind != 'type':
+            return_type_obj = self.symbol_table.lookup_type(return_type)
+            if not return_type_obj:
                 self.add_semantic_error(f"Erro: Tipo de retorno '{return_type}' não foi declarado")
+                return_type_obj = UNKNOWN
             
-            func_symbol = Symbol(name, return_type, 'function', self.symbol_table.current_level)
-            func_symbol.return_type = return_type
+            func_symbol = Symbol(name, return_type_obj, 'function', self.symbol_table.current_level)
+            func_symbol.return_type = return_type_obj
             
-            for param in params:
+            param_types = [self.symbol_table.lookup_type(param.type_name) for param in params]
+            for param, param_type in zip(params, param_types):
                 for param_name in param.names:
-                    func_symbol.params.append((param_name, param.type_name))
+                    func_symbol.params.append((param_name, param_type or UNKNOWN))
             
             try:
                 self.symbol_table.declare(func_symbol)
@@ -391,13 +744,12 @@ class Parser:
             self.current_function = name
             
             # Declara parâmetros no escopo da função
-            for param in params:
-                param_type_symbol = self.symbol_table.lookup(param.type_name)
-                if not param_type_symbol or param_type_symbol.kind != 'type':
+            for param, param_type in zip(params, param_types):
+                if not param_type:
                     self.add_semantic_error(f"Erro: Tipo '{param.type_name}' não foi declarado")
                 else:
                     for param_name in param.names:
-                        param_symbol = Symbol(param_name, param.type_name, 'param', 
+                        param_symbol = Symbol(param_name, param_type, 'param', 
                                             self.symbol_table.current_level)
                         try:
                             self.symbol_table.declare(param_symbol)
@@ -414,23 +766,28 @@ class Parser:
         if self.enable_semantic:
             self.symbol_table.exit_scope()
             self.current_function = None
+        self._reset_cons()
         
-        return [FunctionDecl(name, params, return_type, local_vars, block)]
+        func = FunctionDecl(name, params, return_type, local_vars, block)
+        if context:
+            self._record_span(func, context)
+        return [func]
 
     def parse_param(self):
-        names = [self.consume('ID').lexeme]
+        names = [self.consume('ID')]
         while self.match('VIRG'):
             self.consume('VIRG')
-            names.append(self.consume('ID').lexeme)
+            names.append(self.consume('ID'))
         self.consume('DOIS_PONT')
         if self.match('ID', 'INTEGER', 'REAL', 'BOOLEAN', 'STRING'):
-            type_tok = self.consume().lexeme
+            type_tok = self.consume()
         else:
-            raise ParserError(f'Tipo inválido em parâmetro: {self.peek().lexeme}')
+            raise ParserError(f'Tipo inválido em parâmetro: {self.peek_lexeme()}')
         return VarDecl(names, type_tok)
 
     # ======== Blocos e comandos ========
     def parse_block(self):
+        context = self._span_context() if self.record_spans else None
         self.consume('BEGIN')
         stmts = []
         while not self.match('END'):
@@ -438,37 +795,41 @@ class Parser:
             if self.match('PONT_VIRG'):
                 self.consume('PONT_VIRG')
         self.consume('END')
-        return Compound(stmts)
+        block = Compound(stmts)
+        if context:
+            self._record_span(block, context)
+        return block
 
     def parse_statement(self):
-        tok = self.peek()
-        if not tok:
+        tok_type = self.peek_type()
+        if tok_type is None:
             raise ParserError('Esperava comando, mas encontrou EOF')
 
-        if tok.type == 'ID':
-            nxt = self.tokens[self.pos + 1] if (self.pos + 1) < len(self.tokens) else None
-            if nxt and nxt.type == 'OP_ASSIGN':
+        if tok_type == 'ID':
+            nxt_type = self.peek_type(1)
+            if nxt_type == 'OP_ASSIGN':
                 return self.parse_assignment()
-            elif nxt and nxt.type == 'ABRE_PARENT':
+            elif nxt_type == 'ABRE_PARENT':
                 return self.parse_call_statement()
-        elif tok.type == 'IF':
+        elif tok_type == 'IF':
             return self.parse_if()
-        elif tok.type == 'WHILE':
+        elif tok_type == 'WHILE':
             return self.parse_while()
-        elif tok.type == 'BEGIN':
+        elif tok_type == 'BEGIN':
             return self.parse_block()
-        elif tok.type in ('READ', 'WRITE'):
+        elif tok_type in ('READ', 'WRITE'):
             return self.parse_call_statement()
-        raise ParserError(f'Comando inesperado: {tok.lexeme}')
+        raise ParserError(f'Comando inesperado: {self.peek_lexeme()}')
 
     def parse_assignment(self):
-        var_name = self.consume('ID').lexeme
+        var_name = self.consume('ID')
         self.consume('OP_ASSIGN')
         expr = self.parse_expression()
+        node = Assign(Var(var_name), expr)
         
         # Semântica: verifica atribuição
         if self.enable_semantic:
-            var_symbol = self.symbol_table.lookup(var_name)
+            var_symbol = self._bind(var_name, node, node.target)
             if not var_symbol:
                 self.add_semantic_error(f"Erro: Variável '{var_name}' não foi declarada")
             elif var_symbol.kind == 'const':
@@ -483,7 +844,7 @@ class Parser:
                         f"'{var_symbol.symbol_type}', mas expressão é do tipo '{expr_type}'"
                     )
         
-        return Assign(Var(var_name), expr)
+        return node
 
     def parse_if(self):
         self.consume('IF')
@@ -492,7 +853,7 @@ class Parser:
         # Semântica: verifica condição
         if self.enable_semantic:
             cond_type = self.infer_expression_type(cond)
-            if cond_type != 'boolean':
+            if cond_type.base is not BOOLEAN:
                 self.add_semantic_error(
                     f"Erro: Condição do 'if' deve ser booleana, mas é '{cond_type}'"
                 )
@@ -512,7 +873,7 @@ class Parser:
         # Semântica: verifica condição
         if self.enable_semantic:
             cond_type = self.infer_expression_type(cond)
-            if cond_type != 'boolean':
+            if cond_type.base is not BOOLEAN:
                 self.add_semantic_error(
                     f"Erro: Condição do 'while' deve ser booleana, mas é '{cond_type}'"
                 )
@@ -523,9 +884,9 @@ class Parser:
 
     def parse_call_statement(self):
         if self.match('READ') or self.match('WRITE'):
-            name = self.consume().lexeme
+            name = self.consume()
         else:
-            name = self.consume('ID').lexeme
+            name = self.consume('ID')
         self.consume('ABRE_PARENT')
         args = []
         if not self.match('FECHA_PARENT'):
@@ -545,29 +906,133 @@ class Parser:
 
     # ======== Expressões ========
     def parse_expression(self):
+        if self.recursive_expressions:
+            return self.parse_expression_recursive()
+        return self.parse_expression_iterative()
+
+    def parse_expression_iterative(self):
+        """
+        Analisa uma expressão por precedência de operadores (precedence
+        climbing), com pilhas explícitas de operandos e operadores no lugar de
+        uma chamada recursiva por nível de precedência. Parênteses e chamadas
+        de função abrem quadros na pilha de operadores, então o aninhamento não
+        consome a pilha do Python. Produz as mesmas árvores BinOp (e os mesmos
+        erros) que parse_expression_recursive.
+        """
+        operands = []
+        # (precedência, lexema) de operadores pendentes; quadros têm precedência 0
+        operators = []
+        while True:
+            # ---- Operando, precedido de 'not's e aberturas de quadro ----
+            tok_type = self.peek_type()
+            if tok_type is None:
+                raise ParserError('Fim inesperado da entrada.')
+            if tok_type == 'CONST_NUM':
+                lexeme = self.lexeme_at(self.pos)
+                self.pos += 1
+                operands.append(self.new_leaf(Num, float(lexeme) if '.' in lexeme else int(lexeme)))
+            elif tok_type == 'CONST_STR':
+                operands.append(self.new_leaf(String, self.lexeme_at(self.pos)[1:-1]))
+                self.pos += 1
+            elif tok_type == 'ID':
+                name = self.lexeme_at(self.pos)
+                if self.peek_type(1) == 'ABRE_PARENT':
+                    self.pos += 2
+                    if not self.match('FECHA_PARENT'):
+                        operators.append((0, (name, [])))  # quadro de chamada
+                        continue
+                    self.pos += 1
+                    operands.append(self._make_call(name, []))
+                else:
+                    self.pos += 1
+                    operands.append(self.new_leaf(Var, name))
+            elif tok_type == 'ABRE_PARENT':
+                self.pos += 1
+                operators.append(_PAREN_FRAME)
+                continue
+            elif tok_type == 'NOT':
+                self.pos += 1
+                operators.append(_NOT_OPERATOR)
+                continue
+            else:
+                raise ParserError(f'Fator inesperado: {self.peek_lexeme()}')
+
+            # ---- Operador binário ou fim da expressão do quadro atual ----
+            while True:
+                tok_type = self.peek_type()
+                if tok_type == 'OP_MAT':
+                    prec = _OP_MAT_PREC.get(self.lexeme_at(self.pos), 0)
+                else:
+                    prec = _TOKEN_PREC.get(tok_type, 0)
+                if prec == _REL_PREC:
+                    # Relacionais não se encadeiam: 'a < b < c' termina em 'a < b'
+                    if operators and operators[-1][0] >= _ADD_PREC:
+                        self._reduce(operands, operators, _ADD_PREC)
+                    if operators and operators[-1][0] == _REL_PREC:
+                        prec = 0
+                if prec:
+                    if operators and operators[-1][0] >= prec:
+                        self._reduce(operands, operators, prec)
+                    operators.append((prec, _KEYWORD_OPS.get(tok_type) or self.lexeme_at(self.pos)))
+                    self.pos += 1
+                    break
+
+                if not operators:
+                    return operands.pop()
+                self._reduce(operands, operators, 1)
+                if not operators:
+                    return operands.pop()
+                frame = operators[-1][1]
+                if frame is None:
+                    # Quadro de parênteses
+                    self.consume('FECHA_PARENT')
+                    operators.pop()
+                    continue
+                name, args = frame
+                args.append(operands.pop())
+                if self.match('VIRG'):
+                    self.pos += 1
+                    break
+                self.consume('FECHA_PARENT')
+                operators.pop()
+                operands.append(self._make_call(name, args))
+
+    def _reduce(self, operands, operators, min_prec):
+        """Aplica os operadores pendentes com precedência >= min_prec"""
+        new_binop = self.new_binop
+        while operators and operators[-1][0] >= min_prec:
+            prec, op = operators.pop()
+            if prec == _NOT_PREC:
+                operands.append(new_binop('not', operands.pop(), None))
+            else:
+                right = operands.pop()
+                operands.append(new_binop(op, operands.pop(), right))
+
+    def parse_expression_recursive(self):
+        """Analisa uma expressão por descida recursiva (uma função por nível de precedência)"""
         node = self.parse_relation()
         while self.match('AND', 'OR'):
-            op = self.consume().lexeme
+            op = _KEYWORD_OPS[self.peek_type()]
+            self.consume()
             right = self.parse_relation()
-            node = BinOp(op, node, right)
+            node = self.new_binop(op, node, right)
         return node
 
     def parse_relation(self):
         node = self.parse_simple_expression()
         if self.match('OP_REL'):
-            op = self.consume().lexeme
+            op = self.consume()
             right = self.parse_simple_expression()
-            node = BinOp(op, node, right)
+            node = self.new_binop(op, node, right)
         return node
 
     def parse_simple_expression(self):
         node = self.parse_term()
         while True:
-            tok = self.peek()
-            if tok and tok.type == 'OP_MAT' and tok.lexeme in ['+','-']:
-                op = self.consume('OP_MAT').lexeme
+            if self.peek_type() == 'OP_MAT' and self.peek_lexeme() in ('+', '-'):
+                op = self.consume('OP_MAT')
                 right = self.parse_term()
-                node = BinOp(op, node, right)
+                node = self.new_binop(op, node, right)
             else:
                 break
         return node
@@ -575,42 +1040,40 @@ class Parser:
     def parse_term(self):
         node = self.parse_factor()
         while True:
-            tok = self.peek()
-            if tok and tok.type == 'OP_MAT' and tok.lexeme in ['*','/']:
-                op = self.consume('OP_MAT').lexeme
+            if self.peek_type() == 'OP_MAT' and self.peek_lexeme() in ('*', '/'):
+                op = self.consume('OP_MAT')
                 right = self.parse_factor()
-                node = BinOp(op, node, right)
+                node = self.new_binop(op, node, right)
             else:
                 break
         return node
 
     def parse_factor(self):
-        tok = self.peek()
-        if tok.type == 'CONST_STR':
-            self.consume('CONST_STR')
-            return String(tok.lexeme[1:-1]) 
-        if tok.type == 'CONST_NUM':
-            self.consume('CONST_NUM')
-            return Num(float(tok.lexeme) if '.' in tok.lexeme else int(tok.lexeme))
-        elif tok.type == 'ID':
-            nxt = self.tokens[self.pos + 1] if (self.pos + 1) < len(self.tokens) else None
-            if nxt and nxt.type == 'ABRE_PARENT':
+        tok_type = self.peek_type()
+        if tok_type is None:
+            raise ParserError('Fim inesperado da entrada.')
+        if tok_type == 'CONST_STR':
+            return self.new_leaf(String, self.consume('CONST_STR')[1:-1])
+        if tok_type == 'CONST_NUM':
+            lexeme = self.consume('CONST_NUM')
+            return self.new_leaf(Num, float(lexeme) if '.' in lexeme else int(lexeme))
+        elif tok_type == 'ID':
+            if self.peek_type(1) == 'ABRE_PARENT':
                 return self.parse_call_expression()
-            self.consume('ID')
-            return Var(tok.lexeme)
-        elif tok.type == 'ABRE_PARENT':
+            return self.new_leaf(Var, self.consume('ID'))
+        elif tok_type == 'ABRE_PARENT':
             self.consume('ABRE_PARENT')
             expr = self.parse_expression()
             self.consume('FECHA_PARENT')
             return expr
-        elif tok.type == 'NOT':
+        elif tok_type == 'NOT':
             self.consume('NOT')
             expr = self.parse_factor()
-            return BinOp('not', expr, None)
-        raise ParserError(f'Fator inesperado: {tok.lexeme}')
+            return self.new_binop('not', expr, None)
+        raise ParserError(f'Fator inesperado: {self.peek_lexeme()}')
 
     def parse_call_expression(self):
-        name = self.consume('ID').lexeme
+        name = self.consume('ID')
         self.consume('ABRE_PARENT')
         args = []
         if not self.match('FECHA_PARENT'):
@@ -619,11 +1082,57 @@ class Parser:
                 self.consume('VIRG')
                 args.append(self.parse_expression())
         self.consume('FECHA_PARENT')
-        
+        return self._make_call(name, args)
+
+    def _make_call(self, name: str, args: List[ASTNode]) -> Call:
         call_node = Call(name, args)
         
         # Semântica: verifica chamada
         if self.enable_semantic:
             self.infer_call_type(call_node)
         
-        return call_node
\ No newline at end of file
+        return call_node
+
+class StreamingParser(Parser):
+    """
+    Parser que consome os tokens diretamente de um iterador (ex.: o gerador
+    Lexer.tokenize()) através de um buffer circular de LOOKAHEAD posições.
+
+    Nenhuma regra da gramática olha mais de dois tokens à frente, então a
+    lista completa de tokens nunca é mantida em memória: a análise léxica e
+    a sintática acontecem intercaladas e o pico de memória fica próximo do
+    tamanho da AST.
+    """
+    LOOKAHEAD = 2
+
+    def __init__(self, tokens, enable_semantic=True, record_spans=False,
+                 recursive_expressions=False, hash_cons=False):
+        super().__init__([], enable_semantic, record_spans, recursive_expressions, hash_cons)
+        self.tokens = None  # não há lista de tokens neste modo
+        self.peek_type = self._stream_type
+        self.lexeme_at = self._stream_lexeme
+        self._stream = iter(tokens)
+        self._ring = [None] * self.LOOKAHEAD
+        self._read = 0  # quantos tokens já foram lidos do iterador
+
+    def _token_at(self, index: int):
+        """Token na posição `index`, lendo do iterador conforme necessário"""
+        while self._read <= index:
+            self._ring[self._read % self.LOOKAHEAD] = next(self._stream, None)
+            self._read += 1
+        if index <= self._read - 1 - self.LOOKAHEAD:
+            raise ParserError(f'Token {index} já foi descartado do buffer de lookahead')
+        return self._ring[index % self.LOOKAHEAD]
+
+    def peek(self):
+        return self._token_at(self.pos)
+
+    def peek_next(self):
+        return self._token_at(self.pos + 1)
+
+    def _stream_type(self, offset=0):
+        tok = self._token_at(self.pos + offset)
+        return tok.type if tok is not None else None
+
+    def _stream_lexeme(self, index):
+        return self._token_at(index).lexeme
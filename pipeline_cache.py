@@ -0,0 +1,270 @@
+"""
+Cache em disco dos artefatos da compilação, endereçado pelo conteúdo.
+
+A chave é o SHA-256 do código-fonte, da versão do compilador (um hash dos
+módulos do compilador, então qualquer mudança no código invalida o cache) e
+das opções. Cada entrada é um arquivo `<chave>.cache` com os tokens
+(TokenBuffer), a AST verificada (formato de ast_binary), as ligações do
+parser (Parser.bindings, gravadas pelo id de cada nó no formato binário), o
+TAC gerado e o TAC otimizado.
+
+- LRU limitado por tamanho: uma leitura atualiza o mtime da entrada; após
+  uma gravação, as entradas menos recentes são apagadas até o total caber
+  em max_bytes.
+- Acesso concorrente: cada processo grava em um arquivo temporário próprio
+  e publica a entrada com os.replace (atômico), então um leitor vê a
+  entrada completa ou nenhuma. Entradas ilegíveis contam como ausentes, e
+  arquivos que somem durante a limpeza são ignorados.
+
+Exemplo:
+    cache = PipelineCache('.cache/pipeline')
+    resultado = cache.compile(codigo)
+    resultado.ast, resultado.bindings, resultado.tac, resultado.optimized_tac
+
+    # Compilação feita etapa por etapa (ex.: pelo menu): só grava o resultado
+    if cache.lookup(codigo) is None:
+        cache.store(codigo, tokens, ast, parser.bindings, tac)
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from ast_binary import BinaryAST, dump_ast, node_ids
+from ast_nodes import Program
+from lexer import Lexer, TokenBuffer
+from optimizer import optimize_tac
+from parser import Parser
+from tac_generator import TACGenerator, TACInstruction
+
+# Versão do formato das entradas (muda quando o conteúdo gravado muda)
+CACHE_FORMAT = 2
+COMPILER_MODULES = ('lexer.py', 'parser.py', 'ast_nodes.py', 'ast_arena.py', 'ast_binary.py',
+                    'walker.py', 'tac_generator.py', 'tac_packed.py', 'cfg.py', 'liveness.py',
+                    'ssa.py', 'sccp.py', 'loops.py', 'optimizer.py', 'pipeline_cache.py')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_SUFFIX = '.cache'
+STALE_TEMP_SECONDS = 3600
+
+
+@lru_cache(maxsize=None)
+def compiler_version() -> str:
+    """Hash dos módulos do compilador (calculado uma vez por processo)"""
+    digest = hashlib.sha256(str(CACHE_FORMAT).encode())
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in COMPILER_MODULES:
+        with open(os.path.join(base, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class PipelineResult:
+    """
+    Artefatos de uma compilação. Vindos do cache, cada artefato fica
+    serializado e só é decodificado no primeiro acesso.
+    """
+    def __init__(self, blobs: Dict[str, bytes], from_cache: bool, values: Optional[dict] = None):
+        self.blobs = blobs
+        self.from_cache = from_cache
+        self._values = dict(values or {})
+        self._binary: Optional[BinaryAST] = None
+
+    @classmethod
+    def build(cls, tokens: TokenBuffer, ast: Program, bindings: dict, tac: List[TACInstruction],
+              optimized_tac: List[TACInstruction]) -> 'PipelineResult':
+        ids = node_ids(ast)
+        symbols = {ids[key]: symbol for key, (_, symbol) in bindings.items() if key in ids}
+        blobs = {
+            'tokens': pickle.dumps(tokens, protocol=pickle.HIGHEST_PROTOCOL),
+            'ast': dump_ast(ast),
+            'bindings': pickle.dumps(symbols, protocol=pickle.HIGHEST_PROTOCOL),
+            'tac': _dump_tac(tac),
+            'optimized_tac': _dump_tac(optimized_tac),
+        }
+        values = {'tokens': tokens, 'ast': ast, 'bindings': bindings, 'tac': tac,
+                  'optimized_tac': optimized_tac}
+        return cls(blobs, False, values)
+
+    def _binary_ast(self) -> BinaryAST:
+        if self._binary is None:
+            self._binary = BinaryAST(self.blobs['ast'])
+        return self._binary
+
+    def _value(self, name: str):
+        if name not in self._values:
+            blob = self.blobs[name]
+            if name == 'ast':
+                value = self._binary_ast().tree()
+            elif name == 'bindings':
+                # BinaryAST guarda os nós já reconstruídos: os nós ligados
+                # são os mesmos objetos da AST decodificada
+                binary = self._binary_ast()
+                value = {}
+                for node_id, symbol in pickle.loads(blob).items():
+                    node = binary.node(node_id)
+                    value[id(node)] = (node, symbol)
+            elif name == 'tokens':
+                value = pickle.loads(blob)
+            else:
+                value = [TACInstruction(*instr) for instr in pickle.loads(blob)]
+            self._values[name] = value
+        return self._values[name]
+
+    @property
+    def tokens(self) -> TokenBuffer:
+        return self._value('tokens')
+
+    @property
+    def ast(self) -> Program:
+        return self._value('ast')
+
+    @property
+    def bindings(self) -> dict:
+        """Ligações do parser sobre os nós de `ast`: id(nó) -> (nó, Symbol)"""
+        return self._value('bindings')
+
+    @property
+    def tac(self) -> List[TACInstruction]:
+        return self._value('tac')
+
+    @property
+    def optimized_tac(self) -> List[TACInstruction]:
+        return self._value('optimized_tac')
+
+
+class PipelineCache:
+    """Cache LRU em disco de tokens, AST e TAC por (código, versão, opções)"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source: str, **options) -> str:
+        digest = hashlib.sha256()
+        digest.update(compiler_version().encode())
+        digest.update(repr(sorted(options.items())).encode())
+        digest.update(b'\0')
+        digest.update(source.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    # ======== Compilação ========
+
+    def compile(self, source: str, hash_cons: bool = False, optimize_passes=None) -> PipelineResult:
+        """
+        Resultado da compilação de `source`, do cache se possível. Erros
+        léxicos, sintáticos e semânticos são lançados e nada é gravado.
+        """
+        cached = self.lookup(source, hash_cons, optimize_passes)
+        if cached is not None:
+            return cached
+
+        tokens = Lexer(source).tokenize_buffer()
+        parser = Parser(tokens, hash_cons=hash_cons)
+        ast = parser.parse()
+        tac = TACGenerator(parser.bindings, reuse_shared=hash_cons).generate(ast)
+        return self.store(source, tokens, ast, parser.bindings, tac, hash_cons, optimize_passes)
+
+    def lookup(self, source: str, hash_cons: bool = False, optimize_passes=None) -> Optional[PipelineResult]:
+        """Resultado gravado para `source` com essas opções, ou None"""
+        return self.get(self.key(source, hash_cons=hash_cons, optimize_passes=optimize_passes))
+
+    def store(self, source: str, tokens: TokenBuffer, ast: Program, bindings: dict,
+              tac: List[TACInstruction], hash_cons: bool = False, optimize_passes=None) -> PipelineResult:
+        """
+        Grava os artefatos de uma compilação de `source` feita fora do cache
+        (o TAC otimizado é calculado aqui) e retorna o resultado.
+        """
+        optimized = optimize_tac(tac, optimize_passes, verbose=False)
+        result = PipelineResult.build(tokens, ast, bindings, tac, optimized)
+        self.put(self.key(source, hash_cons=hash_cons, optimize_passes=optimize_passes), result)
+        return result
+
+    # ======== Entradas ========
+
+    def get(self, key: str) -> Optional[PipelineResult]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            if entry['key'] != key:
+                return None
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Entrada corrompida: descarta e recompila
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # mais recente no LRU
+        except OSError:
+            pass
+        return PipelineResult(entry['blobs'], True)
+
+    def put(self, key: str, result: PipelineResult):
+        entry = {'key': key, 'blobs': result.blobs}
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            # Ex.: no Windows, outro processo está lendo a entrada: fica sem cache
+            self._remove(temp_path)
+            return
+        self.evict()
+
+    def entries(self) -> Dict[str, os.stat_result]:
+        """Entradas publicadas: caminho -> stat"""
+        found = {}
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith(_SUFFIX):
+                    try:
+                        found[item.path] = item.stat()
+                    except FileNotFoundError:
+                        pass
+        return found
+
+    def evict(self):
+        """Apaga as entradas menos usadas até o total caber em max_bytes"""
+        # Temporários abandonados por processos interrompidos
+        limit = time.time() - STALE_TEMP_SECONDS
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith('.part'):
+                    try:
+                        if item.stat().st_mtime < limit:
+                            self._remove(item.path)
+                    except FileNotFoundError:
+                        pass
+        entries = self.entries()
+        total = sum(stat.st_size for stat in entries.values())
+        for path, stat in sorted(entries.items(), key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= stat.st_size
+
+    def clear(self):
+        for path in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _dump_tac(instructions: List[TACInstruction]) -> bytes:
+    rows = [(instr.op, instr.addr1, instr.addr2, instr.addr3) for instr in instructions]
+    return pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
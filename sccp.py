@@ -0,0 +1,255 @@
+"""
+Propagação de constantes condicional esparsa (SCCP, Wegman e Zadeck) sobre
+a forma SSA do TAC (ssa.py).
+
+Cada versão tem um valor no reticulado
+
+    TOP (ainda sem valor)  >  constante  >  BOTTOM (não é constante)
+
+e só desce. Duas listas de trabalho andam juntas:
+
+- arestas do CFG que podem ser executadas: um bloco só é avaliado quando
+  a primeira aresta para ele é marcada, e um JZ/JNZ com condição constante
+  marca só a aresta que toma;
+- versões cujo valor mudou: as instruções e os phis que as leem (cadeias
+  definição-uso) são reavaliados, se o bloco deles já é executável.
+
+Um phi só junta os argumentos das arestas executáveis, então um valor
+atribuído antes de um if/while chega constante nos blocos seguintes se os
+caminhos que poderiam mudá-lo nunca são tomados. Cada versão desce no
+máximo duas vezes e cada aresta é marcada uma vez: tempo linear no tamanho
+da SSA.
+
+Os valores de entrada da função (versão 0: parâmetros e globais) e as
+versões definidas por CALL/READ são BOTTOM. As constantes são operandos
+numéricos e os booleanos `true`/`false` (o dobramento de comparações os
+produz).
+
+A SSA de cada bloco tem as mesmas instruções, na mesma ordem, que o código
+original, então fold() devolve a instrução original reescrita: leituras
+de valores constantes trocadas pela constante, operações com resultado
+conhecido trocadas por ATR e saltos condicionais decididos.
+
+Exemplo:
+    sccp = SCCP(codigo, evaluate)
+    for block in range(len(sccp.cfg)):
+        if sccp.executable[block]:
+            for i in sccp.cfg.block_range(block):
+                instrucao = sccp.fold(block, i)   # None: salto removido
+"""
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ssa import DEFINES_ADDR1, USES_ADDR1, SSAFunction, build_ssa
+from tac_packed import BINARY_OPS, Kind, Op, PackedTAC
+
+ATR, NOT, JMP = int(Op.ATR), int(Op.NOT), int(Op.JMP)
+JZ, JNZ, CALL = int(Op.JZ), int(Op.JNZ), int(Op.CALL)
+VAR, NUM = int(Kind.VAR), int(Kind.NUM)
+# Valores do reticulado além das constantes (ids de operandos, sempre > 0)
+TOP, BOTTOM = 0, -1
+BOOLEANS = {'true': 1.0, 'false': 0.0}
+
+# (op, valor da esquerda, valor da direita) -> texto do resultado ou None
+Evaluate = Callable[[int, float, float], Optional[str]]
+
+
+class SCCP:
+    """
+    Constantes e blocos executáveis de todas as funções do código.
+
+    - ssa:        o programa em SSA (ssa.SSAProgram)
+    - cfg:        o CFG do código
+    - executable: 1 para cada bloco que alguma execução pode alcançar
+    - values:     versão -> operando constante ou BOTTOM (TOP se ausente)
+    """
+
+    def __init__(self, code: PackedTAC, evaluate: Evaluate):
+        self.ssa = build_ssa(code)
+        self.cfg = self.ssa.cfg
+        self.code = code
+        self.evaluate = evaluate
+        self.executable = bytearray(len(self.cfg))
+        self.values: Dict[int, int] = {}
+        self._function_of: List[Optional[SSAFunction]] = [None] * len(self.cfg)
+        for func in self.ssa.functions:
+            for block in func.blocks:
+                self._function_of[block] = func
+            self._solve(func)
+        # Próximo bloco executável depois de cada bloco (len(cfg) se nenhum)
+        self._next = [len(self.cfg)] * len(self.cfg)
+        for block in range(len(self.cfg) - 2, -1, -1):
+            self._next[block] = block + 1 if self.executable[block + 1] else self._next[block + 1]
+
+    # ======== Reticulado ========
+
+    def value(self, operand: int, func: SSAFunction) -> int:
+        """Valor de um operando lido em `func`: constante, TOP ou BOTTOM"""
+        table = self.code.operands
+        kind = table.kinds[operand]
+        if kind == NUM or (kind == VAR and table.texts[operand] in BOOLEANS):
+            return operand
+        if operand in func.origin:
+            return self.values.get(operand, TOP)
+        return BOTTOM  # valor de entrada, string ou operando vazio
+
+    def _number(self, constant: int) -> float:
+        table = self.code.operands
+        value = table.values[constant]
+        return BOOLEANS[table.texts[constant]] if value is None else value
+
+    def _meet(self, a: int, b: int) -> int:
+        if a == TOP:
+            return b
+        if b == TOP or a == b:
+            return a
+        if a == BOTTOM or b == BOTTOM or self._number(a) != self._number(b):
+            return BOTTOM
+        return a
+
+    def _compute(self, instr: List[int], func: SSAFunction) -> int:
+        """Valor definido por uma instrução que atribui a uma versão"""
+        op, _, a2, a3 = instr
+        if op == ATR:
+            return self.value(a2, func)
+        if op in BINARY_OPS:
+            left, right = self.value(a2, func), self.value(a3, func)
+            if left == BOTTOM or right == BOTTOM:
+                return BOTTOM
+            if left == TOP or right == TOP:
+                return TOP
+            result = self.evaluate(op, self._number(left), self._number(right))
+            return BOTTOM if result is None else self.code.operands.intern(result)
+        if op == NOT:
+            operand = self.value(a2, func)
+            if operand == TOP or operand == BOTTOM:
+                return operand
+            return self.code.operands.intern('false' if self._number(operand) else 'true')
+        return BOTTOM  # READ
+
+    # ======== Propagação ========
+
+    def _branch(self, block: int, func: SSAFunction) -> Optional[int]:
+        """
+        Bloco que um JZ/JNZ de condição constante no fim do bloco toma (-1:
+        nenhum, o salto não é tomado e não há bloco seguinte); None se o
+        bloco não termina em salto condicional ou a condição não é constante
+        """
+        op, label, cond, _ = func.blocks[block][-1]
+        if op != JZ and op != JNZ:
+            return None
+        value = self.value(cond, func)
+        if value == TOP or value == BOTTOM:
+            return None
+        if (self._number(value) == 0) == (op == JZ):
+            return self.cfg.labels[label]
+        return block + 1 if block + 1 in self.cfg.succs[block] else -1
+
+    def _solve(self, func: SSAFunction):
+        cfg, values = self.cfg, self.values
+        executable = self.executable
+        _, uses = func.def_use()
+        edges: Set[Tuple[int, int]] = set()
+        flow: List[Tuple[int, int]] = [(-1, func.first)]
+        changed: List[int] = []
+
+        def lower(version, new):
+            old = values.get(version, TOP)
+            new = self._meet(old, new) if new != TOP else old
+            if new != old:
+                values[version] = new
+                changed.append(version)
+
+        def visit_phi(block, k):
+            phi = func.phis[block][k]
+            new = TOP
+            for pred, arg in zip(func.preds[block], phi.args):
+                if (pred, block) in edges:
+                    new = self._meet(new, self.value(arg, func))
+            lower(phi.target, new)
+
+        def visit(block, index):
+            instrs = func.blocks[block]
+            instr = instrs[index]
+            op = instr[0]
+            if op in DEFINES_ADDR1 and instr[1] in func.origin:
+                lower(instr[1], self._compute(instr, func))
+            elif op == CALL:
+                for version in func.call_defs.get((block, index), ()):
+                    lower(version, BOTTOM)
+            if index == len(instrs) - 1:
+                if op == JZ or op == JNZ:
+                    if self.value(instr[2], func) == TOP:
+                        return
+                    target = self._branch(block, func)
+                    targets = cfg.succs[block] if target is None else (target,) if target >= 0 else ()
+                else:
+                    targets = cfg.succs[block]
+                for succ in targets:
+                    if (block, succ) not in edges:
+                        edges.add((block, succ))
+                        flow.append((block, succ))
+
+        while flow or changed:
+            while flow:
+                _, block = flow.pop()
+                for k in range(len(func.phis.get(block, ()))):
+                    visit_phi(block, k)
+                if not executable[block]:
+                    executable[block] = 1
+                    for index in range(len(func.blocks[block])):
+                        visit(block, index)
+            while changed and not flow:
+                for block, index in uses.get(changed.pop(), ()):
+                    if executable[block]:
+                        if index < 0:
+                            visit_phi(block, -1 - index)
+                        else:
+                            visit(block, index)
+
+    # ======== Reescrita ========
+
+    def constant(self, block: int, i: int) -> Optional[int]:
+        """Constante atribuída pela instrução i (do bloco), se houver"""
+        func = self._function_of[block]
+        if func is None:
+            return None
+        instr = func.blocks[block][i - self.cfg.starts[block]]
+        if instr[0] not in DEFINES_ADDR1 or instr[1] not in func.origin:
+            return None
+        value = self.values.get(instr[1], TOP)
+        return value if value > 0 else None
+
+    def fold(self, block: int, i: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Instrução i (do bloco executável `block`) com as leituras constantes
+        substituídas; um salto condicional decidido vira JMP ou é removido
+        (None), assim como um JMP para o próximo bloco executável (os blocos
+        no meio somem). Uma operação de resultado constante vira ATR.
+        """
+        code = self.code
+        op, a1, a2, a3 = code.ops[i], code.a1[i], code.a2[i], code.a3[i]
+        func = self._function_of[block]
+        if func is None:
+            return op, a1, a2, a3
+        instr = func.blocks[block][i - self.cfg.starts[block]]
+        if op == JZ or op == JNZ:
+            target = self._branch(block, func)
+            if target is not None:
+                if target < 0 or target == self._next[block]:
+                    return None
+                return JMP, a1, 0, 0
+        elif op == JMP and self.cfg.labels[a1] == self._next[block]:
+            return None
+        if op in DEFINES_ADDR1 and op != ATR:
+            folded = self.constant(block, i)
+            if folded is not None:
+                return ATR, a1, folded, 0
+        slots = [a1, a2, a3]
+        for slot in (0, 1, 2) if op in USES_ADDR1 else (1, 2):
+            version = instr[slot + 1]
+            if version in func.origin:
+                value = self.values.get(version, TOP)
+                if value > 0:
+                    slots[slot] = value
+        return op, slots[0], slots[1], slots[2]
@@ -0,0 +1,722 @@
+"""
+Forma SSA (atribuição estática única) do TAC.
+
+build_ssa() monta a SSA de cada função do CFG (cfg.build_cfg):
+
+1. árvore de dominadores: algoritmo iterativo de Cooper, Harvey e Kennedy
+   sobre a pós-ordem reversa (converge em duas ou três passadas);
+2. fronteiras de dominância;
+3. phis nas fronteiras de dominância iteradas dos blocos que definem cada
+   variável (SSA semi-podada: só para nomes lidos em um bloco antes de
+   serem definidos nele, então os temporários locais não ganham phi);
+4. renomeação em pré-ordem na árvore de dominadores, com pilha explícita.
+
+Cada definição cria uma versão (um operando novo na tabela, "x.3") e a
+versão 0 é o próprio operando original: o valor na entrada da função
+(parâmetros, globais). No TAC os nomes são globais, então:
+
+- CALL define uma versão nova de cada variável que alguma função atribui
+  (e de RETVAL): são as `call_defs` da instrução;
+- CALL, RETURN e HALT leem a versão corrente das variáveis (a função
+  chamada, quem chamou e o fim do programa podem vê-las): são os `escapes`.
+
+def_use() dá as cadeias definição-uso esparsas, para um passe seguir os
+usos de um valor sem reler o código. to_code() volta para o TAC normal:
+
+- as versões de uma mesma variável que não interferem (nunca estão vivas
+  ao mesmo tempo) são unidas e voltam ao nome original; as que sobram
+  ganham nomes novos ("x.3", temporários novos);
+- os phis que sobram viram cópias paralelas no fim dos predecessores
+  (aresta crítica: as cópias vão para um bloco novo no fim da função);
+- uma variável cujas versões não cabem todas no nome original é copiada
+  para ele antes de CALL/RETURN/HALT e de volta depois do CALL.
+
+Sem transformação entre build_ssa() e to_code() o resultado é o código
+original (sem as cópias inúteis `ATR x x`). Os blocos inalcançáveis não entram na SSA e são copiados como
+estão.
+
+Exemplo:
+    ssa = build_ssa(codigo)
+    for func in ssa.functions:
+        defs, uses = func.def_use()
+    codigo = ssa.to_code()
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from cfg import CFG, build_cfg
+from tac_packed import ASSIGN_OPS, Kind, Op, PackedTAC
+
+LABEL, JMP, JZ, JNZ = int(Op.LABEL), int(Op.JMP), int(Op.JZ), int(Op.JNZ)
+CALL, RETURN, HALT, ATR = int(Op.CALL), int(Op.RETURN), int(Op.HALT), int(Op.ATR)
+TEMP, VAR = int(Kind.TEMP), int(Kind.VAR)
+# Instruções que definem o endereço 1 e que o leem
+DEFINES_ADDR1 = ASSIGN_OPS | {int(Op.READ)}
+USES_ADDR1 = frozenset((int(Op.WRITE), RETURN, int(Op.PARAM)))
+# Pontos em que as variáveis ficam visíveis fora da função
+ESCAPE_OPS = frozenset((CALL, RETURN, HALT))
+# Instrução removida por um passe em SSA (não volta para o código)
+NOP = 0
+RETVAL_NAME = 'RETVAL'
+
+# Posição em SSAFunction.blocks: (bloco, índice da instrução) ou
+# (bloco, -1 - índice do phi)
+Location = Tuple[int, int]
+
+
+@dataclass
+class Phi:
+    """target = phi(args): args[k] vem de SSAFunction.preds[bloco][k]"""
+    target: int
+    var: int
+    args: List[int]
+
+
+# ======== Dominadores ========
+
+def dominators(cfg: CFG, entry: int) -> Tuple[List[int], Dict[int, int]]:
+    """
+    Blocos alcançáveis a partir de `entry` em pós-ordem reversa e o
+    dominador imediato de cada um (idom[entry] == entry)
+    """
+    order = cfg.reverse_postorder(entry)
+    number = {block: k for k, block in enumerate(order)}
+    preds = cfg.preds
+    idom = {entry: entry}
+    changed = True
+    while changed:
+        changed = False
+        for block in order[1:]:
+            new = None
+            for pred in preds[block]:
+                if pred not in idom:
+                    continue
+                if new is None:
+                    new = pred
+                    continue
+                # Interseção: sobe pelos dominadores até os dois caminhos se encontrarem
+                a, b = pred, new
+                while a != b:
+                    while number[a] > number[b]:
+                        a = idom[a]
+                    while number[b] > number[a]:
+                        b = idom[b]
+                new = a
+            if idom.get(block) != new:
+                idom[block] = new
+                changed = True
+    return order, idom
+
+
+def dominator_tree(order: List[int], idom: Dict[int, int]) -> Dict[int, List[int]]:
+    """Filhos de cada bloco na árvore de dominadores (em pós-ordem reversa)"""
+    children: Dict[int, List[int]] = {block: [] for block in order}
+    for block in order[1:]:
+        children[idom[block]].append(block)
+    return children
+
+
+def dominance_frontiers(cfg: CFG, order: List[int], idom: Dict[int, int]) -> Dict[int, Set[int]]:
+    """Fronteira de dominância de cada bloco alcançável"""
+    frontier: Dict[int, Set[int]] = {block: set() for block in order}
+    for block in order:
+        preds = [pred for pred in cfg.preds[block] if pred in idom]
+        if len(preds) < 2:
+            continue
+        for pred in preds:
+            runner = pred
+            while runner != idom[block]:
+                frontier[runner].add(block)
+                runner = idom[runner]
+    return frontier
+
+
+def dominates(idom: Dict[int, int], a: int, b: int) -> bool:
+    """True se o bloco `a` domina `b`"""
+    while b != a:
+        parent = idom[b]
+        if parent == b:
+            return False
+        b = parent
+    return True
+
+
+# ======== Construção ========
+
+class SSAFunction:
+    """
+    Uma função em SSA.
+
+    - blocks[b]:  instruções [op, a1, a2, a3] do bloco alcançável b, com as
+                  versões no lugar das variáveis
+    - phis[b]:    phis no início do bloco
+    - preds[b]:   predecessores alcançáveis (ordem dos argumentos dos phis)
+    - origin:     versão -> variável original (versões 0 não aparecem)
+    - call_defs:  (bloco, índice do CALL) -> versões que a chamada define
+    - escapes:    (bloco, índice do CALL/RETURN/HALT) -> versões lidas
+    """
+
+    def __init__(self, program: 'SSAProgram', name: Optional[str], first: int, end: int):
+        self.program = program
+        self.name = name
+        self.first = first
+        self.end = end
+        cfg = program.cfg
+        self.order, self.idom = dominators(cfg, first)
+        self.children = dominator_tree(self.order, self.idom)
+        self.frontier = dominance_frontiers(cfg, self.order, self.idom)
+        self.preds = {block: [pred for pred in cfg.preds[block] if pred in self.idom]
+                      for block in self.order}
+        self.blocks: Dict[int, List[List[int]]] = {}
+        self.phis: Dict[int, List[Phi]] = {}
+        self.origin: Dict[int, int] = {}
+        self.call_defs: Dict[Location, List[int]] = {}
+        self.escapes: Dict[Location, List[int]] = {}
+        self.escaping: List[int] = []  # variáveis (não temporários) da função
+        self.clobbers: List[int] = []  # as que um CALL pode alterar
+
+    def var_of(self, version: int) -> int:
+        return self.origin.get(version, version)
+
+    def phi_count(self) -> int:
+        return sum(len(phis) for phis in self.phis.values())
+
+    def _place_phis(self):
+        """Copia as instruções dos blocos e insere os phis (SSA semi-podada)"""
+        code = self.program.code
+        ops, a1s, a2s, a3s = code.ops, code.a1, code.a2, code.a3
+        kinds = code.operands.kinds
+        clobbered = self.program.clobbered
+        defsites: Dict[int, Set[int]] = {}
+        nonlocal_names: Set[int] = set()
+        escaping: Set[int] = set()
+        call_blocks: Set[int] = set()
+        for block in self.order:
+            instrs = self.blocks[block] = []
+            defined = set()
+            for i in self.program.cfg.block_range(block):
+                op, a1, a2, a3 = ops[i], a1s[i], a2s[i], a3s[i]
+                instrs.append([op, a1, a2, a3])
+                for operand in (a2, a3, a1) if op in USES_ADDR1 else (a2, a3):
+                    kind = kinds[operand]
+                    if kind == TEMP or kind == VAR:
+                        if operand not in defined:
+                            nonlocal_names.add(operand)
+                        if kind == VAR:
+                            escaping.add(operand)
+                if op == CALL:
+                    call_blocks.add(block)
+                elif op in DEFINES_ADDR1 and (kinds[a1] == TEMP or kinds[a1] == VAR):
+                    defined.add(a1)
+                    defsites.setdefault(a1, set()).add(block)
+                    if kinds[a1] == VAR:
+                        escaping.add(a1)
+        # Nas saídas as variáveis são lidas implicitamente
+        nonlocal_names |= escaping
+        self.escaping = sorted(escaping)
+        self.clobbers = sorted(escaping & clobbered) if call_blocks else []
+        for var in self.clobbers:
+            defsites.setdefault(var, set()).update(call_blocks)
+
+        frontier = self.frontier
+        for var, sites in defsites.items():
+            if var not in nonlocal_names:
+                continue
+            placed = set()
+            work = list(sites)
+            while work:
+                for block in frontier[work.pop()]:
+                    if block not in placed:
+                        placed.add(block)
+                        self.phis.setdefault(block, []).append(
+                            Phi(var, var, [var] * len(self.preds[block])))
+                        if block not in sites:
+                            work.append(block)
+
+    def _rename(self):
+        """Renomeação em pré-ordem na árvore de dominadores (pilha explícita)"""
+        table = self.program.code.operands
+        texts, kinds = table.texts, table.kinds
+        succs = self.program.cfg.succs
+        origin, phis, preds = self.origin, self.phis, self.preds
+        escaping, clobbers = self.escaping, self.clobbers
+        current: Dict[int, List[int]] = {}
+        counters: Dict[int, int] = {}
+
+        def define(var, pushed):
+            n = counters[var] = counters.get(var, 0) + 1
+            version = table.add(f"{texts[var]}.{n}", kinds[var])
+            origin[version] = var
+            current.setdefault(var, []).append(version)
+            pushed.append(var)
+            return version
+
+        def top(var):
+            stack = current.get(var)
+            return stack[-1] if stack else var
+
+        stack: List[Tuple[int, Optional[List[int]]]] = [(self.first, None)]
+        while stack:
+            block, pushed = stack.pop()
+            if pushed is not None:
+                for var in pushed:
+                    current[var].pop()
+                continue
+            pushed = []
+            for phi in phis.get(block, ()):
+                phi.target = define(phi.var, pushed)
+            for index, instr in enumerate(self.blocks[block]):
+                op = instr[0]
+                for slot in (2, 3, 1) if op in USES_ADDR1 else (2, 3):
+                    operand = instr[slot]
+                    kind = kinds[operand]
+                    if kind == TEMP or kind == VAR:
+                        instr[slot] = top(operand)
+                if op in ESCAPE_OPS:
+                    self.escapes[(block, index)] = [top(var) for var in escaping]
+                    if op == CALL and clobbers:
+                        self.call_defs[(block, index)] = [define(var, pushed) for var in clobbers]
+                elif op in DEFINES_ADDR1:
+                    kind = kinds[instr[1]]
+                    if kind == TEMP or kind == VAR:
+                        instr[1] = define(instr[1], pushed)
+            for succ in succs[block]:
+                succ_phis = phis.get(succ)
+                if succ_phis:
+                    k = preds[succ].index(block)
+                    for phi in succ_phis:
+                        phi.args[k] = top(phi.var)
+            stack.append((block, pushed))
+            stack.extend((child, None) for child in reversed(self.children[block]))
+
+    # ======== Cadeias definição-uso ========
+
+    def def_use(self) -> Tuple[Dict[int, Location], Dict[int, List[Location]]]:
+        """
+        Onde cada versão é definida e onde é usada. Os argumentos de phi são
+        usos no phi; as leituras implícitas de CALL/RETURN/HALT são usos na
+        instrução. As versões 0 (valores de entrada) não têm definição.
+        """
+        kinds = self.program.code.operands.kinds
+        defs: Dict[int, Location] = {}
+        uses: Dict[int, List[Location]] = {}
+        for block in self.order:
+            for k, phi in enumerate(self.phis.get(block, ())):
+                where = (block, -1 - k)
+                defs[phi.target] = where
+                for arg in phi.args:
+                    uses.setdefault(arg, []).append(where)
+            for index, (op, a1, a2, a3) in enumerate(self.blocks[block]):
+                where = (block, index)
+                for operand in (a1, a2, a3) if op in USES_ADDR1 else (a2, a3):
+                    kind = kinds[operand]
+                    if kind == TEMP or kind == VAR:
+                        uses.setdefault(operand, []).append(where)
+                if op in ESCAPE_OPS:
+                    for version in self.escapes[where]:
+                        uses.setdefault(version, []).append(where)
+                    for version in self.call_defs.get(where, ()):
+                        defs[version] = where
+                elif op in DEFINES_ADDR1 and a1 in self.origin:
+                    defs[a1] = where
+        return defs, uses
+
+    # ======== Passes ========
+
+    def remove(self, location: Location):
+        """Remove a instrução (vira NOP; os índices das outras não mudam)"""
+        block, index = location
+        self.blocks[block][index] = [NOP, 0, 0, 0]
+
+    def propagate_copies(self) -> int:
+        """
+        Propagação de cópias global: os usos de x.2 em `ATR x.2 y.1` passam a
+        ler y.1 em qualquer bloco (a definição de y.1 domina todos eles). Os
+        phis e as saídas de x só recebem versões de x, então a cópia fica se
+        ainda for lida por eles. Retorna o número de cópias removidas.
+        """
+        kinds = self.program.code.operands.kinds
+        var_of = self.var_of
+        _, uses = self.def_use()
+        removed = 0
+        for block in self.order:
+            for index, (op, dst, src, _) in enumerate(self.blocks[block]):
+                if op != ATR or dst not in self.origin or not (kinds[src] == TEMP or kinds[src] == VAR):
+                    continue
+                same = var_of(src) == var_of(dst)
+                moved, kept = uses.setdefault(src, []), []
+                for where in uses.pop(dst, ()):
+                    b, i = where
+                    if i < 0:
+                        phi = self.phis[b][-1 - i]
+                        if same:
+                            phi.args = [src if arg == dst else arg for arg in phi.args]
+                            moved.append(where)
+                        else:
+                            kept.append(where)
+                        continue
+                    instr = self.blocks[b][i]
+                    for slot in (1, 2, 3) if instr[0] in USES_ADDR1 else (2, 3):
+                        if instr[slot] == dst:
+                            instr[slot] = src
+                            moved.append(where)
+                    escaped = self.escapes.get(where)
+                    if escaped and dst in escaped:
+                        if same:
+                            self.escapes[where] = [src if v == dst else v for v in escaped]
+                            moved.append(where)
+                        else:
+                            kept.append(where)
+                if kept:
+                    uses[dst] = kept
+                else:
+                    self.remove((block, index))
+                    removed += 1
+        return removed
+
+    # ======== Destruição ========
+
+    def _liveness(self, tracked: Set[int]):
+        """live_out de cada bloco, só com as versões das variáveis em `tracked`"""
+        var_of = self.var_of
+        kinds = self.program.code.operands.kinds
+        succs = self.program.cfg.succs
+        gen: Dict[int, Set[int]] = {}
+        kill: Dict[int, Set[int]] = {}
+        from_phis: Dict[int, Set[int]] = {block: set() for block in self.order}
+        for block in self.order:
+            g, d = set(), set()
+            for phi in self.phis.get(block, ()):
+                if phi.var in tracked:
+                    d.add(phi.target)
+                    for pred, arg in zip(self.preds[block], phi.args):
+                        from_phis[pred].add(arg)
+            for index, (op, a1, a2, a3) in enumerate(self.blocks[block]):
+                used = [a2, a3, a1] if op in USES_ADDR1 else [a2, a3]
+                used += self.escapes.get((block, index), ())
+                for operand in used:
+                    kind = kinds[operand]
+                    if (kind == TEMP or kind == VAR) and var_of(operand) in tracked and operand not in d:
+                        g.add(operand)
+                if op in DEFINES_ADDR1:
+                    d.add(a1)
+                d.update(self.call_defs.get((block, index), ()))
+            gen[block], kill[block] = g, d
+
+        live_in: Dict[int, Set[int]] = {block: set() for block in self.order}
+        live_out: Dict[int, Set[int]] = {}
+        postorder = self.order[::-1]
+        changed = True
+        while changed:
+            changed = False
+            for block in postorder:
+                out = set(from_phis[block])
+                for succ in succs[block]:
+                    out |= live_in[succ]
+                live_out[block] = out
+                new = gen[block] | (out - kill[block])
+                if new != live_in[block]:
+                    live_in[block] = new
+                    changed = True
+        return live_out
+
+    def _interference(self, tracked: Set[int]) -> Dict[int, Set[int]]:
+        """Pares de versões da mesma variável vivas ao mesmo tempo"""
+        var_of = self.var_of
+        kinds = self.program.code.operands.kinds
+        live_out = self._liveness(tracked)
+        edges: Dict[int, Set[int]] = {}
+
+        def interfere(version, live, skip=0):
+            for other in live.get(var_of(version), ()):
+                if other != version and other != skip:
+                    edges.setdefault(version, set()).add(other)
+                    edges.setdefault(other, set()).add(version)
+
+        for block in self.order:
+            live: Dict[int, Set[int]] = {}
+            for version in live_out[block]:
+                live.setdefault(var_of(version), set()).add(version)
+            instrs = self.blocks[block]
+            for index in range(len(instrs) - 1, -1, -1):
+                op, a1, a2, a3 = instrs[index]
+                where = (block, index)
+                defined = list(self.call_defs.get(where, ()))
+                if op in DEFINES_ADDR1 and var_of(a1) in tracked:
+                    defined.append(a1)
+                for version in defined:
+                    # Uma cópia não faz o destino interferir com a origem
+                    interfere(version, live, a2 if op == ATR else 0)
+                    live.get(var_of(version), set()).discard(version)
+                used = [a2, a3, a1] if op in USES_ADDR1 else [a2, a3]
+                used += self.escapes.get(where, ())
+                for operand in used:
+                    kind = kinds[operand]
+                    if (kind == TEMP or kind == VAR) and var_of(operand) in tracked:
+                        live.setdefault(var_of(operand), set()).add(operand)
+            for phi in self.phis.get(block, ()):
+                if phi.var in tracked:
+                    interfere(phi.target, live)
+        return edges
+
+    def _coalesce(self) -> Tuple[Dict[int, int], Set[int], Set[int]]:
+        """
+        Nome final de cada versão, as variáveis que ficaram sem nome fixo
+        (copiadas de/para o nome original em CALL/RETURN/HALT) e as versões
+        lidas em algum lugar
+        """
+        kinds = self.program.code.operands.kinds
+        versions: Dict[int, List[int]] = {}
+        for version, var in self.origin.items():
+            versions.setdefault(var, []).append(version)
+        _, uses = self.def_use()
+        tracked = {var for var, vs in versions.items() if len(vs) + (var in uses) > 1}
+        names = {version: var for version, var in self.origin.items() if var not in tracked}
+        if not tracked:
+            return names, set(), set(uses)
+
+        edges = self._interference(tracked)
+        parent: Dict[int, int] = {}
+        members: Dict[int, List[int]] = {}
+
+        def find(v):
+            root = parent.get(v, v)
+            if root != v:
+                root = parent[v] = find(root)
+            return root
+
+        def union(a, b):
+            ra, rb = find(a), find(b)
+            if ra == rb:
+                return True
+            ma, mb = members.setdefault(ra, [ra]), members.setdefault(rb, [rb])
+            if len(ma) > len(mb):
+                ra, rb, ma, mb = rb, ra, mb, ma
+            for version in ma:
+                for other in edges.get(version, ()):
+                    if find(other) == rb:
+                        return False
+            parent[ra] = rb
+            mb.extend(ma)
+            del members[ra]
+            return True
+
+        # Phis e cópias primeiro, depois as versões que moram no nome
+        # original (entrada, CALL e saídas) e por fim o resto
+        for block in self.order:
+            for phi in self.phis.get(block, ()):
+                if phi.var in tracked:
+                    for arg in phi.args:
+                        union(phi.target, arg)
+        memory: Dict[int, List[int]] = {}
+        for block in self.order:
+            for index, (op, a1, a2, a3) in enumerate(self.blocks[block]):
+                if op == ATR and a1 in self.origin and self.var_of(a2) == self.origin[a1]:
+                    union(a1, a2)
+                for version in self.call_defs.get((block, index), ()):
+                    memory.setdefault(self.origin[version], []).append(version)
+                for version in self.escapes.get((block, index), ()):
+                    memory.setdefault(self.var_of(version), []).append(version)
+        for var, vs in memory.items():
+            if var in tracked:
+                for version in vs:
+                    union(var, version)
+        for var in tracked:
+            for version in versions.get(var, ()):
+                union(var, version)
+
+        unnamed = set()
+        fresh_name = self.program.fresh_name
+        class_names: Dict[int, int] = {}
+        for var in tracked:
+            root = find(var)
+            if kinds[var] == VAR and any(find(v) != root for v in memory.get(var, ())):
+                unnamed.add(var)
+            else:
+                class_names[root] = var
+            for version in [var] + versions.get(var, []):
+                root = find(version)
+                if root not in class_names:
+                    class_names[root] = fresh_name(var)
+                names[version] = class_names[root]
+        return names, unnamed, set(uses)
+
+    def _emit(self, out: PackedTAC):
+        """Acrescenta a função fora de SSA em `out`"""
+        program = self.program
+        cfg, original = program.cfg, program.code
+        names, unnamed, used = self._coalesce()
+        name = names.get
+        # Valores de entrada lidos, das variáveis sem nome fixo
+        entry_copies = [(name(var, var), var) for var in sorted(unnamed) if var in used]
+        phis = self.phis
+        splits: List[Tuple[int, List[Tuple[int, int]], int]] = []
+
+        def copy_phis(pred, succ):
+            if succ not in phis:
+                return []
+            k = self.preds[succ].index(pred)
+            copies = [(name(phi.target, phi.target), name(phi.args[k], phi.args[k])) for phi in phis[succ]]
+            return sequentialize(copies, program.fresh_name)
+
+        def emit_copies(copies):
+            for dst, src in copies:
+                out.append(ATR, dst, src)
+
+        for block in range(self.first, self.end):
+            if block not in self.blocks:
+                for i in cfg.block_range(block):
+                    out.append(original.ops[i], original.a1[i], original.a2[i], original.a3[i])
+                continue
+            instrs = self.blocks[block]
+            entry = block == self.first
+            for index, (op, a1, a2, a3) in enumerate(instrs):
+                if entry and op != LABEL:
+                    emit_copies(entry_copies)
+                    entry = False
+                if op == NOP:
+                    continue
+                m1, m2, m3 = name(a1, a1), name(a2, a2), name(a3, a3)
+                if op == ATR and m1 == m2 and a1 != a2:
+                    continue  # cópia entre versões unidas
+                if op in ESCAPE_OPS:
+                    # A versão 0 ainda está no nome original
+                    emit_copies((var, name(version, version))
+                                for version in self.escapes[(block, index)]
+                                for var in (self.var_of(version),) if var in unnamed and var != version)
+                if op == JMP:
+                    emit_copies(copy_phis(block, cfg.labels[a1]))
+                elif op == JZ or op == JNZ:
+                    # Aresta do salto: as cópias vão para um bloco novo
+                    copies = copy_phis(block, cfg.labels[a1])
+                    if copies:
+                        m1 = program.fresh_label()
+                        splits.append((m1, copies, a1))
+                out.append(op, m1, m2, m3)
+                if op == CALL:
+                    emit_copies((name(version, version), self.origin[version])
+                                for version in self.call_defs.get((block, index), ())
+                                if self.origin[version] in unnamed and version in used)
+            if entry:
+                emit_copies(entry_copies)
+            if instrs[-1][0] != JMP and block + 1 in cfg.succs[block]:
+                emit_copies(copy_phis(block, block + 1))
+
+        if splits:
+            last = original.ops[cfg.starts[self.end] - 1]
+            after = program.fresh_label() if last not in (JMP, RETURN, HALT) else 0
+            if after:
+                out.append(JMP, after)
+            for label, copies, target in splits:
+                out.append(LABEL, label)
+                emit_copies(copies)
+                out.append(JMP, target)
+            if after:
+                out.append(LABEL, after)
+
+
+def sequentialize(copies: List[Tuple[int, int]], new_temp) -> List[Tuple[int, int]]:
+    """
+    Ordena cópias paralelas (destinos distintos) em cópias sequenciais;
+    ciclos (ex.: a <- b, b <- a) passam por um temporário de new_temp()
+    """
+    pending = {dst: src for dst, src in copies if dst != src}
+    result = []
+    while pending:
+        sources = set(pending.values())
+        ready = [dst for dst in pending if dst not in sources]
+        if ready:
+            for dst in ready:
+                result.append((dst, pending.pop(dst)))
+            continue
+        dst = next(iter(pending))
+        temp = new_temp()
+        result.append((temp, dst))
+        for other, src in pending.items():
+            if src == dst:
+                pending[other] = temp
+    return result
+
+
+class SSAProgram:
+    """Todas as funções de um programa em SSA (compartilham a tabela de operandos)"""
+
+    def __init__(self, code: PackedTAC):
+        self.code = code
+        self.cfg = build_cfg(code)
+        self.clobbered = self._clobbered()
+        self._taken: Optional[Set[str]] = None
+        self._next = {}
+        ranges = self.cfg.functions or ([(None, 0, len(self.cfg))] if len(self.cfg) else [])
+        self.prologue = ranges[0][1] if ranges else 0  # blocos antes da primeira entrada
+        self.functions: List[SSAFunction] = []
+        for name, first, end in ranges:
+            func = SSAFunction(self, name, first, end)
+            func._place_phis()
+            func._rename()
+            self.functions.append(func)
+
+    def _clobbered(self) -> Set[int]:
+        """Variáveis que uma chamada pode alterar: as atribuídas nas funções e RETVAL"""
+        code, cfg = self.code, self.cfg
+        kinds, texts = code.operands.kinds, code.operands.texts
+        clobbered = set()
+        for name, first, end in cfg.functions:
+            if name == 'MAIN':
+                continue
+            for i in range(cfg.starts[first], cfg.starts[end]):
+                a1 = code.a1[i]
+                if code.ops[i] in DEFINES_ADDR1 and kinds[a1] == VAR:
+                    clobbered.add(a1)
+        for operand, text in enumerate(texts):
+            if text == RETVAL_NAME and kinds[operand] == VAR:
+                clobbered.add(operand)
+        return clobbered
+
+    def fresh_name(self, var: Optional[int] = None) -> int:
+        """
+        Operando novo com texto ainda não usado: "x.N" para a variável `var`
+        ou um temporário "TN" (se `var` for None ou um temporário)
+        """
+        kinds = self.code.operands.kinds
+        if var is None or kinds[var] == TEMP:
+            return self._fresh('T', '', TEMP)
+        return self._fresh(self.code.operands.texts[var], '.', VAR)
+
+    def fresh_label(self) -> int:
+        return self._fresh('LS', '', int(Kind.LABEL))
+
+    def _fresh(self, prefix: str, sep: str, kind: int) -> int:
+        table = self.code.operands
+        if self._taken is None:
+            self._taken = set(table.texts[1:])
+        n = self._next.get(prefix, 0)
+        while True:
+            n += 1
+            text = f"{prefix}{sep}{n}"
+            if text not in self._taken:
+                break
+        self._next[prefix] = n
+        self._taken.add(text)
+        return table.add(text, kind)
+
+    def phi_count(self) -> int:
+        return sum(func.phi_count() for func in self.functions)
+
+    def to_code(self) -> PackedTAC:
+        """TAC normal (mesma tabela de operandos), com as versões coalescidas"""
+        original = self.code
+        out = original.copy_empty()
+        for i in range(self.cfg.starts[self.prologue] if len(self.cfg) else 0):
+            out.append(original.ops[i], original.a1[i], original.a2[i], original.a3[i])
+        for func in self.functions:
+            func._emit(out)
+        return out
+
+
+def build_ssa(code) -> SSAProgram:
+    """Põe todas as funções do código (PackedTAC ou lista de TACInstruction) em SSA"""
+    if not isinstance(code, PackedTAC):
+        code = PackedTAC.from_instructions(code)
+    return SSAProgram(code)
@@ -6,8 +6,34 @@ Autores: Kassiano Vieira e Claudio Nunes
 """
 
 from dataclasses import dataclass
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from ast_nodes import *
+from tac_packed import Kind, OPCODE_OF, PackedTAC
+from walker import run
+
+# Mapeamento de operadores para instruções TAC
+OP_MAP = {
+    '+': 'ADD',
+    '-': 'SUB',
+    '*': 'MUL',
+    '/': 'DIV',
+    '=': 'JEQ',
+    '<>': 'JNE',
+    '<': 'JLT',
+    '>': 'JGT',
+    '<=': 'JLE',
+    '>=': 'JGE',
+    'and': 'AND',
+    'or': 'OR',
+    'not': 'NOT'
+}
+
+# Tipos de operando como inteiros simples (acesso a membros de Enum é lento)
+TEMP, VAR, NUM, STR, LABEL = (int(k) for k in (Kind.TEMP, Kind.VAR, Kind.NUM, Kind.STR, Kind.LABEL))
+
+# Folhas de expressão: viram operandos sem emitir código
+LEAF_NODES = (Num, String, Var)
+LEAF_OPERANDS = LEAF_NODES + (type(None),)
 
 @dataclass
 class TACInstruction:
@@ -28,29 +54,81 @@ class TACInstruction:
             parts.append(f"{str(self.addr3):<12}")
         return '\t'.join(parts)
 
+def _text_operand(text: str, kind: int = None) -> str:
+    """Operando no TAC de strings: o próprio texto"""
+    return text
+
 class TACGenerator:
-    """Gerador de Código Intermediário"""
+    """
+    Gerador de Código Intermediário.
+
+    Os métodos visit_* são geradores executados por walker.run(): cada
+    `yield self.visit_...(filho)` visita o filho com a pilha explícita do
+    walker, então ASTs de qualquer profundidade não estouram a pilha do
+    Python. Visitantes de expressão retornam o operando com o resultado.
+
+    Com reuse_shared=True, um BinOp já calculado (o mesmo objeto, como os
+    compartilhados por Parser(hash_cons=True)) reaproveita o temporário
+    enquanto nenhuma variável lida por ele é atribuída. O temporário só vale
+    no trecho de código que se seguiu ao cálculo: LABEL (ponto de junção) e
+    CALL (a função pode alterar globais) descartam todos.
+
+    Com packed=True, o código é emitido direto como PackedTAC (tac_packed):
+    os operandos são ids da tabela de operandos, já com o tipo, e
+    generate() retorna o PackedTAC em vez da lista de TACInstruction.
+    """
     
-    def __init__(self):
+    def __init__(self, bindings: Optional[Dict] = None, reuse_shared: bool = False,
+                 packed: bool = False):
         self.instructions: List[TACInstruction] = []
+        self.packed = packed
+        self.code: Optional[PackedTAC] = None
+        self.operand = _text_operand
         self.temp_counter = 0
         self.label_counter = 0
         self.function_labels = {}  # Mapeia nomes de funções para labels
+        # Ligações do parser (Parser.bindings): id(nó) -> (nó, Symbol)
+        self.bindings = bindings if bindings is not None else {}
+        # Expressões disponíveis: id(BinOp) -> (nó, temporário, variáveis lidas)
+        self.reuse_shared = reuse_shared
+        self.available: Dict[int, tuple] = {}
+        self.readers: Dict[str, List[int]] = {}  # variável -> expressões que a leem
+    
+    def resolve_name(self, node: ASTNode) -> str:
+        """
+        Nome declarado do símbolo ligado ao nó pelo parser; sem ligação (ex.:
+        análise semântica desabilitada), usa o nome escrito no código.
+        """
+        bound = self.bindings.get(id(node))
+        return bound[1].name if bound is not None else node.name
     
     def new_temp(self) -> str:
         """Gera um novo temporário"""
         self.temp_counter += 1
-        return f"T{self.temp_counter}"
+        if self.code is None:
+            return f"T{self.temp_counter}"
+        return self.code.operands.add(f"T{self.temp_counter}", TEMP)
     
     def new_label(self) -> str:
         """Gera um novo rótulo"""
         self.label_counter += 1
-        return f"L{self.label_counter}"
+        return self.operand(f"L{self.label_counter}", LABEL)
     
     def emit(self, op: str, addr1=None, addr2=None, addr3=None):
-        """Emite uma instrução TAC"""
-        instr = TACInstruction(op, addr1, addr2, addr3)
-        self.instructions.append(instr)
+        """Emite uma instrução TAC (no PackedTAC, os endereços são ids de operandos)"""
+        if self.code is not None:
+            instr = self.code.append(OPCODE_OF[op], addr1 or 0, addr2 or 0, addr3 or 0)
+        else:
+            instr = TACInstruction(op, addr1, addr2, addr3)
+            self.instructions.append(instr)
+        if self.available:
+            if op == 'LABEL' or op == 'CALL':
+                self.available.clear()
+                self.readers.clear()
+            elif op == 'ATR' or op == 'READ':
+                # addr1 recebe um novo valor: descarta as expressões que o leem
+                for key in self.readers.pop(addr1, ()):
+                    self.available.pop(key, None)
         return instr
     
     def generate(self, ast: Program) -> List[TACInstruction]:
@@ -61,16 +139,25 @@ class TACGenerator:
             ast: Árvore sintática do programa
             
         Returns:
-            Lista de instruções TAC geradas
+            Lista de instruções TAC geradas (PackedTAC com packed=True)
         """
         # Reseta os contadores
-        self.instructions = []
+        if self.packed:
+            self.code = PackedTAC()
+            self.operand = self.code.operands.intern
+            self.instructions = self.code
+        else:
+            self.code = None
+            self.operand = _text_operand
+            self.instructions = []
         self.temp_counter = 0
         self.label_counter = 0
         self.function_labels = {}
+        self.available = {}
+        self.readers = {}
         
         # Visita o programa
-        self.visit_program(ast)
+        run(self.visit_program(ast))
         
         return self.instructions
     
@@ -88,11 +175,11 @@ class TACGenerator:
         if node.decls:
             for decl in node.decls:
                 if isinstance(decl, FunctionDecl):
-                    self.visit_function(decl)
+                    yield self.visit_function(decl)
         
         # Depois, gera o bloco principal
-        self.emit('LABEL', 'MAIN')
-        self.visit_compound(node.block)
+        self.emit('LABEL', self.operand('MAIN', LABEL))
+        yield self.visit_compound(node.block)
         self.emit('HALT')
     
     def visit_function(self, node: FunctionDecl):
@@ -107,33 +194,34 @@ class TACGenerator:
         func_label = f"FUNC_{node.name}"
         self.function_labels[node.name.lower()] = func_label
         
-        self.emit('LABEL', func_label)
+        self.emit('LABEL', self.operand(func_label, LABEL))
         
         # Corpo da função
-        self.visit_compound(node.body)
+        yield self.visit_compound(node.body)
         
         # Se a função não tiver um return explícito, adiciona um
         # (em Pascal, o retorno é feito atribuindo ao nome da função)
-        self.emit('RETURN', node.name)
+        self.emit('RETURN', self.operand(node.name, VAR))
     
     def visit_compound(self, node: Compound):
         """Visita bloco de comandos"""
         for stmt in node.statements:
-            self.visit_statement(stmt)
+            yield self.visit_statement(stmt)
     
     def visit_statement(self, node: ASTNode):
-        """Despacha para o visitante apropriado de acordo com o tipo do comando"""
+        """Retorna o visitante apropriado de acordo com o tipo do comando"""
         if isinstance(node, Assign):
-            self.visit_assign(node)
+            return self.visit_assign(node)
         elif isinstance(node, If):
-            self.visit_if(node)
+            return self.visit_if(node)
         elif isinstance(node, While):
-            self.visit_while(node)
+            return self.visit_while(node)
         elif isinstance(node, Call):
-            self.visit_call_statement(node)
+            return self.visit_call_statement(node)
         elif isinstance(node, Compound):
-            self.visit_compound(node)
-        # Outros tipos de nós podem ser ignorados ou gerar erro
+            return self.visit_compound(node)
+        # Outros tipos de nós são ignorados (yield None não faz nada)
+        return None
     
     def visit_assign(self, node: Assign):
         """
@@ -146,33 +234,42 @@ class TACGenerator:
             ATR     A       T2
         """
         # Avalia a expressão do lado direito
-        value_temp = self.visit_expression(node.value)
+        value_temp = yield self.visit_expression(node.value)
         
         # Atribui ao destino
-        target = node.target.name
+        target = self.operand(self.resolve_name(node.target), VAR)
         self.emit('ATR', target, value_temp)
     
-    def visit_expression(self, node: ASTNode) -> str:
+    def visit_expression(self, node: ASTNode):
         """
-        Visita uma expressão e retorna o temporário/variável com o resultado.
+        Visita uma expressão. Folhas são resolvidas na hora; operações e
+        chamadas retornam o gerador que emite o seu código.
         
         Returns:
-            Nome do temporário ou variável que contém o resultado
+            Nome do temporário ou variável que contém o resultado (ou o
+            gerador que o produz)
         """
         if isinstance(node, Num):
             # Constante numérica - retorna diretamente o valor
-            return str(int(node.value) if isinstance(node.value, int) else node.value)
+            return self.operand(str(int(node.value) if isinstance(node.value, int) else node.value), NUM)
         
         elif isinstance(node, String):
             # String literal
-            return f'"{node.value}"'
+            return self.operand(f'"{node.value}"', STR)
         
         elif isinstance(node, Var):
-            # Variável - retorna o nome
-            return node.name
+            # Variável - retorna o nome declarado
+            return self.operand(self.resolve_name(node), VAR)
         
         elif isinstance(node, BinOp):
-            # Operação binária
+            if self.reuse_shared:
+                entry = self.available.get(id(node))
+                if entry is not None:
+                    return entry[1]
+            # Operação binária; com operandos folha, emite direto (sem gerador)
+            if isinstance(node.left, LEAF_NODES) and isinstance(node.right, LEAF_OPERANDS):
+                right = self.visit_expression(node.right) if node.right else None
+                return self.remember(node, self.emit_binop(node.op, self.visit_expression(node.left), right))
             return self.visit_binop(node)
         
         elif isinstance(node, Call):
@@ -194,42 +291,40 @@ class TACGenerator:
         Returns:
             Nome do temporário com o resultado
         """
-        # Mapeamento de operadores para instruções TAC
-        op_map = {
-            '+': 'ADD',
-            '-': 'SUB',
-            '*': 'MUL',
-            '/': 'DIV',
-            '=': 'JEQ',
-            '<>': 'JNE',
-            '<': 'JLT',
-            '>': 'JGT',
-            '<=': 'JLE',
-            '>=': 'JGE',
-            'and': 'AND',
-            'or': 'OR',
-            'not': 'NOT'
-        }
-        
-        op = node.op.lower()
-        
+        left = yield self.visit_expression(node.left)
+        right = (yield self.visit_expression(node.right)) if node.right else None
+        return self.remember(node, self.emit_binop(node.op, left, right))
+
+    def remember(self, node: BinOp, temp: str) -> str:
+        """Registra `temp` como valor disponível de `node` (com reuse_shared)"""
+        if self.reuse_shared:
+            names = set()
+            for child in (node.left, node.right):
+                if isinstance(child, Var):
+                    names.add(self.operand(self.resolve_name(child), VAR))
+                elif isinstance(child, BinOp):
+                    entry = self.available.get(id(child))
+                    if entry is None:
+                        return temp  # operando invalidado durante o cálculo (ex.: CALL)
+                    names |= entry[2]
+                elif isinstance(child, Call):
+                    return temp
+            self.available[id(node)] = (node, temp, names)
+            for name in names:
+                self.readers.setdefault(name, []).append(id(node))
+        return temp
+
+    def emit_binop(self, op: str, left: str, right: Optional[str]) -> str:
+        """Emite a operação sobre operandos já avaliados e retorna o temporário"""
+        op = op.lower()
+        result = self.new_temp()
         if op == 'not':
             # Operador unário NOT
-            operand = self.visit_expression(node.left)
-            result = self.new_temp()
-            self.emit('NOT', result, operand)
-            return result
-        
+            self.emit('NOT', result, left)
         else:
-            # Operadores binários
-            left = self.visit_expression(node.left)
-            right = self.visit_expression(node.right) if node.right else None
-            result = self.new_temp()
-            
-            tac_op = op_map.get(op, 'UNKNOWN')
+            tac_op = OP_MAP.get(op, 'UNKNOWN')
             self.emit(tac_op, result, left, right)
-            
-            return result
+        return result
     
     def visit_if(self, node: If):
         """
@@ -254,7 +349,7 @@ class TACGenerator:
         label_end = self.new_label()
         
         # Avalia a condição
-        cond_temp = self.visit_expression(node.condition)
+        cond_temp = yield self.visit_expression(node.condition)
         
         # Salta para ELSE (ou FIM) se condição falsa
         if node.else_branch:
@@ -263,7 +358,7 @@ class TACGenerator:
             self.emit('JZ', label_end, cond_temp)
         
         # Código do THEN
-        self.visit_statement(node.then_branch)
+        yield self.visit_statement(node.then_branch)
         
         if node.else_branch:
             # Pula o ELSE após executar THEN
@@ -271,7 +366,7 @@ class TACGenerator:
             
             # Código do ELSE
             self.emit('LABEL', label_else)
-            self.visit_statement(node.else_branch)
+            yield self.visit_statement(node.else_branch)
         
         # Label de fim
         self.emit('LABEL', label_end)
@@ -295,13 +390,13 @@ class TACGenerator:
         self.emit('LABEL', label_start)
         
         # Avalia a condição
-        cond_temp = self.visit_expression(node.condition)
+        cond_temp = yield self.visit_expression(node.condition)
         
         # Salta para fim se condição falsa
         self.emit('JZ', label_end, cond_temp)
         
         # Código do corpo
-        self.visit_statement(node.body)
+        yield self.visit_statement(node.body)
         
         # Volta para o início
         self.emit('JMP', label_start)
@@ -323,25 +418,29 @@ class TACGenerator:
         if func_name == 'read':
             # READ é uma instrução especial
             if node.args:
-                var_temp = self.visit_expression(node.args[0])
+                var_temp = yield self.visit_expression(node.args[0])
                 self.emit('READ', var_temp)
         
         elif func_name == 'write':
             # WRITE é uma instrução especial
             if node.args:
-                val_temp = self.visit_expression(node.args[0])
+                val_temp = yield self.visit_expression(node.args[0])
                 self.emit('WRITE', val_temp)
         
         else:
             # Chamada de função/procedimento normal
             # Empilha parâmetros
             for arg in node.args:
-                arg_temp = self.visit_expression(arg)
+                arg_temp = yield self.visit_expression(arg)
                 self.emit('PARAM', arg_temp)
             
-            # Chama a função
-            func_label = self.function_labels.get(func_name, func_name)
-            self.emit('CALL', func_label, str(len(node.args)))
+            # Chama a função (pelo símbolo ligado, se houver)
+            bound = self.bindings.get(id(node))
+            if bound is not None and bound[1].kind == 'function':
+                func_label = f"FUNC_{bound[1].name}"
+            else:
+                func_label = self.function_labels.get(func_name, func_name)
+            self.emit('CALL', self.operand(func_label, LABEL), self.operand(str(len(node.args)), NUM))
     
     def visit_call_expression(self, node: Call) -> str:
         """
@@ -357,11 +456,11 @@ class TACGenerator:
             Nome do temporário com o valor de retorno
         """
         # Gera a chamada
-        self.visit_call_statement(node)
+        yield self.visit_call_statement(node)
         
         # Captura o valor de retorno em um temporário
         result = self.new_temp()
-        self.emit('ATR', result, 'RETVAL')
+        self.emit('ATR', result, self.operand('RETVAL', VAR))
         
         return result
     
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Leitura e gravação de TAC fora do gerador.
+
+- Texto: o formato de TACGenerator.export_tac (cabeçalho com '#' e uma
+  instrução numerada por linha, campos separados por tabulação).
+  read_tac_text() lê esse formato de volta.
+- Binário: o PackedTAC (tac_packed) gravado como está, para carregar rápido:
+
+      b'CPTAC\\x01'                        assinatura e versão
+      n_operandos, n_instruções, bytes_texto   uint32 cada
+      tipos        n_operandos × uint8     (Kind)
+      tamanhos     n_operandos × uint32    tamanho de cada texto em caracteres
+      textos       utf-8, todos os textos concatenados
+      ops          n_instruções × uint8    (Op)
+      a1, a2, a3   n_instruções × uint32   ids dos operandos (0 = nenhum)
+
+load_tac() aceita os dois formatos (detecta pela assinatura) e retorna um
+PackedTAC, que o optimize_tac aceita direto.
+
+Uso (otimiza um arquivo TAC; saída em binário se terminar em .tacb):
+    python tac_io.py entrada.tac saida.tac
+"""
+
+import struct
+import sys
+from array import array
+from typing import Iterable, List, TextIO
+
+from optimizer import optimize_tac
+from tac_generator import TACInstruction
+from tac_packed import Kind, OPCODE_OF, Op, OperandTable, PackedTAC
+
+MAGIC = b'CPTAC\x01'
+BINARY_SUFFIX = '.tacb'
+_HEADER = struct.Struct('<III')
+_NUM = int(Kind.NUM)
+
+TEXT_HEADER = ("# CÓDIGO INTERMEDIÁRIO (TAC)\n"
+               "# Gerado pelo Compilador Pascal Simplificado\n"
+               "# Formato: OPERAÇÃO ADDR1 ADDR2 ADDR3\n\n")
+
+
+class TACFormatError(ValueError):
+    """Arquivo TAC mal formado (com a linha do problema, no formato texto)"""
+
+
+# ======== Texto ========
+
+def write_tac_text(instructions: Iterable[TACInstruction], out: TextIO):
+    """Escreve no formato de TACGenerator.export_tac"""
+    out.write(TEXT_HEADER)
+    for i, instr in enumerate(instructions, 1):
+        out.write(f"{i:4}. {instr}\n")
+
+
+def save_tac_text(instructions: Iterable[TACInstruction], file_path: str):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        write_tac_text(instructions, f)
+
+
+def parse_tac_line(line: str, line_number: int = 0) -> TACInstruction:
+    """Instrução de uma linha "   N. OP\\tADDR1\\tADDR2\\tADDR3" (numeração opcional)"""
+    text = line.strip()
+    number, dot, rest = text.partition('. ')
+    if dot and number.isdigit():
+        text = rest
+    fields: List[str] = []
+    for part in text.split('\t'):
+        # Tabulações dentro de uma string literal não separam campos
+        if fields and fields[-1].startswith('"') and not _closed(fields[-1]):
+            fields[-1] += '\t' + part
+        else:
+            fields.append(part)
+    fields = [field.strip() for field in fields]
+    if not fields[0] or len(fields) > 4:
+        raise TACFormatError(f"Linha {line_number}: instrução TAC inválida: {line.rstrip()!r}")
+    if fields[0] not in OPCODE_OF:
+        raise TACFormatError(f"Linha {line_number}: operação desconhecida {fields[0]!r}")
+    return TACInstruction(*fields)
+
+
+def _closed(field: str) -> bool:
+    field = field.rstrip(' ')
+    return len(field) > 1 and field.endswith('"')
+
+
+def read_tac_text(source: TextIO) -> List[TACInstruction]:
+    """Lê as instruções de um arquivo no formato de export_tac"""
+    instructions = []
+    for line_number, line in enumerate(source, 1):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        instructions.append(parse_tac_line(line, line_number))
+    return instructions
+
+
+# ======== Binário ========
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, data) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def dump_tac(code) -> bytes:
+    """Serializa um PackedTAC (ou lista de TACInstruction) no formato binário"""
+    if not isinstance(code, PackedTAC):
+        code = PackedTAC.from_instructions(code)
+    table = code.operands
+    texts = [text or '' for text in table.texts]
+    blob = ''.join(texts).encode('utf-8')
+    lengths = array('I', map(len, texts))
+    parts = [MAGIC, _HEADER.pack(len(texts), len(code), len(blob)), table.kinds.tobytes(),
+             _le(lengths), blob, code.ops.tobytes(), _le(code.a1), _le(code.a2), _le(code.a3)]
+    return b''.join(parts)
+
+
+def save_tac_binary(code, file_path: str):
+    with open(file_path, 'wb') as f:
+        f.write(dump_tac(code))
+
+
+def loads_tac(data: bytes) -> PackedTAC:
+    """Reconstrói o PackedTAC a partir dos bytes de dump_tac"""
+    if data[:len(MAGIC)] != MAGIC:
+        raise TACFormatError('Arquivo não é um TAC binário (assinatura inválida)')
+    view = memoryview(data)
+    pos = len(MAGIC)
+    try:
+        n_operands, n_instructions, blob_size = _HEADER.unpack_from(data, pos)
+    except struct.error:
+        raise TACFormatError('TAC binário truncado') from None
+    pos += _HEADER.size
+    sizes = (n_operands, 4 * n_operands, blob_size, n_instructions, 4 * n_instructions,
+             4 * n_instructions, 4 * n_instructions)
+    if len(data) != pos + sum(sizes):
+        raise TACFormatError('TAC binário truncado ou com bytes a mais')
+    sections = []
+    for size in sizes:
+        sections.append(view[pos:pos + size])
+        pos += size
+    kinds_bytes, lengths_bytes, blob, ops, a1, a2, a3 = sections
+
+    table = OperandTable()
+    kinds = array('B', kinds_bytes)
+    text = bytes(blob).decode('utf-8')
+    texts: List = []
+    start = 0
+    for length in _from_le('I', lengths_bytes):
+        texts.append(text[start:start + length])
+        start += length
+    texts[0] = None  # id 0: sem operando
+    table.texts = texts
+    table.kinds = kinds
+    table.values = [float(t) if k == _NUM else None for t, k in zip(texts, kinds)]
+    ids = table._ids
+    for index in range(1, n_operands):
+        ids[kinds[index]][texts[index]] = index
+
+    code = PackedTAC(table)
+    code.ops = array('B', ops)
+    code.a1 = _from_le('I', a1)
+    code.a2 = _from_le('I', a2)
+    code.a3 = _from_le('I', a3)
+    if code.ops and max(code.ops) > max(Op):
+        raise TACFormatError('TAC binário com opcode desconhecido')
+    if n_instructions and max(max(code.a1), max(code.a2), max(code.a3)) >= n_operands:
+        raise TACFormatError('TAC binário com operando fora da tabela')
+    return code
+
+
+def load_tac(file_path: str) -> PackedTAC:
+    """Carrega um arquivo TAC em texto ou binário"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        return loads_tac(data)
+    lines = data.decode('utf-8').splitlines()
+    return PackedTAC.from_instructions(read_tac_text(lines))
+
+
+def save_tac(code, file_path: str):
+    """Grava em binário se o caminho terminar em .tacb, senão em texto"""
+    if file_path.endswith(BINARY_SUFFIX):
+        save_tac_binary(code, file_path)
+    else:
+        save_tac_text(code, file_path)
+
+
+def optimize_file(input_path: str, output_path: str, passes=None):
+    """Carrega o TAC de `input_path`, otimiza e grava em `output_path`"""
+    code = load_tac(input_path)
+    optimized = optimize_tac(code, passes, verbose=False)
+    save_tac(optimized, output_path)
+    print(f"✅ {input_path}: {len(code)} → {len(optimized)} instruções, gravado em {output_path}")
+    return optimized
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print("Uso: python tac_io.py entrada.tac saida.tac[b] [passes separados por vírgula]")
+        sys.exit(1)
+    passes = sys.argv[3].split(',') if len(sys.argv) > 3 else None
+    optimize_file(sys.argv[1], sys.argv[2], passes)
@@ -0,0 +1,228 @@
+"""
+Representação compacta do código de três endereços (TAC).
+
+Em vez de um TACInstruction (dataclass com quatro strings) por instrução,
+PackedTAC guarda o código em arrays paralelos:
+
+- ops[i]:          opcode da instrução (Op)
+- a1/a2/a3[i]:     ids dos operandos na OperandTable (0 = sem operando)
+
+Cada operando distinto é guardado uma vez na OperandTable, com o texto, o
+tipo (Kind: temporário, variável, constante numérica, string ou rótulo) e,
+para constantes, o valor já convertido. Assim o otimizador compara
+operandos como inteiros e não precisa reclassificar strings (float() em
+try/except, startswith('T')) a cada passe.
+
+O TACGenerator(packed=True) emite direto neste formato e o TACOptimizer
+aceita tanto PackedTAC quanto listas de TACInstruction.
+
+Exemplo:
+    codigo = TACGenerator(packed=True).generate(ast)
+    otimizado = TACOptimizer(codigo).optimize()
+    for instr in otimizado:       # TACInstruction sob demanda
+        print(instr)
+"""
+
+import re
+import sys
+from array import array
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional
+
+
+class Op(IntEnum):
+    """Opcodes do TAC (o nome é o texto da instrução)"""
+    LABEL = 1
+    JMP = 2
+    JZ = 3
+    JNZ = 4
+    CALL = 5
+    PARAM = 6
+    RETURN = 7
+    HALT = 8
+    READ = 9
+    WRITE = 10
+    ATR = 11
+    NOT = 12
+    ADD = 13
+    SUB = 14
+    MUL = 15
+    DIV = 16
+    JEQ = 17
+    JNE = 18
+    JLT = 19
+    JGT = 20
+    JLE = 21
+    JGE = 22
+    AND = 23
+    OR = 24
+    UNKNOWN = 25
+
+
+class Kind(IntEnum):
+    """Tipo de um operando"""
+    NONE = 0
+    TEMP = 1
+    VAR = 2
+    NUM = 3
+    STR = 4
+    LABEL = 5
+
+
+_NUM = int(Kind.NUM)
+
+OPCODE_OF: Dict[str, int] = {op.name: int(op) for op in Op}
+OP_NAMES: List[Optional[str]] = [None] * (max(Op) + 1)
+for _op in Op:
+    OP_NAMES[_op] = _op.name
+
+# Operações binárias que podem ser dobradas/reaproveitadas
+BINARY_OPS = frozenset(int(op) for op in (Op.ADD, Op.SUB, Op.MUL, Op.DIV, Op.JEQ, Op.JNE, Op.JLT,
+                                          Op.JGT, Op.JLE, Op.JGE, Op.AND, Op.OR))
+# Instruções que definem o operando do endereço 1
+ASSIGN_OPS = BINARY_OPS | {int(Op.ATR), int(Op.NOT)}
+# Pontos de controle: os valores conhecidos deixam de valer
+CONTROL_OPS = frozenset(int(op) for op in (Op.LABEL, Op.JMP, Op.JZ, Op.JNZ, Op.CALL))
+# Instruções cujo endereço 1 é um rótulo
+LABEL_OPS = frozenset(int(op) for op in (Op.LABEL, Op.JMP, Op.JZ, Op.JNZ, Op.CALL))
+
+_TEMP_NAME = re.compile(r'T\d+')
+
+
+def classify(text: str) -> int:
+    """Tipo de um operando a partir do texto (para TAC vindo de strings)"""
+    first = text[:1]
+    if first == '"':
+        return Kind.STR
+    if first and first in '0123456789+-.':
+        try:
+            float(text)
+            return Kind.NUM
+        except ValueError:
+            pass
+    if _TEMP_NAME.fullmatch(text):
+        return Kind.TEMP
+    return Kind.VAR
+
+
+class OperandTable:
+    """Operandos distintos: texto, tipo e valor numérico, indexados por id (0 = nenhum)"""
+
+    def __init__(self):
+        self.texts: List[Optional[str]] = [None]
+        self.kinds = array('B', [Kind.NONE])
+        self.values: List[Optional[float]] = [None]
+        # Um dicionário por tipo: o mesmo texto em papéis diferentes (ex.:
+        # variável e rótulo) são operandos diferentes
+        self._ids: List[Dict[str, int]] = [{} for _ in Kind]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def intern(self, text: str, kind: Optional[int] = None) -> int:
+        """Id do operando `text` (classificado pelo texto se `kind` não for dado)"""
+        if kind is None:
+            kind = classify(text)
+        ids = self._ids[kind]
+        index = ids.get(text)
+        if index is None:
+            index = ids[text] = len(self.texts)
+            self.texts.append(text)
+            self.kinds.append(kind)
+            self.values.append(float(text) if kind == _NUM else None)
+        return index
+
+    def add(self, text: str, kind: int) -> int:
+        """
+        Novo operando sem passar pelo índice de textos (para operandos que
+        certamente ainda não existem, como os temporários do gerador)
+        """
+        self.texts.append(text)
+        self.kinds.append(kind)
+        self.values.append(None)
+        return len(self.texts) - 1
+
+    def temp(self, text: str) -> int:
+        return self.intern(text, Kind.TEMP)
+
+    def var(self, text: str) -> int:
+        return self.intern(text, Kind.VAR)
+
+    def number(self, text: str) -> int:
+        return self.intern(text, Kind.NUM)
+
+    def string(self, text: str) -> int:
+        return self.intern(text, Kind.STR)
+
+    def label(self, text: str) -> int:
+        return self.intern(text, Kind.LABEL)
+
+
+class PackedTAC:
+    """Código TAC em arrays paralelos de opcodes e ids de operandos"""
+
+    def __init__(self, operands: Optional[OperandTable] = None):
+        self.operands = operands if operands is not None else OperandTable()
+        self.ops = array('B')
+        self.a1 = array('I')
+        self.a2 = array('I')
+        self.a3 = array('I')
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def append(self, op: int, a1: int = 0, a2: int = 0, a3: int = 0) -> int:
+        """Acrescenta uma instrução (ids de operandos) e retorna o seu índice"""
+        self.ops.append(op)
+        self.a1.append(a1)
+        self.a2.append(a2)
+        self.a3.append(a3)
+        return len(self.ops) - 1
+
+    def copy_empty(self) -> 'PackedTAC':
+        """Novo código vazio que compartilha a tabela de operandos"""
+        return PackedTAC(self.operands)
+
+    # ======== Conversão ========
+
+    def instruction(self, index: int):
+        """TACInstruction da posição `index`"""
+        from tac_generator import TACInstruction
+        texts = self.operands.texts
+        return TACInstruction(OP_NAMES[self.ops[index]], texts[self.a1[index]],
+                              texts[self.a2[index]], texts[self.a3[index]])
+
+    def __iter__(self) -> Iterator:
+        from tac_generator import TACInstruction
+        texts = self.operands.texts
+        for op, a1, a2, a3 in zip(self.ops, self.a1, self.a2, self.a3):
+            yield TACInstruction(OP_NAMES[op], texts[a1], texts[a2], texts[a3])
+
+    def to_instructions(self) -> List:
+        return list(self)
+
+    @classmethod
+    def from_instructions(cls, instructions) -> 'PackedTAC':
+        """Empacota uma lista de TACInstruction (tipos dos operandos pelo texto)"""
+        packed = cls()
+        intern = packed.operands.intern
+        for instr in instructions:
+            op = OPCODE_OF.get(instr.op, Op.UNKNOWN)
+            a1 = instr.addr1
+            if a1 is None:
+                a1 = 0
+            elif op in LABEL_OPS:
+                a1 = intern(str(a1), Kind.LABEL)
+            else:
+                a1 = intern(str(a1))
+            packed.append(op, a1,
+                          0 if instr.addr2 is None else intern(str(instr.addr2)),
+                          0 if instr.addr3 is None else intern(str(instr.addr3)))
+        return packed
+
+    def nbytes(self) -> int:
+        """Memória dos arrays e da tabela de operandos (sem o texto dos operandos)"""
+        table = self.operands
+        total = sum(a.itemsize * len(a) for a in (self.ops, self.a1, self.a2, self.a3, table.kinds))
+        total += sys.getsizeof(table.texts) + sys.getsizeof(table.values)
+        return total + sum(sys.getsizeof(ids) for ids in table._ids)
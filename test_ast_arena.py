@@ -0,0 +1,69 @@
+"""
+Testes dos nós com __slots__ e da AST em arena (ast_arena).
+"""
+
+import sys
+
+import pytest
+
+from ast_arena import ASTArena
+from ast_exporter import ast_to_dict, DotExporter
+from ast_nodes import *
+from lexer import Lexer
+from parser import Parser
+from tac_generator import TACGenerator
+from walker import walk
+from exemplos import EXEMPLOS
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass(slots=True) exige Python 3.10")
+def test_nos_sem_dict():
+    for node in (Program('p', [], Compound([])), BinOp('+', Num(1), Var('x')), If(Var('c'), Compound([]))):
+        assert not hasattr(node, '__dict__')
+
+
+def test_arena_equivale_a_ast_de_objetos():
+    for exemplo in EXEMPLOS:
+        with open(exemplo, encoding='utf-8') as f:
+            ast = Parser(list(Lexer(f.read()).tokenize())).parse()
+        arena = ASTArena.from_ast(ast)
+        visao = arena.node(arena.root)
+
+        assert isinstance(visao, Program) and type(visao).__name__ == 'Program'
+        assert ast_to_dict(visao) == ast_to_dict(ast)
+        assert [str(i) for i in TACGenerator().generate(visao)] == [str(i) for i in TACGenerator().generate(ast)]
+        dots = DotExporter(), DotExporter()
+        walk(ast, dots[0]._visit)
+        walk(visao, dots[1]._visit)
+        assert dots[0].lines == dots[1].lines
+
+
+def test_valores_e_listas():
+    ast = Program('p', [VarDecl(['a', 'b'], 'real'), VarDecl(['a'], 'integer')], Compound([
+        Assign(Var('a'), BinOp('+', Num(2), Num(2.5))),
+        If(BinOp('not', Var('a'), None), Call('write', [String('fim')])),
+    ]))
+    arena = ASTArena.from_ast(ast)
+    visao = arena.node(arena.root)
+
+    assert visao.decls[0].names == ['a', 'b'] and visao.decls[1].type_name == 'integer'
+    soma = visao.block.statements[0].value
+    assert (soma.left.value, soma.right.value) == (2, 2.5) and isinstance(soma.left.value, int)
+    se = visao.block.statements[1]
+    assert se.condition.right is None and se.else_branch is None
+    assert arena.kind(arena.root) is Program
+    assert arena.strings.count('a') == 1  # strings internadas
+
+    with pytest.raises(AttributeError):
+        se.condition = Var('b')  # visões são somente leitura
+
+
+def test_arena_de_ast_profunda():
+    comando = Assign(Var('x'), Num(0))
+    for _ in range(20000):
+        comando = Compound([comando])
+    arena = ASTArena.from_ast(Program('p', [], comando))
+    assert len(arena) == 20004
+    assert [str(i).split() for i in TACGenerator().generate(arena.node(arena.root))] == [
+        ['LABEL', 'MAIN'], ['ATR', 'x', '0'], ['HALT']
+    ]
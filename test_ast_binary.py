@@ -0,0 +1,74 @@
+"""
+Testes da serialização binária da AST (ast_binary).
+"""
+
+import pytest
+
+from ast_binary import BinaryAST, BinaryASTError, dump_ast, load_ast, save_ast
+from ast_nodes import *
+from lexer import Lexer
+from parser import Parser
+from tac_generator import TACGenerator
+from exemplos import EXEMPLOS
+
+
+def analisar(codigo: str, **opcoes):
+    return Parser(list(Lexer(codigo).tokenize()), **opcoes).parse()
+
+
+def test_ida_e_volta_pelos_exemplos(tmp_path):
+    from benchmarks import gerar_programa
+    codigos = [open(exemplo, encoding='utf-8').read() for exemplo in EXEMPLOS]
+    for codigo in codigos + [gerar_programa(n_funcoes=10, comandos=6)]:
+        ast = analisar(codigo)
+        caminho = tmp_path / 'ast.bin'
+        save_ast(ast, str(caminho))
+        with load_ast(str(caminho)) as arquivo:
+            assert arquivo.tree() == ast
+        assert BinaryAST(dump_ast(ast)).tree() == ast
+
+
+def test_valores_preservados():
+    ast = Program('p', [VarDecl(['ação', 'b'], 'real')], Compound([
+        Assign(Var('ação'), BinOp('-', Num(-7), Num(2 ** 70))),
+        Assign(Var('b'), BinOp('*', Num(0.1), Num(1))),
+        If(BinOp('not', Var('b'), None), Call('write', [String('fim "ok"')])),
+    ]))
+    lido = BinaryAST(dump_ast(ast)).tree()
+    assert lido == ast
+    numeros = [lido.block.statements[i].value for i in (0, 1)]
+    assert [type(n.right.value) for n in numeros] == [int, int]
+    assert type(numeros[1].left.value) is float
+
+
+def test_dag_gravado_uma_vez_e_compartilhado_na_leitura():
+    codigo = 'program p; var a, b, x : integer; begin x := a + b; x := (a + b) * 2 end.'
+    arvore, dag = analisar(codigo), analisar(codigo, hash_cons=True)
+    assert len(dump_ast(dag)) < len(dump_ast(arvore))
+    lido = BinaryAST(dump_ast(dag)).tree()
+    primeiro, segundo = [cmd.value for cmd in lido.block.statements]
+    assert primeiro is segundo.left and lido == arvore
+
+
+def test_leitura_preguicosa_de_subarvore():
+    from benchmarks import gerar_programa
+    ast = analisar(gerar_programa(n_funcoes=10, comandos=6))
+    arquivo = BinaryAST(dump_ast(ast))
+    # Na pós-ordem, o corpo da primeira função está entre os primeiros nós
+    corpo = next(i for i in range(len(arquivo)) if arquivo.kind(i) is Compound)
+    funcao = next(i for i, decl in enumerate(ast.decls) if isinstance(decl, FunctionDecl))
+    assert arquivo.node(corpo) == ast.decls[funcao].body.statements[2].body
+    assert len(arquivo._nodes) < len(arquivo) // 10
+    assert arquivo.node(corpo) is arquivo.tree().decls[funcao].body.statements[2].body
+
+
+def test_ast_profunda_e_arquivo_invalido():
+    comando = Assign(Var('x'), Num(0))
+    for i in range(20000):
+        comando = If(Var('c'), comando, Assign(Var('x'), Num(i)))
+    ast = Program('p', [], Compound([comando]))
+    tac = [str(i) for i in TACGenerator().generate(BinaryAST(dump_ast(ast)).tree())]
+    assert tac == [str(i) for i in TACGenerator().generate(ast)]
+
+    with pytest.raises(BinaryASTError):
+        BinaryAST(b'{"type": "Program"}')
@@ -0,0 +1,109 @@
+"""
+Testes dos exportadores de AST (JSON e DOT em streaming) e do carregador de JSON.
+"""
+
+import contextlib
+import io
+import json
+
+import pytest
+
+from ast_exporter import (ast_to_dict, dict_to_ast, export_ast_to_json, load_ast_from_json,
+                          write_ast_json, ASTFormatError, DotExporter)
+from ast_nodes import *
+from lexer import Lexer
+from parser import Parser
+from tac_generator import TACGenerator
+from exemplos import EXEMPLOS
+
+
+def asts():
+    for exemplo in EXEMPLOS:
+        with open(exemplo, encoding='utf-8') as f:
+            yield Parser(list(Lexer(f.read()).tokenize())).parse()
+    yield Program('p', [VarDecl(['ação', 'b'], 'real'), TypeDecl('t', 'integer')], Compound([
+        If(BinOp('not', Var('a'), None), Compound([]), None),
+        Call('write', [String('a "b"\n'), Num(1.5)]),
+    ]))
+
+
+def test_json_streaming_igual_ao_json_dump(tmp_path):
+    for ast in asts():
+        dados = ast_to_dict(ast)
+        saida = io.StringIO()
+        write_ast_json(ast, saida)
+        assert saida.getvalue() == json.dumps(dados, indent=2, ensure_ascii=False)
+
+        compacto = io.StringIO()
+        write_ast_json(ast, compacto, indent=None)
+        assert compacto.getvalue() == json.dumps(dados, separators=(',', ':'), ensure_ascii=False)
+
+        caminho = tmp_path / 'ast.json'
+        with contextlib.redirect_stdout(io.StringIO()):
+            export_ast_to_json(ast, str(caminho))
+        assert json.loads(caminho.read_text(encoding='utf-8')) == dados
+
+
+def test_dot_streaming_igual_as_linhas(tmp_path):
+    for ast in asts():
+        em_memoria = DotExporter()
+        em_memoria.write(ast)
+        caminho = tmp_path / 'ast.dot'
+        with contextlib.redirect_stdout(io.StringIO()):
+            DotExporter().export(ast, str(caminho))
+        assert caminho.read_text(encoding='utf-8').splitlines() == em_memoria.lines
+
+        compacto = DotExporter(compact=True)
+        compacto.write(ast)
+        assert len(compacto.lines) == len(em_memoria.lines)
+        assert all(' ' not in linha for linha in compacto.lines if '->' in linha)
+
+
+def test_json_de_ast_profunda():
+    comando = Assign(Var('x'), Num(0))
+    for _ in range(20000):
+        comando = Compound([comando])
+    saida = io.StringIO()
+    write_ast_json(Program('p', [], comando), saida, indent=None)
+    texto = saida.getvalue()
+    assert texto.count('"Compound"') == 20000
+    assert texto.endswith('"value":{"type":"Num","value":0}}' + ']}' * 20000 + '}')
+
+
+def test_carrega_json_exportado(tmp_path):
+    for ast in asts():
+        caminho = tmp_path / 'ast.json'
+        with contextlib.redirect_stdout(io.StringIO()):
+            export_ast_to_json(ast, str(caminho))
+        carregada = load_ast_from_json(str(caminho))
+        assert carregada == ast
+        assert [str(i) for i in TACGenerator().generate(carregada)] == \
+               [str(i) for i in TACGenerator().generate(ast)]
+
+
+def test_json_invalido():
+    dados = ast_to_dict(next(asts()))
+    casos = [
+        ({'type': 'Foo'}, 'raiz: nó inválido'),
+        (dict(dados, name=1), 'raiz.name: esperada uma string'),
+        (dict(dados, block=None), 'raiz.block: nó obrigatório é null'),
+        (dict(dados, decls={}), 'raiz.decls: esperada uma lista de nós'),
+        (dict(dados, extra=0), "campos desconhecidos em Program: ['extra']"),
+        ({'type': 'Num', 'value': True}, 'raiz.value: esperado um número'),
+        ({'type': 'Assign', 'target': {'type': 'Var', 'name': 'x'}}, "campo 'value' ausente em Assign"),
+        ({'type': 'Compound', 'statements': [{'type': 'Var'}]}, "raiz.statements[0]: campo 'name' ausente"),
+    ]
+    for dados_invalidos, mensagem in casos:
+        with pytest.raises(ASTFormatError, match=mensagem.replace('[', r'\[').replace(']', r'\]')):
+            dict_to_ast(dados_invalidos)
+
+
+def test_carrega_ast_profunda():
+    comando = Assign(Var('x'), Num(0))
+    for _ in range(20000):
+        comando = Compound([comando])
+    ast = Program('p', [], comando)
+    original, carregada = io.StringIO(), io.StringIO()
+    write_ast_json(ast, original, indent=None)
+    write_ast_json(dict_to_ast(ast_to_dict(ast)), carregada, indent=None)
+    assert carregada.getvalue() == original.getvalue()
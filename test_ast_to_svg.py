@@ -0,0 +1,108 @@
+"""
+Testes da visualização SVG com orçamento de nós e subárvores dobradas.
+"""
+
+import contextlib
+import io
+import json
+import xml.dom.minidom
+
+import pytest
+
+import ast_to_png
+from ast_exporter import ast_to_dict
+from ast_nodes import *
+from ast_to_svg import fold_ast, write_svg, create_svg_visualization
+from lexer import Lexer
+from parser import Parser
+from exemplos import EXEMPLOS
+
+
+def contar_nos(dados):
+    return json.dumps(dados).count('"type"')
+
+
+def cobertos(nos):
+    """Nós desenhados (sem os resumos "…") mais os escondidos nas dobras"""
+    return sum(not no.label[0].startswith('…') for no in nos) + sum(no.hidden for no in nos)
+
+
+def programa_grande(n_comandos=500):
+    comandos = [Assign(Var(f'x{i}'), BinOp('+', Var('a'), BinOp('*', Num(i), Var('b'))))
+                for i in range(n_comandos)]
+    return ast_to_dict(Program('p', [VarDecl(['a', 'b'], 'integer')], Compound(comandos)))
+
+
+def test_todos_os_nos_sem_limite():
+    for exemplo in EXEMPLOS:
+        with open(exemplo, encoding='utf-8') as f:
+            dados = ast_to_dict(Parser(list(Lexer(f.read()).tokenize())).parse())
+        nos = fold_ast(dados, max_nodes=10 ** 6)
+        assert len(nos) == contar_nos(dados)
+        assert not any(no.hidden for no in nos)
+
+
+def test_orcamento_e_resumo_dos_dobrados():
+    dados = programa_grande()
+    total = contar_nos(dados)
+    for limite in (1, 2, 3, 50, 400):
+        nos = fold_ast(dados, max_nodes=limite)
+        assert len(nos) <= limite
+        assert cobertos(nos) == total
+
+    nos = fold_ast(dados, max_nodes=50)
+    resumo = [no for no in nos if no.label[0].startswith('…')]
+    assert len(resumo) == 1
+    assert resumo[0].label[0] == '… +454 filhos'
+    assert resumo[0].label[1].startswith(f'▸ {resumo[0].hidden} nós: ')
+
+
+def test_profundidade_e_tipos_dobrados():
+    dados = programa_grande(20)
+    nos = fold_ast(dados, max_depth=2)
+    assert max(no.depth for no in nos) == 2
+    assert cobertos(nos) == contar_nos(dados)
+
+    nos = fold_ast(dados, fold_types=('BinOp',))
+    binops = [no for no in nos if no.label[0] == 'BinOp']
+    assert len(binops) == 20
+    assert all(no.hidden == 4 and not no.children for no in binops)
+    assert binops[0].label[-1] == '▸ 4 nós: 2 Var, 1 BinOp, 1 Num'
+
+
+def test_contagem_limitada():
+    dados = programa_grande()
+    nos = fold_ast(dados, max_nodes=10, max_counted=1000)
+    assert sum(no.hidden for no in nos) == 1000
+    assert any('+ nós: ' in no.label[-1] for no in nos)
+    assert cobertos(fold_ast(dados, max_nodes=10, max_counted=10 ** 6)) == contar_nos(dados)
+
+
+def test_svg_valido(tmp_path):
+    dados = programa_grande()
+    saida = io.StringIO()
+    nos = fold_ast(dados, max_nodes=100)
+    write_svg(nos, saida)
+    svg = xml.dom.minidom.parseString(saida.getvalue())
+    assert len(svg.getElementsByTagName('rect')) == len(nos)
+    assert len(svg.getElementsByTagName('line')) == len(nos) - 1
+    # Filhos ficam abaixo do pai e irmãos não se sobrepõem
+    for no in nos:
+        for esquerdo, direito in zip(no.children, no.children[1:]):
+            assert esquerdo.x + esquerdo.span / 2 <= direito.x - direito.span / 2
+        assert all(filho.y > no.y for filho in no.children)
+
+    json_file = tmp_path / 'ast.json'
+    json_file.write_text(json.dumps(dados), encoding='utf-8')
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_svg_visualization(str(json_file), str(tmp_path / 'ast.svg'), max_nodes=30)
+    assert (tmp_path / 'ast.svg').read_text(encoding='utf-8').startswith('<svg')
+
+
+@pytest.mark.skipif(ast_to_png.Digraph is not None, reason='graphviz instalado')
+def test_png_sem_graphviz_gera_svg(tmp_path):
+    json_file = tmp_path / 'ast.json'
+    json_file.write_text(json.dumps(programa_grande(5)), encoding='utf-8')
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast_to_png.create_ast_visualization(str(json_file), str(tmp_path / 'ast.png'))
+    assert (tmp_path / 'ast.svg').exists()
@@ -0,0 +1,60 @@
+"""
+Testes dos blocos básicos e do grafo de fluxo de controle do TAC.
+"""
+
+import pytest
+
+from cfg import build_cfg, CFGError
+from lexer import Lexer
+from parser import Parser
+from tac_generator import TACGenerator, TACInstruction
+
+
+def tac(*linhas):
+    return [TACInstruction(*linha.split()) for linha in linhas]
+
+
+def test_cfg_do_exemplo_com_funcoes():
+    with open('exemplo3.pas', encoding='utf-8') as f:
+        parser = Parser(list(Lexer(f.read()).tokenize()))
+    codigo = TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+    cfg = build_cfg(codigo)
+
+    assert cfg.entries == {'FUNC_soma': 0, 'FUNC_fatorial': 1, 'MAIN': 5}
+    assert cfg.functions == [('FUNC_soma', 0, 1), ('FUNC_fatorial', 1, 5), ('MAIN', 5, 6)]
+    # fatorial: entrada -> teste do while -> (corpo -> teste | saída)
+    assert cfg.succs == [(), (2,), (3, 4), (2,), (), ()]
+    assert cfg.preds[2] == [1, 3]
+    assert cfg.reverse_postorder(1)[:2] == [1, 2]
+    # Os CALLs ficam dentro do bloco do MAIN e apontam para as entradas
+    assert [cfg.block_of(i) for i, _ in cfg.calls] == [5, 5]
+    assert [callee for _, callee in cfg.calls] == [0, 1]
+    assert cfg.function_of(3) == 'FUNC_fatorial'
+    assert all(cfg.reachable())
+    # A lista de TACInstruction dá o mesmo CFG
+    assert build_cfg(list(codigo)).succs == cfg.succs
+
+
+def test_rotulos_consecutivos_e_bloco_inalcancavel():
+    cfg = build_cfg(tac(
+        'LABEL MAIN',
+        'LABEL L1',
+        'LABEL L2',
+        'JZ L3 x',
+        'JMP L1',
+        'ATR y 1',      # depois de JMP e sem rótulo: inalcançável
+        'LABEL L3',
+        'WRITE y',
+        'CALL foo 0',   # não encerra o bloco
+        'HALT',
+    ))
+    assert list(cfg.starts) == [0, 4, 5, 6, 10]
+    assert cfg.succs == [(1, 3), (0,), (3,), ()]
+    assert cfg.calls == [(8, None)]
+    assert list(cfg.reachable()) == [1, 1, 0, 1]
+    assert len(cfg) == 4 and cfg.edge_count() == 4
+
+
+def test_salto_para_rotulo_inexistente():
+    with pytest.raises(CFGError, match="'L9'"):
+        build_cfg(tac('LABEL MAIN', 'JMP L9', 'HALT'))
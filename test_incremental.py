@@ -0,0 +1,139 @@
+"""
+Testes da análise incremental (IncrementalSession): após cada edição, tokens,
+AST e erros semânticos devem ser iguais aos de uma compilação completa.
+"""
+
+from lexer import Lexer
+from parser import Parser
+from incremental import IncrementalSession
+
+
+def compilar(codigo: str):
+    tokens = list(Lexer(codigo).tokenize())
+    parser = Parser(tokens, enable_semantic=True)
+    return tokens, parser.parse_program(), parser.semantic_errors
+
+
+def verificar(sessao: IncrementalSession):
+    tokens, ast, erros = compilar(sessao.source)
+    assert sessao.tokens == tokens
+    assert sessao.ast == ast
+    assert sessao.errors == erros
+
+
+def editar(sessao: IncrementalSession, antigo: str, novo: str, ocorrencia: int = 0) -> str:
+    """Substitui a n-ésima ocorrência de `antigo` por `novo` e verifica o resultado."""
+    inicio = -1
+    for _ in range(ocorrencia + 1):
+        inicio = sessao.source.index(antigo, inicio + 1)
+    tipo = sessao.edit(inicio, inicio + len(antigo), novo)
+    verificar(sessao)
+    return tipo
+
+
+def test_edicoes_em_exemplo3():
+    with open('exemplo3.pas', 'r', encoding='utf-8') as f:
+        sessao = IncrementalSession(f.read())
+    verificar(sessao)
+
+    # Comando dentro do laço de 'fatorial': só o bloco do while é refeito
+    assert editar(sessao, 'fat := fat * i;', 'fat := fat * i + 1;') == 'Compound'
+    # Variável não declarada: o erro aparece sem reanalisar o programa todo
+    assert editar(sessao, 'i := i + 1;', 'i := j + 1;') == 'Compound'
+    assert editar(sessao, 'i := j + 1;', 'i := i + 1;') == 'Compound'
+    # Nova linha: desloca as linhas dos tokens seguintes
+    assert editar(sessao, 'soma := a + b;', 'soma := a + b;\n  soma := soma * 2;') == 'Compound'
+    # Só espaços ou comentário: nada a reanalisar
+    assert editar(sessao, 'x := 5;', 'x  :=  5; {# cinco #}') == 'nada'
+    # Declaração local: a função inteira é refeita
+    assert editar(sessao, '  i, fat : integer;', '  i, fat, k : integer;') == 'FunctionDecl'
+    # Cabeçalho de função e seção var global exigem análise completa
+    assert editar(sessao, 'function soma(a: integer; b: integer)', 'function soma(a: integer; b: real)') == 'completo'
+    assert editar(sessao, 'resultado, x, y : integer;', 'resultado, x, y, z : integer;') == 'completo'
+
+
+def test_edicao_invalida_recupera_na_proxima():
+    with open('exemplo2.pas', 'r', encoding='utf-8') as f:
+        sessao = IncrementalSession(f.read())
+    inicio = sessao.source.index('soma := soma + 1;')
+    try:
+        sessao.edit(inicio, inicio + len('soma := soma + 1;'), 'soma := ;')
+    except Exception:
+        pass
+    assert sessao.ast is None
+    sessao.edit(inicio, inicio + len('soma := ;'), 'soma := soma + 2;')
+    verificar(sessao)
+
+
+def test_blocos_aninhados_em_varias_funcoes():
+    from benchmarks import gerar_programa
+    sessao = IncrementalSession(gerar_programa(n_funcoes=20, comandos=8))
+    for n in (0, 7, 19):
+        assert editar(sessao, 'acc := acc + i * 3', 'acc := acc + i * 33', n) == 'Compound'
+    assert editar(sessao, 'if acc > 30 then acc := acc - 3', 'if acc > 30 then begin acc := acc - 3 end', 5) == 'Compound'
+    assert editar(sessao, 'total := total + f3(x, y);', 'total := total + f3(x, media);') == 'Compound'
+
+
+def test_varias_edicoes_antes_de_ler_os_tokens():
+    """Os deslocamentos pendentes se acumulam entre edições em pontos distantes."""
+    from benchmarks import gerar_programa
+    sessao = IncrementalSession(gerar_programa(n_funcoes=20, comandos=8))
+    edicoes = [
+        ('acc := acc + i * 3', 'acc := acc + i * 3;\n    acc := acc - 1', 12, 'Compound'),  # +linha
+        ('acc := acc + i * 3', 'acc := acc + (i)', 2, 'Compound'),    # antes da anterior
+        ('acc := acc + i * 3', 'acc := acc + i * 3 + k', 17, 'Compound'),
+        ('  i, acc : integer;', '  i, acc, z : integer;', 5, 'FunctionDecl'),
+        ('if acc > 30 then acc := acc - 3', 'if acc > 30 then begin\n acc := 0 end', 0, 'Compound'),
+        ('acc := acc + (i)', 'acc := acc + i * 3', 0, 'Compound'),
+    ]
+    for antigo, novo, ocorrencia, tipo in edicoes:
+        inicio = -1
+        for _ in range(ocorrencia + 1):
+            inicio = sessao.source.index(antigo, inicio + 1)
+        assert sessao.edit(inicio, inicio + len(antigo), novo) == tipo
+    assert any("'k'" in erro for erro in sessao.errors)
+    verificar(sessao)
+    tokens, _, _ = compilar(sessao.source)
+    assert sessao.offsets == [tok_offset(sessao.source, tok) for tok in tokens]
+    # Intervalos iguais aos de uma análise completa, com o nó no seu slot
+    parser = Parser(tokens, enable_semantic=True, record_spans=True)
+    parser.parse_program()
+    assert ([(s.start, s.end, s.err_start, s.err_end) for s in sessao.spans] ==
+            [(s.start, s.end, s.err_start, s.err_end) for s in parser.node_spans])
+    for span in sessao.spans:
+        container, chave = span.slot
+        assert (container[chave] if isinstance(chave, int) else getattr(container, chave)) is span.node
+        assert span.parent is None or span.parent.start < span.start <= span.end <= span.parent.end
+
+
+def test_custo_da_edicao_nao_depende_do_arquivo():
+    """Tokens reconhecidos e posições reescritas por edição são os mesmos num arquivo 16x maior."""
+    from benchmarks import gerar_programa
+    custos = []
+    for n_funcoes in (50, 800):
+        sessao = IncrementalSession(gerar_programa(n_funcoes=n_funcoes, comandos=25))
+        # Duas edições alternadas em funções vizinhas no meio do arquivo: os
+        # cortes andam só entre elas
+        meio = sessao.source.index('acc := acc + i * 7', len(sessao.source) // 2)
+        vizinha = sessao.source.index('acc := acc + i * 7', sessao.source.index('function', meio))
+        custo = []
+        # Literal '7' -> '71' nas duas e de volta: a segunda edição de cada
+        # par encontra o deslocamento pendente da primeira
+        for inicio, fim, novo in ((meio + 17, meio + 18, '71'), (vizinha + 18, vizinha + 19, '71'),
+                                  (meio + 17, meio + 19, '7'), (vizinha + 17, vizinha + 19, '7')):
+            sessao.edit(inicio, fim, novo)
+            custo.append((sessao.last_reparse, sessao.last_relexed, sessao.last_shifted))
+        custos.append(custo)
+        verificar(sessao)
+    assert custos[0] == custos[1]
+    assert any(shifted for _, _, shifted in custos[0])
+    assert all(reparse == 'Compound' and relexed < 20 and shifted < 1000
+               for reparse, relexed, shifted in custos[0]), custos[0]
+
+
+def tok_offset(codigo: str, tok) -> int:
+    """Offset do token a partir da linha e da coluna"""
+    inicio_linha = 0
+    for _ in range(tok.line - 1):
+        inicio_linha = codigo.index('\n', inicio_linha) + 1
+    return inicio_linha + tok.column - 1
@@ -0,0 +1,204 @@
+"""
+Testes do analisador léxico: modo streaming (from_file/from_stream),
+TokenBuffer, scanner DFA e análise em paralelo.
+"""
+
+import io
+
+from lexer import Lexer, LexerError, split_source
+from parser import Parser, ParserError
+from dfa_scanner import DFALexer, build_dfa
+from exemplos import EXEMPLOS
+
+
+def ler(caminho: str) -> str:
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def tokens_em_memoria(codigo: str):
+    return list(Lexer(codigo).tokenize())
+
+
+def test_stream_igual_em_memoria():
+    """O modo streaming gera exatamente os mesmos tokens, para vários tamanhos de bloco."""
+    for exemplo in EXEMPLOS:
+        codigo = ler(exemplo)
+        esperado = tokens_em_memoria(codigo)
+        for chunk_size in (1, 2, 3, 7, 64, 4096):
+            lexer = Lexer.from_stream(io.StringIO(codigo), chunk_size=chunk_size)
+            assert list(lexer.tokenize()) == esperado, (exemplo, chunk_size)
+
+
+def test_from_file():
+    esperado = tokens_em_memoria(ler('exemplo3.pas'))
+    assert list(Lexer.from_file('exemplo3.pas', chunk_size=5).tokenize()) == esperado
+
+
+def test_comentarios_e_strings_na_borda_dos_blocos():
+    codigo = (
+        '{# comentario\n que atravessa\n linhas #}\n'
+        'program p; var x : real;\n'
+        'begin x := 12.5; write("texto {# nao e comentario #}"); x := x <= 3.25 end.\n'
+    )
+    esperado = tokens_em_memoria(codigo)
+    for chunk_size in range(1, 20):
+        lexer = Lexer.from_stream(io.StringIO(codigo), chunk_size=chunk_size)
+        assert list(lexer.tokenize()) == esperado, chunk_size
+
+
+def test_erro_lexico_no_stream():
+    codigo = 'program p;\nbegin x := 1 @ end.'
+    for chunk_size in (1, 4, 100):
+        lexer = Lexer.from_stream(io.StringIO(codigo), chunk_size=chunk_size)
+        try:
+            list(lexer.tokenize())
+        except LexerError as e:
+            assert 'linha 2, coluna 14' in str(e)
+        else:
+            raise AssertionError('LexerError não foi lançado')
+
+
+def test_string_multilinha_no_stream():
+    """Uma string com '\\n', '\\"' e '{#' cortada em qualquer ponto gera os mesmos tokens."""
+    corpo = 'linha com \\" e {# sem comentario #}\n' * 200
+    codigo = f'program p; var s : string;\nbegin\n  s := "{corpo}fim"; write(s)\nend.\n'
+    esperado = tokens_em_memoria(codigo)
+    assert esperado[11].lexeme == f'"{corpo}fim"'
+    for chunk_size in (1, 2, 3, 7, 64, 4096):
+        for classe in (Lexer, DFALexer):
+            lexer = classe.from_stream(io.StringIO(codigo), chunk_size=chunk_size)
+            assert list(lexer.tokenize()) == esperado, (classe, chunk_size)
+    # Sem fechamento: o mesmo erro do modo em memória, no '"' de abertura
+    codigo = codigo.replace('fim"', 'fim')
+    for chunk_size in (1, 7, 64):
+        lexer = Lexer.from_stream(io.StringIO(codigo), chunk_size=chunk_size)
+        try:
+            list(lexer.tokenize())
+        except LexerError as e:
+            assert str(e) == 'Caractere inesperado \'"\' na linha 3, coluna 8'
+        else:
+            raise AssertionError('LexerError não foi lançado')
+
+
+def test_comentario_longo_no_stream():
+    comentario = '{#' + 'linha de comentario # } {\n' * 5000 + '#}'
+    codigo = f'program p;\n{comentario} begin write("a\\"b") end.\n'
+    esperado = tokens_em_memoria(codigo)
+    assert esperado[3].line == 5002
+    for chunk_size in (1, 7, 64):
+        for classe in (Lexer, DFALexer):
+            lexer = classe.from_stream(io.StringIO(codigo), chunk_size=chunk_size)
+            assert list(lexer.tokenize()) == esperado, (classe, chunk_size)
+    # Comentário sem fechamento: o erro aponta o '{' de abertura
+    lexer = Lexer.from_stream(io.StringIO(codigo.replace('#} begin', ' begin')), chunk_size=64)
+    try:
+        list(lexer.tokenize())
+    except LexerError as e:
+        assert 'linha 2, coluna 1' in str(e)
+    else:
+        raise AssertionError('LexerError não foi lançado')
+
+
+def test_token_buffer_igual_a_lista():
+    """O TokenBuffer materializa os mesmos tokens (tipo, lexema, linha e coluna)."""
+    for exemplo in EXEMPLOS:
+        codigo = ler(exemplo)
+        buffer = Lexer(codigo).tokenize_buffer()
+        assert list(buffer) == tokens_em_memoria(codigo), exemplo
+
+
+def test_parser_sobre_token_buffer():
+    for exemplo in EXEMPLOS:
+        codigo = ler(exemplo)
+        esperado = Parser(tokens_em_memoria(codigo)).parse()
+        buffer = Lexer(codigo).tokenize_buffer()
+        assert Parser(buffer).parse() == esperado, exemplo
+        # O parser lê as colunas do buffer: nenhum Token é materializado
+        assert buffer._cache_index == [-1, -1]
+    # Mensagens de erro com o lexema lido do buffer
+    for tokens in (tokens_em_memoria('program p; begin x := ; end.'),
+                   Lexer('program p; begin x := ; end.').tokenize_buffer()):
+        try:
+            Parser(tokens).parse()
+        except ParserError as e:
+            assert str(e) == 'Fator inesperado: ;'
+        else:
+            raise AssertionError('ParserError não foi lançado')
+
+
+def test_token_buffer_erro_lexico():
+    try:
+        Lexer('program p;\n{# a\nb #} x @').tokenize_buffer()
+    except LexerError as e:
+        assert 'linha 3, coluna 8' in str(e)
+    else:
+        raise AssertionError('LexerError não foi lançado')
+
+
+def test_dfa_igual_ao_regex():
+    """O scanner por tabela gera os mesmos tokens que o lexer de referência."""
+    codigos = [ler(exemplo) for exemplo in EXEMPLOS]
+    codigos.append('x := 12. ; y:=1.5; Begin BEGINX endif "a\\"b" {# a\n#} <> <= >= := : .')
+    for codigo in codigos:
+        assert list(DFALexer(codigo).tokenize()) == tokens_em_memoria(codigo)
+        for chunk_size in (1, 5):
+            lexer = DFALexer.from_stream(io.StringIO(codigo), chunk_size=chunk_size)
+            assert list(lexer.tokenize()) == tokens_em_memoria(codigo)
+
+
+def test_dfa_erros_iguais_ao_regex():
+    for codigo in ('x := "sem fim', 'x := {# sem fim', 'x @ y', 'x\n  y ! z'):
+        mensagens = []
+        for lexer in (Lexer(codigo), DFALexer(codigo)):
+            try:
+                list(lexer.tokenize())
+            except LexerError as e:
+                mensagens.append(str(e))
+        assert len(mensagens) == 2 and mensagens[0] == mensagens[1], codigo
+
+
+def test_dfa_regenerado_igual_ao_cache():
+    from dfa_scanner import DFA
+    assert build_dfa() == DFA
+
+
+CODIGO_MULTILINHA = (
+    '{# comentario\n com\n varias linhas #}\n'
+    'program p; var s : string;\n'
+    'begin\n'
+    '  s := "string com\n quebra de linha";\n'
+    '  {# outro\n comentario #} s := "x"; write(s)\n'
+    'end.\n'
+)
+
+
+def test_split_source_fora_de_comentarios_e_strings():
+    for n_chunks in range(1, 12):
+        chunks = split_source(CODIGO_MULTILINHA, n_chunks)
+        assert ''.join(chunks) == CODIGO_MULTILINHA
+        for chunk in chunks[:-1]:
+            assert chunk.endswith('\n')
+            # Cada bloco é analisável isoladamente: nenhum corte dentro de comentário/string
+            list(Lexer(chunk).tokenize())
+
+
+def test_paralelo_igual_ao_serial():
+    codigos = [ler(exemplo) for exemplo in EXEMPLOS] + [CODIGO_MULTILINHA * 20]
+    for codigo in codigos:
+        paralelo = list(Lexer(codigo).tokenize_parallel(workers=3, min_chunk_size=16))
+        assert paralelo == tokens_em_memoria(codigo)
+
+
+def test_paralelo_erro_lexico_igual_ao_serial():
+    codigo = CODIGO_MULTILINHA * 5 + 'x := 1 @ 2;\n' + CODIGO_MULTILINHA
+    serial, paralelo = [], []
+    for destino, tokens in ((serial, Lexer(codigo).tokenize()),
+                            (paralelo, Lexer(codigo).tokenize_parallel(workers=4, min_chunk_size=16))):
+        try:
+            for tok in tokens:
+                destino.append(tok)
+        except LexerError as e:
+            destino.append(str(e))
+    assert paralelo == serial
+    assert 'Caractere inesperado' in serial[-1]
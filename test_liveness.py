@@ -0,0 +1,75 @@
+"""
+Testes da análise de vivacidade em vetores de bits e da eliminação de
+atribuições mortas.
+"""
+
+from cfg import build_cfg
+from lexer import Lexer
+from liveness import Liveness
+from optimizer import optimize_tac
+from parser import Parser
+from tac_generator import TACGenerator, TACInstruction
+from tac_packed import PackedTAC
+
+
+def gerar(arquivo):
+    with open(arquivo, encoding='utf-8') as f:
+        parser = Parser(list(Lexer(f.read()).tokenize()))
+    return TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+
+
+def tac(*linhas):
+    return PackedTAC.from_instructions(TACInstruction(*linha.split()) for linha in linhas)
+
+
+def mortas(codigo):
+    return [str(codigo.instruction(i)).split() for i in Liveness(build_cfg(codigo)).dead_stores()]
+
+
+def test_vivas_no_laco():
+    liveness = Liveness(build_cfg(gerar('exemplo2.pas')))
+    # Teste do while: i, n e soma são lidas na volta do laço
+    assert liveness.names(liveness.live_in[1]) == ['i', 'n', 'soma']
+    assert liveness.names(liveness.live_out[0]) == ['i', 'n', 'soma']
+    # Depois do laço só soma é escrita
+    assert liveness.names(liveness.live_in[len(liveness.cfg) - 1]) == ['soma']
+    assert liveness.sweeps <= 3
+    assert liveness.dead_stores() == []
+
+
+def test_atribuicoes_mortas_do_exemplo():
+    codigo = gerar('exemplo_otimizacao.pas')
+    # Nada é escrito com WRITE: z, w e resultado nunca são lidas
+    assert mortas(codigo) == [['ATR', 'z', 'T1'], ['ATR', 'w', '100'], ['ATR', 'resultado', 'T4']]
+    otimizado = optimize_tac(list(codigo), verbose=False)
+    assert [ins.op for ins in otimizado] == ['LABEL', 'HALT']
+    # Só com as atribuições mortas sobre o código original: as de w somem
+    otimizado = optimize_tac(codigo, ['dead_stores'], verbose=False)
+    assert 'w' not in [ins.addr1 for ins in otimizado]
+
+
+def test_sobrescrita_e_chamadas():
+    codigo = tac(
+        'LABEL FUNC_f',
+        'WRITE g',          # f lê g: a atribuição antes da chamada fica
+        'ATR h 5',          # lida depois da chamada
+        'ATR k 7',          # ninguém lê
+        'RETURN h',
+        'LABEL MAIN',
+        'ATR x 1',          # sobrescrita antes de ser lida
+        'ATR x 2',
+        'WRITE x',
+        'ATR g 1',
+        'CALL FUNC_f 0',
+        'ATR T1 RETVAL',
+        'WRITE T1',
+        'WRITE h',
+        'ATR g 2',          # depois da última leitura
+        'HALT',
+    )
+    liveness = Liveness(build_cfg(codigo))
+    assert mortas(codigo) == [['ATR', 'k', '7'], ['ATR', 'x', '1'], ['ATR', 'g', '2']]
+    # Depois da chamada são lidas RETVAL e h; RETVAL é definida pelo
+    # RETURN, então dentro de f só g está viva na entrada
+    assert liveness.names(liveness.exit_live[0]) == ['RETVAL', 'h']
+    assert liveness.names(liveness.live_in[0]) == ['g']
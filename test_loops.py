@@ -0,0 +1,91 @@
+"""
+Testes dos laços naturais e da movimentação de código invariante (LICM).
+"""
+
+from cfg import build_cfg
+from lexer import Lexer
+from loops import find_loops, hoist_invariants
+from optimizer import optimize_tac
+from parser import Parser
+from tac_generator import TACGenerator
+from test_ssa import executar, tac
+
+NUCLEO = '''
+program nucleo;
+var i, j, n, a, b, s : integer;
+begin
+  n := 4; a := 3; b := 5; s := 0; i := 0;
+  while i < n do
+  begin
+    j := 0;
+    while j < n do
+    begin
+      s := s + a * b + i * 2;
+      j := j + 1;
+    end;
+    i := i + 1;
+  end;
+  write(s);
+end.
+'''
+
+
+def compilar(fonte):
+    parser = Parser(list(Lexer(fonte).tokenize()))
+    return TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+
+
+def texto(codigo):
+    return [' '.join(str(ins).split()) for ins in codigo]
+
+
+def test_lacos_naturais():
+    cfg = build_cfg(compilar(NUCLEO))
+    interno, externo = find_loops(cfg)
+    assert interno.body < externo.body
+    assert externo.header == 1 and interno.header == 3
+    assert interno.latches == [4] and externo.latches == [5]
+    # fatorial: teste do while e corpo
+    with open('exemplo3.pas', encoding='utf-8') as f:
+        cfg = build_cfg(compilar(f.read()))
+    [laco] = find_loops(cfg)
+    assert (laco.header, laco.body) == (2, {2, 3})
+
+
+def test_invariantes_saem_dos_lacos_aninhados():
+    codigo = compilar(NUCLEO)
+    otimizado, movidas = hoist_invariants(codigo)
+    linhas = texto(otimizado)
+    # a * b sai dos dois laços; i * 2 só do interno (i muda no externo)
+    assert linhas.index('MUL T3 a b') < linhas.index('LABEL L1')
+    assert linhas.index('LABEL L1') < linhas.index('MUL T5 i 2') < linhas.index('LABEL L3')
+    texts = codigo.operands.texts
+    assert [(texts[label], texts[a1]) for label, _, a1, _, _ in movidas] == [('L3', 'T3'), ('L3', 'T5'), ('L1', 'T3')]
+    # Os JMP para o rótulo seguinte (fim do pré-cabeçalho) somem
+    assert len(otimizado) == len(codigo) + 2
+    assert executar(otimizado) == executar(codigo) == [4 * 4 * 15 + 4 * 2 * (0 + 1 + 2 + 3)]
+    # Nada mais a mover: o passe devolve o mesmo código
+    assert hoist_invariants(otimizado) == (otimizado, [])
+
+
+def test_entrada_da_funcao_chamadas_e_divisao():
+    codigo = tac(
+        'LABEL MAIN', 'ATR n 3', 'ATR k 1', 'ATR s 0',
+        'CALL FUNC_g 0', 'WRITE s', 'WRITE RETVAL', 'HALT',
+        'LABEL FUNC_g',
+        'LABEL L1',                     # cabeçalho na entrada da função
+        'JLT T1 k n', 'JZ L2 T1',
+        'DIV T2 n 2', 'DIV T3 n k',     # só a divisão por constante sai
+        'ADD T4 T2 T3', 'ADD s s T4',
+        'CALL FUNC_h 0', 'ADD T5 m 1',  # h altera m: fica no laço
+        'ADD k k 1', 'JMP L1',
+        'LABEL L2', 'RETURN T5',
+        'LABEL FUNC_h', 'ATR m 7', 'RETURN m',
+    )
+    esperado = executar(codigo)
+    otimizado = optimize_tac(codigo, ['licm'], verbose=False)
+    linhas = texto(otimizado)
+    assert linhas[linhas.index('LABEL FUNC_g') + 1:linhas.index('LABEL L1')] == ['LABEL LP1', 'DIV T2 n 2']
+    assert linhas.index('DIV T3 n k') > linhas.index('LABEL L1')
+    assert linhas.index('ADD T5 m 1') > linhas.index('LABEL L1')
+    assert executar(otimizado) == esperado
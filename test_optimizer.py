@@ -2,11 +2,21 @@
 Script de teste para demonstrar as otimizações do código intermediário
 """
 
+import pytest
+
+from exemplos import EXEMPLOS
 from lexer import Lexer
 from parser import Parser
 from tac_generator import TACGenerator
 from optimizer import optimize_tac, TACOptimizer
 
+
+@pytest.fixture(params=EXEMPLOS)
+def arquivo_pas(request):
+    """Arquivos de exemplo usados por testar_otimizacao quando executado pelo pytest."""
+    return request.param
+
+
 def testar_otimizacao(arquivo_pas: str):
     """Testa otimizações em um arquivo Pascal"""
     print("\n" + "="*80)
@@ -0,0 +1,263 @@
+"""
+Testes do analisador sintático e semântico.
+"""
+
+from ast_nodes import Assign, Num, Var
+from lexer import Lexer
+from parser import Parser, StreamingParser, INTEGER, REAL, BOOLEAN, STRING
+from tac_generator import TACGenerator
+from exemplos import EXEMPLOS
+
+
+def ler(caminho: str) -> str:
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def analisar(codigo: str):
+    parser = Parser(list(Lexer(codigo).tokenize()))
+    return parser.parse_program(), parser.semantic_errors
+
+
+def test_streaming_parser_igual_ao_parser():
+    from benchmarks import gerar_programa
+    codigos = [ler(exemplo) for exemplo in EXEMPLOS] + [gerar_programa(n_funcoes=10, comandos=6)]
+    for codigo in codigos:
+        ast, erros = analisar(codigo)
+        parser = StreamingParser(Lexer(codigo).tokenize())
+        assert parser.parse_program() == ast
+        assert parser.semantic_errors == erros
+
+
+def test_streaming_parser_sobre_arquivo():
+    ast, _ = analisar(ler('exemplo3.pas'))
+    lexer = Lexer.from_file('exemplo3.pas', chunk_size=16)
+    assert StreamingParser(lexer.tokenize()).parse() == ast
+
+
+def test_streaming_parser_erros():
+    for codigo in ('program p; begin x := end.', 'program p; begin'):
+        mensagens = []
+        for parser in (Parser(list(Lexer(codigo).tokenize())), StreamingParser(Lexer(codigo).tokenize())):
+            try:
+                parser.parse()
+            except Exception as e:
+                mensagens.append((type(e), str(e)))
+        assert len(mensagens) == 2 and mensagens[0] == mensagens[1], codigo
+
+
+def test_erros_semanticos_nao_duplicados():
+    codigo = '''program p;
+var x : integer;
+function f(a: integer) : integer;
+begin
+  f := a;
+end;
+begin
+  x := f(f(f(y)));
+  if f(z) > 1 then x := 1;
+  while f(x) < "a" do x := x + 1;
+end.'''
+    _, erros = analisar(codigo)
+    assert erros == [
+        "Erro: Variável 'y' não foi declarada",
+        "Erro: Variável 'z' não foi declarada",
+        "Erro: Operador '<' requer operandos do mesmo tipo, mas recebeu 'integer' e 'string'",
+    ]
+
+
+def test_tipos_das_expressoes_ficam_na_tabela():
+    parser = Parser(list(Lexer(ler('exemplo3.pas')).tokenize()))
+    ast = parser.parse()
+    atribuicoes = [cmd for cmd in ast.block.statements if isinstance(cmd, Assign)]
+    assert atribuicoes
+    for cmd in atribuicoes:
+        assert parser.type_of(cmd.value) in (INTEGER, REAL, BOOLEAN, STRING)
+
+
+def test_identificadores_ligados_aos_simbolos():
+    codigo = '''program p;
+var Total, x : integer;
+function Dobro(a: integer) : integer;
+var x : real;
+begin
+  x := a;
+  DOBRO := a * 2;
+end;
+begin
+  total := dobro(X);
+end.'''
+    parser = Parser(list(Lexer(codigo).tokenize()))
+    ast = parser.parse()
+    funcao, corpo = ast.decls[1], ast.block.statements[0]
+
+    x_local = parser.symbol_of(funcao.body.statements[0])
+    assert (x_local.name, x_local.symbol_type, x_local.scope_level) == ('x', REAL, 1)
+    assert parser.symbol_of(funcao.body.statements[1]).kind == 'function'
+    assert parser.symbol_of(corpo).name == 'Total'
+    assert parser.symbol_of(corpo.value).name == 'Dobro'
+    x_global = parser.symbol_of(corpo.value.args[0])
+    assert (x_global.symbol_type, x_global.scope_level) == (INTEGER, 0)
+    # Saindo da função, a declaração local deixa de ser visível
+    assert parser.symbol_table.lookup('x') is x_global
+
+    tac = [str(i).split() for i in TACGenerator(parser.bindings).generate(ast)]
+    assert ['ATR', 'Dobro', 'T1'] in tac
+    assert ['CALL', 'FUNC_Dobro', '1'] in tac
+    assert ['ATR', 'Total', 'T2'] in tac
+
+
+def test_aliases_resolvidos_na_declaracao():
+    codigo = '''program p;
+type
+  inteiro = integer;
+  contador = inteiro;
+  flag = boolean;
+var
+  c : contador;
+  r : real;
+  f : flag;
+begin
+  c := c * 2 + 1;
+  r := c / 3;
+  if f AND (c > 0) then c := 0;
+  c := "texto";
+end.'''
+    parser = Parser(list(Lexer(codigo).tokenize()))
+    ast = parser.parse_program()
+    contador = parser.symbol_table.lookup_type('contador')
+    assert (contador.name, contador.base) == ('contador', INTEGER)
+    assert parser.symbol_table.resolve_type('contador') == 'integer'
+    assert parser.type_of(ast.block.statements[0].value) is INTEGER
+    # O operador é normalizado na construção do BinOp
+    assert ast.block.statements[2].condition.op == 'and'
+    assert parser.semantic_errors == [
+        "Erro: Atribuição incompatível. 'c' é do tipo 'contador', mas expressão é do tipo 'string'"
+    ]
+
+
+EXPRESSOES = [
+    'a + b * c - d / e',
+    'a * (b + c) * d',
+    'not a and b or not not c',
+    'not a * b < c + d and e >= f',
+    'a < b < c',
+    'a = (b <> c)',
+    'f(a, g(b + 1, h()), (c)) * 2.5 - "s"',
+    '((((a))))',
+    'a + ',
+    '(a + b',
+    'f(a, )',
+    'a or b and c = d - - e',
+    'a AND b Or not c',
+]
+
+
+def analisar_expressao(texto: str, recursiva: bool):
+    parser = Parser(list(Lexer(texto).tokenize()), enable_semantic=False,
+                    recursive_expressions=recursiva)
+    try:
+        return parser.parse_expression(), parser.pos
+    except Exception as e:
+        return type(e), str(e)
+
+
+def test_expressoes_iterativas_iguais_as_recursivas():
+    for texto in EXPRESSOES:
+        assert analisar_expressao(texto, False) == analisar_expressao(texto, True), texto
+
+    from benchmarks import gerar_programa
+    codigos = [ler(exemplo) for exemplo in EXEMPLOS] + [gerar_programa(n_funcoes=10, comandos=6)]
+    for codigo in codigos:
+        tokens = list(Lexer(codigo).tokenize())
+        recursivo = Parser(tokens, recursive_expressions=True)
+        iterativo = Parser(tokens)
+        assert iterativo.parse_program() == recursivo.parse_program()
+        assert iterativo.semantic_errors == recursivo.semantic_errors
+
+
+def test_expressoes_profundas_sem_recursion_error():
+    n = 5000
+    codigo = f'''program p;
+var x : integer; b : boolean;
+function f(a: integer) : integer;
+begin
+  f := a;
+end;
+begin
+  x := {'(' * n}1{' + 1)' * n};
+  x := {'f(' * n}x{')' * n};
+  b := {'not ' * n}(x > 0);
+  x := x{' - x' * n};
+end.'''
+    parser = Parser(list(Lexer(codigo).tokenize()))
+    ast = parser.parse()
+    parenteses, chamadas, negacoes, cadeia = [cmd.value for cmd in ast.block.statements]
+
+    def profundidade(node, filho):
+        total = 0
+        while not isinstance(node, (Num, Var)):
+            node, total = filho(node), total + 1
+        return total
+
+    assert profundidade(parenteses, lambda node: node.left) == n
+    assert profundidade(chamadas, lambda node: node.args[0]) == n
+    assert profundidade(negacoes, lambda node: node.left) == n + 1  # n 'not' e o '>'
+    assert profundidade(cadeia, lambda node: node.left) == n
+    assert parser.type_of(cadeia) is INTEGER
+
+
+def test_hash_consing_compartilha_subexpressoes():
+    codigo = '''program p;
+var a, b, x, y : integer;
+function f(a: integer) : integer;
+begin
+  f := a + b;
+end;
+begin
+  x := a + b;
+  y := (a + b) * 2 + f(a) * 2;
+  x := f(a) * 2;
+  y := a + b
+end.'''
+    tokens = list(Lexer(codigo).tokenize())
+    consed = Parser(tokens, hash_cons=True)
+    ast = consed.parse_program()
+    arvore = Parser(tokens)
+    # Mesma árvore (o DAG expandido), mesmos erros
+    assert ast == arvore.parse_program() and consed.semantic_errors == arvore.semantic_errors == []
+
+    x1, y1, x2, y2 = [cmd.value for cmd in ast.block.statements]
+    assert x1 is y2 is y1.left.left
+    assert y1.left.right is y1.right.right  # Num(2)
+    assert y1.right is not x2  # contém chamada: não é compartilhado
+    # Outro escopo: 'a' da função é o parâmetro, não o global
+    corpo_f = ast.decls[1].body.statements[0].value
+    assert corpo_f == x1 and corpo_f is not x1
+    assert consed.symbol_of(corpo_f.left).kind == 'param'
+    assert consed.symbol_of(x1.left).kind == 'var'
+
+
+def test_tac_reaproveita_expressoes_compartilhadas():
+    codigo = '''program p;
+var a, b, x, y : integer;
+begin
+  x := a + b;
+  y := (a + b) * 2;
+  a := 1;
+  y := a + b;
+  while x < a + b do
+    x := a + b;
+  read(b);
+  y := a + b
+end.'''
+    parser = Parser(list(Lexer(codigo).tokenize()), hash_cons=True)
+    ast = parser.parse()
+    gerar = lambda **opcoes: [str(i).split() for i in TACGenerator(parser.bindings, **opcoes).generate(ast)]
+    assert sum(i[0] == 'ADD' for i in gerar()) == 6
+    tac = gerar(reuse_shared=True)
+    # x+y antes de 'a := 1', depois dela, no início do laço (após LABEL) e depois do read(b)
+    assert [i for i in tac if i[0] == 'ADD'] == [
+        ['ADD', 'T1', 'a', 'b'], ['ADD', 'T3', 'a', 'b'], ['ADD', 'T4', 'a', 'b'], ['ADD', 'T6', 'a', 'b']
+    ]
+    assert ['MUL', 'T2', 'T1', '2'] in tac and ['ATR', 'x', 'T4'] in tac
@@ -0,0 +1,141 @@
+"""
+Testes do cache em disco dos artefatos da compilação (pipeline_cache).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from optimizer import optimize_tac
+from parser import Parser, SemanticError
+from pipeline_cache import PipelineCache
+from lexer import Lexer
+from tac_generator import TACGenerator
+from exemplos import EXEMPLOS
+
+
+def programa(n: int) -> str:
+    return f'program p{n}; var x : integer; begin x := {n} + x * 2 end.'
+
+
+def textos(instrucoes):
+    return [str(i) for i in instrucoes]
+
+
+def test_segunda_compilacao_vem_do_cache(tmp_path):
+    cache = PipelineCache(str(tmp_path))
+    for exemplo in EXEMPLOS:
+        with open(exemplo, encoding='utf-8') as f:
+            codigo = f.read()
+        frio = cache.compile(codigo)
+        quente = cache.compile(codigo)
+        assert not frio.from_cache and quente.from_cache
+
+        parser = Parser(list(Lexer(codigo).tokenize()))
+        ast = parser.parse()
+        tac = TACGenerator(parser.bindings).generate(ast)
+        assert quente.ast == ast
+        assert textos(quente.tac) == textos(tac)
+        assert textos(quente.optimized_tac) == textos(optimize_tac(tac, verbose=False))
+        assert list(quente.tokens) == list(Lexer(codigo).tokenize())
+
+
+def test_chave_depende_do_codigo_e_das_opcoes(tmp_path):
+    cache = PipelineCache(str(tmp_path))
+    assert cache.key(programa(1)) != cache.key(programa(2))
+    assert cache.key(programa(1), hash_cons=False) != cache.key(programa(1), hash_cons=True)
+    cache.compile(programa(1))
+    assert not cache.compile(programa(1), hash_cons=True).from_cache
+    assert not cache.compile(programa(1), optimize_passes=('dead_code',)).from_cache
+    assert len(cache.entries()) == 3
+
+
+def test_erros_nao_sao_gravados(tmp_path):
+    cache = PipelineCache(str(tmp_path))
+    with pytest.raises(SemanticError):
+        cache.compile('program p; begin y := 1 end.')
+    assert cache.entries() == {}
+
+
+def test_lru_limitado_por_tamanho(tmp_path):
+    cache = PipelineCache(str(tmp_path))
+    for n in range(3):
+        cache.compile(programa(n))
+    caminhos = {n: cache._path(cache.key(programa(n), hash_cons=False, optimize_passes=None))
+                for n in range(3)}
+    for segundos, n in enumerate((1, 0, 2)):
+        os.utime(caminhos[n], (segundos, segundos))  # 1 é a menos recente
+    tamanho = os.path.getsize(caminhos[0])
+
+    assert cache.compile(programa(1)).from_cache  # leitura torna 1 a mais recente
+    cache.max_bytes = 3 * tamanho
+    cache.compile(programa(3))
+    restantes = set(cache.entries())
+    assert caminhos[0] not in restantes and caminhos[1] in restantes
+    assert sum(os.path.getsize(p) for p in restantes) <= cache.max_bytes
+
+
+def test_entrada_corrompida_e_recompilada(tmp_path):
+    cache = PipelineCache(str(tmp_path))
+    cache.compile(programa(1))
+    (caminho,) = cache.entries()
+    with open(caminho, 'wb') as f:
+        f.write(b'lixo')
+    assert not cache.compile(programa(1)).from_cache
+    assert cache.compile(programa(1)).from_cache
+
+
+def _compilar(diretorio: str, n: int) -> list:
+    return textos(PipelineCache(diretorio).compile(programa(n % 3)).tac)
+
+
+def test_processos_concorrentes(tmp_path):
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        resultados = list(executor.map(_compilar, [str(tmp_path)] * 12, range(12)))
+    for n, tac in enumerate(resultados):
+        assert tac == resultados[n % 3]
+    cache = PipelineCache(str(tmp_path))
+    assert len(cache.entries()) == 3
+    assert all(cache.compile(programa(n)).from_cache for n in range(3))
+    assert not [nome for nome in os.listdir(tmp_path) if nome.endswith('.part')]
+
+
+def test_ligacoes_do_parser_no_cache(tmp_path):
+    # Com as ligações, `Total` vira o nome declarado `total` no TAC
+    codigo = 'program p; var total : integer; begin Total := 1; write(TOTAL) end.'
+    cache = PipelineCache(str(tmp_path))
+    frio = cache.compile(codigo)
+    quente = cache.compile(codigo)
+    assert quente.from_cache
+    assert len(quente.bindings) == len(frio.bindings) == 3
+    for _, simbolo in quente.bindings.values():
+        assert simbolo.name == 'total' and simbolo.kind == 'var'
+    assert textos(TACGenerator(quente.bindings).generate(quente.ast)) == textos(frio.tac)
+    assert 'Total' in str(TACGenerator().generate(quente.ast))
+
+
+def test_menu_grava_e_reaproveita(tmp_path, monkeypatch, capsys):
+    import main_menu
+    monkeypatch.setattr(main_menu, 'CACHE_DIR', str(tmp_path / 'cache'))
+    caminho = tmp_path / 'p.pas'
+    caminho.write_text('program p; var total : integer; begin Total := 1; write(TOTAL) end.', encoding='utf-8')
+
+    # Primeira execução: as etapas aparecem e o resultado é gravado
+    ast, generator = main_menu.processar_arquivo_completo(str(caminho))
+    saida = capsys.readouterr().out
+    assert 'ETAPA 1' in saida and 'ETAPA 3' in saida and 'gravados no cache' in saida
+    esperado = textos(generator.instructions)
+    otimizado = textos(optimize_tac(generator.instructions, verbose=False))
+
+    # Segunda: nada é refeito, nem a otimização da opção 6
+    def refazer(*args, **kwargs):
+        raise AssertionError("o cache deveria ser reaproveitado")
+
+    monkeypatch.setattr(main_menu, 'Parser', refazer)
+    monkeypatch.setattr(main_menu, 'optimize_tac', refazer)
+    ast, generator = main_menu.processar_arquivo_completo(str(caminho))
+    assert 'reaproveitados do cache' in capsys.readouterr().out
+    assert textos(main_menu.otimizar_codigo_tac(generator).instructions) == otimizado
+    # A opção 5 gera o mesmo TAC a partir da AST e das ligações do cache
+    assert textos(main_menu.gerar_codigo_intermediario(ast, generator.bindings).instructions) == esperado
@@ -0,0 +1,103 @@
+"""
+Testes da propagação de constantes condicional esparsa (SCCP): constantes
+através de desvios e laços, saltos decididos e blocos inalcançáveis.
+"""
+
+from lexer import Lexer
+from optimizer import TACOptimizer, optimize_tac
+from parser import Parser
+from sccp import BOTTOM, SCCP
+from tac_generator import TACGenerator
+from test_ssa import executar, tac
+
+CONFIGURACAO = '''
+program configuracao;
+var debug, nivel, modo, total, i, x : integer;
+begin
+  debug := 0;
+  nivel := 3;
+  modo := 2;
+  total := 0;
+  x := 1;
+  i := 0;
+  while i < 10 do
+  begin
+    if debug = 1 then
+    begin
+      write(i);
+      x := 2;
+    end
+    else
+      total := total + nivel * 2;
+    if modo > 1 then nivel := 3 else nivel := 4;
+    i := i + 1;
+  end;
+  write(total);
+  write(x);
+  write(nivel);
+end.
+'''
+
+
+def compilar(fonte):
+    parser = Parser(list(Lexer(fonte).tokenize()))
+    return TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+
+
+def test_constantes_de_configuracao():
+    codigo = compilar(CONFIGURACAO)
+    sccp = SCCP(codigo, TACOptimizer(codigo)._eval_binop)
+    # O then de `debug = 1` e o else de `modo > 1` nunca executam
+    assert len(sccp.cfg) - sum(sccp.executable) == 2
+    # Os passes locais esquecem as constantes no primeiro rótulo
+    sem_sccp = optimize_tac(codigo, ['constant_folding', 'constant_propagation', 'copy_propagation',
+                                     'dead_code', 'dead_stores', 'cse'], verbose=False)
+    assert len(sem_sccp) == len(codigo)
+    otimizado = optimize_tac(codigo, verbose=False)
+    assert len(otimizado) < 25
+    texto = [str(ins).split() for ins in otimizado]
+    # x e nivel chegam constantes depois do laço (os phis só juntam arestas executáveis)
+    assert texto[-4:] == [['WRITE', 'total'], ['WRITE', '1'], ['WRITE', '3'], ['HALT']]
+    assert not any(op in ('JEQ', 'JGT') or 'debug' in resto or 'modo' in resto for op, *resto in texto)
+
+
+def test_laco_nao_e_constante():
+    # i e soma mudam no laço: o phi do teste do while é BOTTOM; só n propaga
+    with open('exemplo2.pas', encoding='utf-8') as f:
+        codigo = compilar(f.read())
+    sccp = SCCP(codigo, TACOptimizer(codigo)._eval_binop)
+    assert all(sccp.executable)
+    texts = codigo.operands.texts
+    phis = sccp.ssa.functions[0].phis[1]
+    assert sorted(texts[phi.var] for phi in phis) == ['i', 'soma']
+    assert all(sccp.values[phi.target] == BOTTOM for phi in phis)
+    otimizado = optimize_tac(codigo, ['sccp'], verbose=False)
+    assert ('JLT', 'T1', 'i', '10') in [(ins.op, ins.addr1, ins.addr2, ins.addr3) for ins in otimizado]
+
+
+def test_saltos_decididos_e_chamadas():
+    codigo = tac(
+        'LABEL MAIN',
+        'ATR k 2', 'ATR y 5',
+        'JLT T1 k 3', 'JNZ L1 T1',       # sempre salta
+        'WRITE k', 'ATR k 9',
+        'LABEL L1',
+        'CALL FUNC_f 0',                  # f altera y: depois do CALL y não é constante
+        'ADD T2 k 1', 'WRITE T2', 'WRITE y',
+        'JEQ T3 k 2', 'JZ L2 T3',         # nunca salta
+        'WRITE 7',
+        'LABEL L2',
+        'HALT',
+        'LABEL FUNC_f', 'ADD y y 4', 'RETURN y',
+    )
+    esperado = executar(codigo)
+    otimizado = optimize_tac(codigo, ['sccp'], verbose=False)
+    texto = [str(ins).split() for ins in otimizado]
+    assert ['JMP', 'L1'] not in texto and ['JZ', 'L2', 'T3'] not in texto
+    assert ['WRITE', 'k'] not in texto          # bloco inalcançável removido
+    assert ['ATR', 'T2', '3'] in texto and ['WRITE', '3'] in texto
+    assert ['WRITE', 'y'] in texto and ['ADD', 'y', 'y', '4'] in texto
+    # As condições viram true/false e o dead_code as remove
+    otimizado = optimize_tac(codigo, ['sccp', 'dead_code'], verbose=False)
+    assert [ins.op for ins in otimizado].count('ATR') == 2
+    assert executar(otimizado) == esperado == [3.0, 9.0, 7.0]
@@ -0,0 +1,146 @@
+"""
+Testes da forma SSA do TAC: dominadores, phis, renomeação e volta para o
+TAC normal.
+"""
+
+from exemplos import EXEMPLOS
+from cfg import build_cfg
+from lexer import Lexer
+from parser import Parser
+from ssa import build_ssa, dominance_frontiers, dominates, dominators, sequentialize
+from tac_generator import TACGenerator, TACInstruction
+from tac_packed import PackedTAC
+
+
+def gerar(arquivo):
+    with open(arquivo, encoding='utf-8') as f:
+        parser = Parser(list(Lexer(f.read()).tokenize()))
+    return TACGenerator(parser.bindings, packed=True).generate(parser.parse())
+
+
+def tac(*linhas):
+    return PackedTAC.from_instructions(TACInstruction(*linha.split()) for linha in linhas)
+
+
+def executar(codigo, limite=10000):
+    """Interpreta TAC (chamadas sem parâmetros) e retorna os valores escritos"""
+    operacoes = {'ADD': lambda a, b: a + b, 'SUB': lambda a, b: a - b, 'MUL': lambda a, b: a * b,
+                 'DIV': lambda a, b: a / b, 'JLT': lambda a, b: int(a < b), 'JEQ': lambda a, b: int(a == b)}
+    instrucoes = list(codigo)
+    rotulos = {ins.addr1: i for i, ins in enumerate(instrucoes) if ins.op == 'LABEL'}
+    memoria, saida, retornos = {}, [], []
+
+    def valor(operando):
+        try:
+            return float(operando)
+        except ValueError:
+            return memoria[operando]
+    pc = 0
+    for _ in range(limite):
+        ins = instrucoes[pc]
+        pc += 1
+        if ins.op == 'ATR':
+            memoria[ins.addr1] = valor(ins.addr2)
+        elif ins.op in operacoes:
+            memoria[ins.addr1] = operacoes[ins.op](valor(ins.addr2), valor(ins.addr3))
+        elif ins.op == 'JMP' or (ins.op == 'JZ' and not valor(ins.addr2)) or (ins.op == 'JNZ' and valor(ins.addr2)):
+            pc = rotulos[ins.addr1]
+        elif ins.op == 'WRITE':
+            saida.append(valor(ins.addr1))
+        elif ins.op == 'CALL':
+            retornos.append(pc)
+            pc = rotulos[ins.addr1]
+        elif ins.op == 'RETURN':
+            memoria['RETVAL'] = valor(ins.addr1)
+            pc = retornos.pop()
+        elif ins.op == 'HALT':
+            return saida
+    raise AssertionError('programa não terminou')
+
+
+def test_dominadores_e_fronteiras():
+    # 0 -> 1 -> (2 | 3) -> 4 -> 1 (laço) ; 4 -> 5
+    cfg = build_cfg(tac(
+        'LABEL MAIN', 'ATR x 0',
+        'LABEL L1', 'JZ L2 x',
+        'ATR y 1', 'JMP L3',
+        'LABEL L2', 'ATR y 2',
+        'LABEL L3', 'ADD x x y', 'JNZ L1 x',
+        'WRITE x', 'HALT',
+    ))
+    order, idom = dominators(cfg, 0)
+    assert order[0] == 0
+    assert idom == {0: 0, 1: 0, 2: 1, 3: 1, 4: 1, 5: 4}
+    assert dominates(idom, 1, 5) and not dominates(idom, 2, 4)
+    frontier = dominance_frontiers(cfg, order, idom)
+    assert frontier[2] == frontier[3] == {4}
+    assert frontier[4] == frontier[1] == {1}
+
+
+def test_phis_do_fatorial():
+    codigo = gerar('exemplo3.pas')
+    ssa = build_ssa(codigo)
+    texts = codigo.operands.texts
+    fatorial = ssa.functions[1]
+    assert fatorial.name == 'FUNC_fatorial'
+    # Só fat e i ganham phi, no teste do while (os temporários não)
+    phis = fatorial.phis[2]
+    assert [texts[phi.var] for phi in phis] == ['fat', 'i']
+    assert [[texts[arg] for arg in phi.args] for phi in phis] == [['fat.1', 'fat.3'], ['i.1', 'i.3']]
+    defs, uses = fatorial.def_use()
+    assert defs[phis[0].target] == (2, -1)
+    # fat.2 é lida no corpo (MUL) e na saída (ATR fatorial fat.2 e o RETURN,
+    # que expõe as variáveis para quem chamou)
+    assert sorted(b for b, _ in uses[phis[0].target]) == [3, 4, 4]
+    # O CALL redefine RETVAL no programa principal
+    main = ssa.functions[2]
+    assert sorted(texts[v] for vs in main.call_defs.values() for v in vs) == ['RETVAL.1', 'RETVAL.2']
+
+
+def test_volta_ao_codigo_original():
+    for arquivo in EXEMPLOS:
+        codigo = gerar(arquivo)
+        assert list(build_ssa(codigo).to_code()) == list(codigo), arquivo
+
+
+def test_copias_que_se_sobrepoem():
+    # Depois da propagação, x.2 fica viva junto com x.3: a cópia perdida
+    # precisa voltar no fim do laço (aresta crítica, bloco novo)
+    codigo = tac(
+        'LABEL MAIN', 'ATR x 1', 'ATR s 0',
+        'LABEL L1', 'ATR y x', 'ADD x x 1', 'ADD s s y', 'JLT T1 x 5', 'JNZ L1 T1',
+        'WRITE y', 'WRITE s', 'WRITE x', 'HALT',
+    )
+    esperado = executar(codigo)
+    ssa = build_ssa(codigo)
+    assert ssa.functions[0].propagate_copies() == 0  # y ainda é lida no HALT
+    saida = ssa.to_code()
+    assert executar(saida) == esperado == [4.0, 10.0, 5.0]
+    texts = [str(ins) for ins in saida]
+    assert any('LS1' in t for t in texts) and any('x.4' in t for t in texts)
+
+
+def test_variavel_alterada_pela_chamada():
+    # y é propagada para depois do CALL, que altera x: as versões de x não
+    # cabem mais no nome original e x é copiada nas bordas da chamada
+    codigo = tac(
+        'LABEL MAIN', 'ATR x 1', 'ATR y x', 'CALL FUNC_f 0', 'WRITE y', 'WRITE x', 'WRITE RETVAL', 'HALT',
+        'LABEL FUNC_f', 'ADD x x 6', 'RETURN x',
+    )
+    esperado = executar(codigo)
+    ssa = build_ssa(codigo)
+    main = ssa.functions[0]
+    assert sorted(codigo.operands.texts[v] for v in main.clobbers) == ['RETVAL', 'x']
+    main.propagate_copies()
+    saida = ssa.to_code()
+    assert executar(saida) == esperado == [1.0, 7.0, 7.0]
+    instrucoes = [(ins.op, ins.addr1, ins.addr2) for ins in saida]
+    assert ('ATR', 'x', 'x.4') in instrucoes      # antes do CALL
+    assert ('ATR', 'x.3', 'x') in instrucoes      # depois do CALL
+
+
+def test_ciclo_de_copias():
+    a, b, t = 1, 2, 3
+    assert sequentialize([(a, b), (b, a)], lambda: t) == [(t, a), (a, b), (b, t)]
+    assert sequentialize([(a, b), (b, t)], lambda: 99) == [(a, b), (b, t)]
+    assert sequentialize([(a, a)], lambda: 99) == []
@@ -0,0 +1,78 @@
+"""
+Testes da leitura do TAC em texto e do formato binário.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+from optimizer import optimize_tac
+from tac_generator import TACGenerator, TACInstruction
+from tac_io import (dump_tac, loads_tac, load_tac, optimize_file, read_tac_text, write_tac_text,
+                    TACFormatError)
+from tac_packed import PackedTAC
+from exemplos import EXEMPLOS
+
+
+def textos(codigo):
+    return [str(instr) for instr in codigo]
+
+
+def geradores():
+    for exemplo in EXEMPLOS:
+        with open(exemplo, encoding='utf-8') as f:
+            parser = Parser(list(Lexer(f.read()).tokenize()))
+        generator = TACGenerator(parser.bindings)
+        generator.generate(parser.parse())
+        yield generator
+    generator = TACGenerator()
+    generator.instructions = [TACInstruction('WRITE', '"a\tb  c"'), TACInstruction('WRITE', '"x. y"'),
+                              TACInstruction('ATR', 'a', '-1.5e3'), TACInstruction('HALT')]
+    yield generator
+
+
+def test_texto_e_binario_ida_e_volta(tmp_path):
+    for generator in geradores():
+        caminho = tmp_path / 'codigo.tac'
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.export_tac(str(caminho))
+        saida = io.StringIO()
+        write_tac_text(generator.instructions, saida)
+        assert caminho.read_text(encoding='utf-8') == saida.getvalue()
+
+        lido = read_tac_text(io.StringIO(saida.getvalue()))
+        assert lido == generator.instructions
+        assert textos(load_tac(str(caminho))) == textos(generator.instructions)
+
+        binario = loads_tac(dump_tac(generator.instructions))
+        assert textos(binario) == textos(generator.instructions)
+        assert list(binario.operands.kinds) == list(PackedTAC.from_instructions(lido).operands.kinds)
+        assert textos(optimize_tac(binario, verbose=False)) == \
+               textos(optimize_tac(generator.instructions, verbose=False))
+
+
+def test_arquivos_invalidos():
+    with pytest.raises(TACFormatError, match='Linha 2: operação desconhecida'):
+        read_tac_text(io.StringIO('# cabeçalho\n   1. FOO\ta\n'))
+    with pytest.raises(TACFormatError, match='assinatura'):
+        loads_tac(b'nada')
+    dados = dump_tac([TACInstruction('ATR', 'a', '1'), TACInstruction('HALT')])
+    with pytest.raises(TACFormatError, match='truncado'):
+        loads_tac(dados[:-3])
+
+
+def test_comando_otimiza_arquivo(tmp_path):
+    generator = next(geradores())
+    entrada = tmp_path / 'entrada.tac'
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator.export_tac(str(entrada))
+        optimize_file(str(entrada), str(tmp_path / 'saida.tacb'))
+        optimize_file(str(tmp_path / 'saida.tacb'), str(tmp_path / 'saida.tac'))
+    esperado = textos(optimize_tac(generator.instructions, verbose=False))
+    assert textos(load_tac(str(tmp_path / 'saida.tacb'))) == esperado
+    # A segunda execução otimiza de novo o que a primeira gravou
+    novamente = optimize_tac(load_tac(str(tmp_path / 'saida.tacb')), verbose=False)
+    assert textos(load_tac(str(tmp_path / 'saida.tac'))) == textos(novamente)
@@ -0,0 +1,81 @@
+"""
+Testes do TAC compacto (PackedTAC) e do otimizador sobre ele.
+"""
+
+from lexer import Lexer
+from parser import Parser
+from optimizer import TACOptimizer, optimize_tac
+from tac_generator import TACGenerator, TACInstruction
+from tac_packed import Kind, Op, PackedTAC, classify
+from exemplos import EXEMPLOS
+
+
+def textos(codigo):
+    return [str(instr) for instr in codigo]
+
+
+def programas():
+    for exemplo in EXEMPLOS:
+        with open(exemplo, encoding='utf-8') as f:
+            parser = Parser(list(Lexer(f.read()).tokenize()), hash_cons=True)
+        yield parser, parser.parse()
+
+
+def test_gerador_packed_igual_ao_de_strings():
+    for parser, ast in programas():
+        for reuse in (False, True):
+            lista = TACGenerator(parser.bindings, reuse_shared=reuse).generate(ast)
+            codigo = TACGenerator(parser.bindings, reuse_shared=reuse, packed=True).generate(ast)
+            assert isinstance(codigo, PackedTAC)
+            assert textos(codigo) == textos(lista)
+            assert textos(PackedTAC.from_instructions(lista)) == textos(lista)
+
+            otimizado = optimize_tac(codigo, verbose=False)
+            assert isinstance(otimizado, PackedTAC)
+            assert textos(otimizado) == textos(optimize_tac(lista, verbose=False))
+
+
+def test_tipos_dos_operandos():
+    assert [classify(t) for t in ('T12', 'Total', '3.5', '-2', '"oi"', 'inf', 'true')] == \
+           [Kind.TEMP, Kind.VAR, Kind.NUM, Kind.NUM, Kind.STR, Kind.VAR, Kind.VAR]
+
+    codigo = PackedTAC.from_instructions([
+        TACInstruction('LABEL', 'L1'),
+        TACInstruction('ATR', 'L1', '2.5'),
+        TACInstruction('JMP', 'L1'),
+    ])
+    tabela = codigo.operands
+    rotulo, variavel, rotulo2 = codigo.a1
+    assert rotulo == rotulo2 != variavel
+    assert tabela.kinds[rotulo] == Kind.LABEL and tabela.kinds[variavel] == Kind.VAR
+    assert tabela.values[codigo.a2[1]] == 2.5
+    assert list(codigo.ops) == [Op.LABEL, Op.ATR, Op.JMP]
+    assert codigo.a2[0] == codigo.a3[0] == 0
+
+
+def test_passes_no_codigo_compacto():
+    lista = [
+        TACInstruction('ADD', 'T1', '2', '3'),      # dobrado: T1 := 5
+        TACInstruction('ATR', 'a', 'T1'),
+        TACInstruction('MUL', 'T2', 'a', 'b'),
+        TACInstruction('MUL', 'T3', 'a', 'b'),      # subexpressão comum
+        TACInstruction('ADD', 'T4', 'T2', 'T3'),
+        TACInstruction('ATR', 'Total', 'T4'),
+        TACInstruction('SUB', 'T5', 'b', '1'),      # temporário nunca lido
+        TACInstruction('HALT'),
+    ]
+    # Sem 'dead_stores': sem WRITE, todas as atribuições seriam mortas
+    passes = ['constant_folding', 'constant_propagation', 'copy_propagation', 'dead_code', 'cse']
+    otimizador = TACOptimizer(PackedTAC.from_instructions(lista))
+    otimizado = otimizador.optimize(passes)
+    assert [(i.op, i.addr1, i.addr2, i.addr3) for i in otimizado] == [
+        ('ATR', 'a', '5', None),
+        ('MUL', 'T2', '5', 'b'),
+        ('ADD', 'T4', 'T2', 'T2'),
+        ('ATR', 'Total', 'T4', None),
+        ('HALT', None, None, None),
+    ]
+    assert any(o.startswith('CSE: MUL') for o in otimizador.optimizations_applied)
+    assert 'Dead code eliminated: SUB T5' in otimizador.optimizations_applied
+    # A lista de TACInstruction passa pelos mesmos passes
+    assert textos(optimize_tac(lista, passes, verbose=False)) == textos(otimizado)
@@ -0,0 +1,96 @@
+"""
+Testes do percurso com pilha explícita (walker) e dos visitantes que o usam.
+"""
+
+import contextlib
+import io
+
+from ast_nodes import *
+from ast_exporter import ast_to_dict, DotExporter
+from lexer import Lexer
+from main_menu import print_ast
+from parser import Parser
+from tac_generator import TACGenerator
+from walker import node_children, run, run_recursive, walk, walk_recursive
+from exemplos import EXEMPLOS
+
+PROFUNDIDADE = 20000
+
+
+def cadeia_de_ifs(n: int) -> Program:
+    """if c then x := 0 else if c then x := 1 else if ... (n níveis)"""
+    comando = Assign(Var('x'), Num(n))
+    for i in reversed(range(n)):
+        comando = If(BinOp('<', Var('x'), Num(i)), Assign(Var('x'), Num(i)), comando)
+    return Program('p', [VarDecl(['x'], 'integer')], Compound([comando]))
+
+
+def blocos_aninhados(n: int) -> Program:
+    """begin begin ... x := x + 1 ... end end (n níveis)"""
+    bloco = Compound([Assign(Var('x'), BinOp('+', Var('x'), Num(1)))])
+    for _ in range(n):
+        bloco = Compound([bloco])
+    return Program('p', [VarDecl(['x'], 'integer')], bloco)
+
+
+def test_run_e_walk_iguais_as_versoes_recursivas():
+    def soma(node):
+        if isinstance(node, Num):
+            return node.value
+        esquerda = yield soma(node.left)
+        direita = yield node.right.value if isinstance(node.right, Num) else soma(node.right)
+        return esquerda + direita
+
+    arvore = BinOp('+', BinOp('+', Num(1), Num(2)), BinOp('+', Num(3), Num(4)))
+    assert run(soma(arvore)) == run_recursive(soma(arvore)) == 10
+
+    for exemplo in EXEMPLOS:
+        with open(exemplo, encoding='utf-8') as f:
+            ast = Parser(list(Lexer(f.read()).tokenize())).parse()
+        visitas = [], []
+        for percurso, destino in zip((walk, walk_recursive), visitas):
+            def visitar(node, nivel, destino=destino):
+                destino.append((type(node).__name__, nivel))
+                return node_children(node, nivel + 1)
+            percurso(ast, visitar, 0)
+        assert visitas[0] == visitas[1]
+
+
+def test_tac_de_ast_profunda():
+    instrucoes = TACGenerator().generate(cadeia_de_ifs(PROFUNDIDADE))
+    # Por nível: comparação, JZ, ATR, JMP, dois LABELs
+    assert len(instrucoes) == 6 * PROFUNDIDADE + 3
+    assert [str(i).split() for i in instrucoes[:3]] == [['LABEL', 'MAIN'], ['JLT', 'T1', 'x', '0'], ['JZ', 'L1', 'T1']]
+
+    instrucoes = TACGenerator().generate(blocos_aninhados(PROFUNDIDADE))
+    assert [str(i).split() for i in instrucoes] == [
+        ['LABEL', 'MAIN'], ['ADD', 'T1', 'x', '1'], ['ATR', 'x', 'T1'], ['HALT']
+    ]
+
+
+def test_exportadores_de_ast_profunda():
+    ast = cadeia_de_ifs(PROFUNDIDADE)
+
+    dados = ast_to_dict(ast)
+    comando, niveis = dados['block']['statements'][0], 0
+    while comando['type'] == 'If':
+        comando, niveis = comando['else_branch'], niveis + 1
+    assert niveis == PROFUNDIDADE and comando['value'] == {'type': 'Num', 'value': PROFUNDIDADE}
+
+    dot = DotExporter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        walk(ast, dot._visit)
+    n_nos = sum(1 for linha in dot.lines if '[label=' in linha)
+    assert n_nos == sum(1 for linha in dot.lines if '->' in linha) + 1
+
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        print_ast(blocos_aninhados(PROFUNDIDADE))
+    assert saida.getvalue().count('Compound:') == PROFUNDIDADE + 1
+
+
+def test_filhos_na_ordem_dos_campos():
+    bloco = Compound([Var('a'), Var('b')])
+    node = If(Var('c'), bloco, None)
+    assert node_children(node, 'ctx') == [(Var('c'), 'ctx'), (bloco, 'ctx')]
+    assert [filho.name for filho, _ in node_children(bloco)] == ['a', 'b']
@@ -0,0 +1,127 @@
+"""
+Percurso de árvores com pilha explícita (sem recursão em Python).
+
+Dois estilos de visitante, ambos com uso constante da pilha do Python,
+independente da profundidade da árvore:
+
+- walk(raiz, visit, contexto): pré-ordem. visit(nó, contexto) processa o nó
+  e retorna a lista de (filho, contexto_do_filho) a visitar em seguida, na
+  ordem desejada (ex.: node_children(nó, id_do_nó) no exportador DOT).
+
+- run(gerador): visitantes escritos como geradores, para quando o pai
+  precisa do resultado dos filhos. Para visitar um filho, o visitante faz
+  `resultado = yield visitante_do_filho(...)`; o gerador do filho é
+  executado pelo laço de run() e o valor que ele retorna é enviado de volta
+  ao pai. Fazer yield de um valor que não é um gerador devolve o próprio
+  valor (útil para folhas resolvidas sem criar um gerador).
+
+Exemplo:
+    def soma(node):
+        if isinstance(node, Num):
+            return node.value
+        esquerda = yield soma(node.left)
+        direita = yield soma(node.right)
+        return esquerda + direita
+
+    run(soma(arvore))
+"""
+
+from dataclasses import fields
+from types import GeneratorType
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from ast_nodes import ASTNode
+
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def _class_fields(cls) -> Tuple[str, ...]:
+    names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def node_fields(node: ASTNode) -> Tuple[str, ...]:
+    """Nomes dos campos do nó, na ordem de declaração (sem depender de __dict__)"""
+    return _FIELD_NAMES.get(type(node)) or _class_fields(type(node))
+
+
+def node_children(node: ASTNode, context: Any = None) -> List[Tuple[ASTNode, Any]]:
+    """Filhos do nó, na ordem dos campos, como pares (filho, context) para walk()"""
+    children = []
+    for name in _FIELD_NAMES.get(type(node)) or _class_fields(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, ASTNode):
+            children.append((value, context))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    children.append((item, context))
+    return children
+
+
+def iter_children(node: ASTNode, context: Any = None) -> Iterator[Tuple[ASTNode, Any]]:
+    """Como node_children, mas sem montar a lista (listas longas não são copiadas)"""
+    for name in _FIELD_NAMES.get(type(node)) or _class_fields(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, ASTNode):
+            yield value, context
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    yield item, context
+
+
+def walk(root, visit: Callable, context: Any = None):
+    """
+    Visita `root` e seus descendentes em pré-ordem. `visit(node, context)`
+    retorna a lista (ou iterador) de (filho, contexto) a visitar, ou None
+    para folhas.
+    """
+    # Pilha de iteradores sobre listas de (nó, contexto) ainda não visitados
+    stack = [iter(((root, context),))]
+    push, pop = stack.append, stack.pop
+    while stack:
+        for node, node_context in stack[-1]:
+            children = visit(node, node_context)
+            if children:
+                push(iter(children))
+                break
+        else:
+            pop()
+
+
+def walk_recursive(root, visit: Callable, context: Any = None):
+    """Mesma semântica de walk() com recursão (referência para os benchmarks)"""
+    for child, child_context in visit(root, context) or ():
+        walk_recursive(child, visit, child_context)
+
+
+def run(gen):
+    """Executa um visitante gerador (e os que ele delegar) e retorna seu resultado"""
+    stack = [gen]
+    value = None
+    while True:
+        try:
+            result = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            value = stop.value
+            continue
+        if type(result) is GeneratorType:
+            stack.append(result)
+            value = None
+        else:
+            value = result
+
+
+def run_recursive(gen):
+    """Mesma semântica de run() com recursão (referência para os benchmarks)"""
+    value = None
+    while True:
+        try:
+            result = gen.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value = run_recursive(result) if type(result) is GeneratorType else result